@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: columnar parse_columns vs. per-line split_parse on a large delimited file
+
+@author Kami-Kaze
+"""
+
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+from essentials.util.text_utils import parse_columns, split_parse
+
+_ROWS = 1_000_000
+
+
+def _write(path: str):
+    rng = random.Random(0)
+    with open(path, 'w') as f:
+        f.write('id,value,name,count\n')
+        for i in range(_ROWS):
+            f.write(f'{i},{rng.random() * 1000:.4f},item{rng.randint(0, 9999)},{rng.randint(0, 1 << 20)}\n')
+
+
+def _per_line(path: str):
+    """
+    The per-line approach, keeping all rows like its consumers do
+    """
+    ids, values, names, counts = array('q'), array('d'), [], array('q')
+    with open(path) as f:
+        next(f)
+        for line in f:
+            i, value, name, count = split_parse(line.rstrip('\n'), ',', str)
+            ids.append(int(i))
+            values.append(float(value))
+            names.append(name)
+            counts.append(int(count))
+    return ids, values, names, counts
+
+
+def _columnar(path: str, output: str):
+    rows = 0
+    for ids, values, names, counts in parse_columns(path, ',', [int, float, str, int], header=True, output=output):
+        rows += len(ids)
+    return rows
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'data.csv')
+        _write(path)
+        print(f'{_ROWS} rows, {os.path.getsize(path) / (1 << 20):.1f} MiB')
+
+        cases = {
+            'per line split_parse'  : lambda: _per_line(path),
+            'parse_columns (array)' : lambda: _columnar(path, 'array'),
+        }
+        try:
+            import numpy
+            cases['parse_columns (numpy)'] = lambda: _columnar(path, 'numpy')
+        except ImportError:
+            pass
+
+        for name, fn in cases.items():
+            start = time.perf_counter()
+            fn()
+            t = time.perf_counter() - start
+            # separate run, tracing slows everything down
+            tracemalloc.start()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{name:<22} {t:6.2f} s  peak {peak / (1 << 20):7.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: loading many config files (compiled schema, stat cache vs. per call introspection)
+
+@author Kami-Kaze
+"""
+
+import inspect
+import json
+import os
+import tempfile
+import time
+
+import attrs
+
+from essentials.gui.config import Config
+
+_FILES = 2000
+
+
+@attrs.define
+class _Window:
+    width: int = 1280
+    height: int = 720
+    title: str = 'essentials'
+    position: tuple[int, int] = (0, 0)
+
+
+@attrs.define
+class _BenchConfig(Config):
+    volume: float = .5
+    theme: str = 'dark'
+    recent: list[str] = attrs.Factory(list)
+    shortcuts: dict[str, str] = attrs.Factory(dict)
+    window: _Window = attrs.Factory(_Window)
+
+
+def _introspect_load(cls, path: str):
+    """
+    Loading as done before config_schema: inspect the class on every call, no conversion
+    """
+    arg_names = set(p.name for p in inspect.signature(cls).parameters.values())
+    with open(path, 'rb') as f:
+        data = json.load(f)
+    data.pop('__name__')
+    return cls(**{k: data[k] for k in arg_names & set(data.keys())})
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(_FILES):
+            path = os.path.join(directory, f'config{i}.json')
+            Config.save(_BenchConfig, path, _BenchConfig(
+                    volume=i / _FILES,
+                    recent=[f'file{j}.txt' for j in range(i % 20)],
+                    shortcuts={f'action{j}': f'ctrl+{j}' for j in range(10)},
+                    window=_Window(width=800 + i),
+            ))
+            paths.append(path)
+
+        cases = {
+            'introspect' : lambda p: _introspect_load(_BenchConfig, p),
+            'schema'     : lambda p: Config.load_or_defaults(_BenchConfig, p, cache=False),
+            'schema+stat': lambda p: Config.load_or_defaults(_BenchConfig, p),
+        }
+        for name, load in cases.items():
+            # second round of 'schema+stat' is served from the cache
+            for _ in range(2):
+                start = time.perf_counter()
+                for path in paths:
+                    load(path)
+                t = time.perf_counter() - start
+            print(f'{name:<12} {t * 1e3:8.2f} ms / {_FILES} files ({t / _FILES * 1e6:.1f} us per file)')
+
+
+if __name__ == '__main__':
+    main()
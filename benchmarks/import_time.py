@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""
+Import-time benchmark with a budget per module.
+Each module is imported in a fresh interpreter (python -X importtime),
+exits with status 1 if any module exceeds its budget.
+
+@author Kami-Kaze
+"""
+
+import subprocess
+import sys
+
+# module -> budget in milliseconds (cumulative import time)
+_BUDGETS = {
+    'essentials'                     : 5,
+    'essentials.io.format'           : 40,
+    'essentials.io.logging'          : 80,
+    'essentials.gui.core'            : 80,
+    'essentials.util.text_utils'     : 40,
+    'essentials.containers.path_dict': 60,
+    'essentials.itertools'           : 20,
+    'essentials.tui'                 : 20,
+    'essentials.mt_processor'        : 20,
+}
+
+
+def import_time(module: str) -> float | None:
+    """
+    :return: cumulative import time of [module] in milliseconds, None if it can not be imported
+    """
+    r = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                       capture_output=True, text=True)
+    if r.returncode != 0:
+        return None
+    for line in r.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f'No import time reported for {module}')
+
+
+def main() -> int:
+    failed = False
+    for module, budget in _BUDGETS.items():
+        t = import_time(module)
+        if t is None:
+            print(f'{module:<32} skipped (import failed, missing dependency?)')
+            continue
+        ok = t <= budget
+        failed |= not ok
+        print(f'{module:<32} {t:8.2f}ms / {budget:4d}ms {"ok" if ok else "OVER BUDGET"}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Microbenchmark: PathDict lookups vs. plain nested dict access
+
+@author Kami-Kaze
+"""
+
+import timeit
+
+from essentials.containers.path_dict import PathDict
+
+_DEPTH = 6
+_NUMBER = 200_000
+
+
+def _build(depth: int) -> dict:
+    data = {'value': 42}
+    for i in reversed(range(depth)):
+        data = {f'level{i}': data, f'sibling{i}': i}
+    return data
+
+
+def main():
+    raw = _build(_DEPTH)
+    pd = PathDict.loads(PathDict(raw).pstr())
+    path = '.'.join([f'level{i}' for i in range(_DEPTH)] + ['value'])
+    keys = tuple(path.split('.'))
+
+    def nested():
+        item = raw
+        for k in keys:
+            item = item[k]
+        return item
+
+    cases = {
+        'nested dict'           : nested,
+        'PathDict[str]'         : lambda: pd[path],
+        'PathDict[tuple]'       : lambda: pd[keys],
+        'PathDict.get'          : lambda: pd.get(path),
+        'PathDict.contains'     : lambda: pd.contains(path),
+        'PathDict.get (missing)': lambda: pd.get('level0.missing.value'),
+    }
+
+    for name, fn in cases.items():
+        t = timeit.timeit(fn, number=_NUMBER)
+        print(f'{name:<24} {t / _NUMBER * 1e9:8.1f} ns/op')
+
+    # bulk lookups, with and without the flat path index
+    paths = [path] * 100
+    bulk = {
+        'get_many (tree)' : lambda: pd.get_many(paths),
+        'get_many (index)': lambda: indexed.get_many(paths),
+    }
+    indexed = PathDict.loads(pd.pstr())
+    indexed.build_index()
+
+    for name, fn in bulk.items():
+        t = timeit.timeit(fn, number=_NUMBER // 100)
+        print(f'{name:<24} {t / _NUMBER * 1e9:8.1f} ns/path')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: PathDict serializers and binary snapshots on nested config-like data
+
+@author Kami-Kaze
+"""
+
+import random
+import timeit
+
+from essentials.containers.path_dict import PathDict
+from essentials.containers.serialization import available_serializers
+
+_NUMBER = 10
+
+
+def _build(services: int = 500) -> PathDict:
+    rng = random.Random(0)
+    data = PathDict()
+    for i in range(services):
+        dict.__setitem__(data, f'service{i}', PathDict({
+            'name'    : f'service-{i}',
+            'enabled' : rng.random() < .5,
+            'replicas': rng.randint(1, 16),
+            'limits'  : PathDict({'cpu': rng.random() * 4, 'memory': rng.randint(128, 8192)}),
+            'env'     : PathDict({f'VAR_{j}': f'value-{rng.random():.8f}' for j in range(10)}),
+            'ports'   : [rng.randint(1024, 65535) for _ in range(4)],
+            'tags'    : [f'tag{rng.randint(0, 100)}' for _ in range(5)],
+        }))
+    return data
+
+
+def main():
+    data = _build()
+    raw = data.pstr('json')
+    snapshot = data.to_snapshot()
+    print(f'json: {len(raw) / 1024:.0f} KiB, snapshot: {len(snapshot) / 1024:.0f} KiB')
+
+    cases = {}
+    for name in available_serializers():
+        cases[f'{name} dumps'] = lambda n=name: data.pstr(n)
+        cases[f'{name} loads'] = lambda n=name: PathDict.loads(raw, serializer=n)
+    cases['snapshot dump'] = data.to_snapshot
+    cases['snapshot load'] = lambda: PathDict.from_snapshot(snapshot)
+
+    for name, fn in cases.items():
+        t = timeit.timeit(fn, number=_NUMBER)
+        print(f'{name:<16} {t / _NUMBER * 1e3:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
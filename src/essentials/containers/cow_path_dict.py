@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+Copy-on-write PathDict for lock-free concurrent readers.
+Readers grab an immutable snapshot and read without locking,
+writers publish a new version that only copies the nodes
+on the modified path and shares everything else.
+
+@author Kami-Kaze
+"""
+
+from threading import Lock
+from typing import Any, Mapping
+
+from essentials.containers.path_dict import PathDict, PathKey, compile_path
+
+
+class FrozenPathDict(PathDict):
+    """
+    Immutable PathDict, used as snapshot by CowPathDict
+
+    @note: lists contained in a snapshot are shared between versions and must not be modified either
+    """
+
+    def _immutable(self, *_, **__):
+        raise TypeError('FrozenPathDict is immutable')
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__ = _immutable
+    __org_set__ = _immutable
+    __org_del__ = _immutable
+    pop = _immutable
+    popitem = _immutable
+    set_many = _immutable
+    setdefault = _immutable
+    update = _immutable
+    clear = _immutable
+    apply_patch = _immutable
+    # snapshots are shared between threads, per-instance state would race
+    track_changes = _immutable
+    build_index = _immutable
+
+
+def _freeze(value):
+    if isinstance(value, FrozenPathDict):
+        # already immutable, share it
+        return value
+    if isinstance(value, dict):
+        return FrozenPathDict({k: _freeze(v) for k, v in dict.items(value)})
+    if isinstance(value, list):
+        return [_freeze(v) for v in value]
+    return value
+
+
+def _own(node: dict, owned: set[int]) -> FrozenPathDict:
+    """
+    Get a copy of [node] that may be modified during the current write.
+    Nodes created during the current write are returned as-is.
+    """
+    if id(node) in owned:
+        return node
+    if not isinstance(node, dict):
+        raise TypeError(f'Cannot index into {type(node).__name__}')
+    copy = FrozenPathDict(node)
+    owned.add(id(copy))
+    return copy
+
+
+def _copy_path(root: FrozenPathDict, keys: tuple[str, ...], owned: set[int]):
+    """
+    Copy all nodes from [root] to the parent of [keys]
+
+    :return: (new root, new parent)
+    """
+    root = _own(root, owned)
+    node = root
+    for key in keys[:-1]:
+        child = _own(dict.__getitem__(node, key), owned)
+        dict.__setitem__(node, key, child)
+        node = child
+    return root, node
+
+
+class CowPathDict:
+    def __init__(self, data: Mapping | None = None):
+        self._current = _freeze(data or {})
+        self._version = 0
+        self._write_lock = Lock()
+
+    def snapshot(self) -> FrozenPathDict:
+        """
+        Get the current version. Never blocks, the returned snapshot never changes.
+
+        :return: immutable snapshot of the current version
+        """
+        return self._current
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __getitem__(self, path: PathKey):
+        return self._current[path]
+
+    def __contains__(self, path: PathKey):
+        return self._current.contains(path)
+
+    def get(self, path: PathKey, default: Any = None):
+        return self._current.get(path, default)
+
+    def set(self, path: PathKey, value):
+        """
+        Publish a new version with [path] set to [value]
+        """
+        self.set_many({path: value})
+
+    def set_many(self, mapping: Mapping[PathKey, Any]):
+        """
+        Publish a single new version with all items of [mapping] set.
+        Nodes shared by several paths are only copied once.
+        """
+        with self._write_lock:
+            root = self._current
+            owned = set()
+            for path, value in mapping.items():
+                keys = compile_path(path)
+                root, parent = _copy_path(root, keys, owned)
+                dict.__setitem__(parent, keys[-1], _freeze(value))
+            self._publish(root)
+
+    def delete(self, path: PathKey):
+        """
+        Publish a new version with [path] removed
+        """
+        with self._write_lock:
+            keys = compile_path(path)
+            root, parent = _copy_path(self._current, keys, set())
+            dict.__delitem__(parent, keys[-1])
+            self._publish(root)
+
+    def replace(self, data: Mapping):
+        """
+        Publish [data] as the new version
+        """
+        with self._write_lock:
+            self._publish(_freeze(data))
+
+    def _publish(self, root: FrozenPathDict):
+        # a single reference assignment, readers see either the old or the new version
+        self._current = root
+        self._version += 1
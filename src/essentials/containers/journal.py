@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+Journaled persistence for PathDict.
+Saving appends only the recorded changes to a journal file,
+which is compacted into a full snapshot on a background thread.
+
+Files:
+    <path>          snapshot: {"seq": N, "data": {...}}
+    <path>.journal  one {"seq": n, "ops": [...]} json object per line
+    <path>.old      journal being compacted
+
+@author Kami-Kaze
+"""
+
+import os
+from threading import Lock, Thread
+
+from essentials.containers.patch import apply_patch
+from essentials.containers.path_dict import PathDict
+from essentials.containers.serialization import get_serializer, _from_plain
+
+_JOURNAL_SUFFIX = '.journal'
+_OLD_SUFFIX = '.old'
+_TMP_SUFFIX = '.tmp'
+
+
+def _read_snapshot(path: str) -> tuple[int, dict]:
+    if not os.path.isfile(path):
+        return 0, {}
+    with open(path, 'rb') as f:
+        snapshot = get_serializer().loads(f.read())
+    return snapshot['seq'], snapshot['data']
+
+
+def _replay(path: str, seq: int, data: dict) -> tuple[int, dict]:
+    """
+    Apply all journal entries newer than [seq] to [data].
+    A partially written entry at the end (crash while appending) is cut off,
+    so entries appended later are not hidden behind it.
+
+    :return: (seq of the last applied entry, patched data)
+    """
+    if not os.path.isfile(path):
+        return seq, data
+    serializer = get_serializer()
+    end = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                # the newline is written with the entry, without it the entry is incomplete
+                break
+            try:
+                entry = serializer.loads(line)
+            except ValueError:
+                break
+            end += len(line)
+            if entry['seq'] <= seq:
+                continue
+            data = apply_patch(data, entry['ops'])
+            seq = entry['seq']
+    if end < os.path.getsize(path):
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+    return seq, data
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f'{path}{_TMP_SUFFIX}'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class PathDictJournal:
+    def __init__(self, path: str, compact_after: int = 1 << 20, fsync: bool = False):
+        """
+        Open (or create) a journaled PathDict at [path]
+
+        :param path: snapshot path, the journal is stored next to it
+        :param compact_after: journal size in bytes after which save() starts a background compaction
+        :param fsync: fsync the journal after each save
+        """
+        self._path = path
+        self._journal_path = f'{path}{_JOURNAL_SUFFIX}'
+        self._old_path = f'{self._journal_path}{_OLD_SUFFIX}'
+        self._compact_after = compact_after
+        self._fsync = fsync
+
+        self._lock = Lock()
+        self._compaction: Thread | None = None
+
+        seq, data = _read_snapshot(path)
+        seq, data = _replay(self._old_path, seq, data)
+        seq, data = _replay(self._journal_path, seq, data)
+        self._seq = seq
+
+        self._data: PathDict = _from_plain(data, PathDict)
+        self._data.track_changes()
+        self._journal = open(self._journal_path, 'ab')
+
+    @property
+    def data(self) -> PathDict:
+        """
+        The journaled tree. Mutations through its PathDict interface are persisted by save().
+
+        @note: only mutations of the root are recorded, use paths for nested values
+               (data['a.c'] = 3 or data['a', 'c'] = 3, not data['a']['c'] = 3)
+        """
+        return self._data
+
+    @property
+    def journal_size(self) -> int:
+        return self._journal.tell()
+
+    def save(self) -> int:
+        """
+        Append all changes since the last save to the journal
+
+        :return: number of persisted operations
+        """
+        ops = self._data.pop_changes()
+        if not ops:
+            return 0
+
+        with self._lock:
+            self._seq += 1
+            line = get_serializer().dumps({'seq': self._seq, 'ops': ops}).encode('utf-8')
+            self._journal.write(line + b'\n')
+            self._journal.flush()
+            if self._fsync:
+                os.fsync(self._journal.fileno())
+
+        if self._compact_after <= self.journal_size:
+            self.compact()
+        return len(ops)
+
+    def compact(self, wait: bool = False):
+        """
+        Merge the journal into the snapshot on a background thread.
+        Does nothing if a compaction is already running.
+
+        :param wait: block until the compaction is done
+        """
+        with self._lock:
+            if self._compaction is None or not self._compaction.is_alive():
+                self._rotate()
+                self._compaction = Thread(target=self._compact, name='PathDictJournal.compact', daemon=True)
+                self._compaction.start()
+            compaction = self._compaction
+
+        if wait:
+            compaction.join()
+
+    def close(self):
+        """
+        Save pending changes, wait for a running compaction and close the journal
+        """
+        self.save()
+        with self._lock:
+            compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        self._journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def _rotate(self):
+        """
+        Move the current journal aside for compaction and start a new one (lock must be held)
+        """
+        self._journal.close()
+        if os.path.exists(self._old_path):
+            # previous compaction did not finish, keep its entries
+            with open(self._old_path, 'ab') as old, open(self._journal_path, 'rb') as journal:
+                old.write(journal.read())
+            os.remove(self._journal_path)
+        else:
+            os.replace(self._journal_path, self._old_path)
+        self._journal = open(self._journal_path, 'ab')
+
+    def _compact(self):
+        seq, data = _read_snapshot(self._path)
+        seq, data = _replay(self._old_path, seq, data)
+        _write_atomic(self._path, get_serializer().dumps({'seq': seq, 'data': data}).encode('utf-8'))
+        # entries are skipped by seq on load, so a crash before this is harmless
+        os.remove(self._old_path)
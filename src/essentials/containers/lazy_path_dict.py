@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+Lazily parsed PathDict.
+Only the byte ranges of object members are indexed up front,
+a subtree is parsed the first time a path into it is accessed.
+
+@author Kami-Kaze
+"""
+
+import json
+import mmap
+import os
+import re
+from typing import Any
+
+from essentials.containers.path_dict import PathDict, PathKey, compile_path, _MISSING
+from essentials.containers.serialization import get_serializer
+
+_WS = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR = re.compile(rb'[^,}\]\s]+')
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]', re.DOTALL)
+
+_OPEN = frozenset(b'{[')
+_CLOSE = frozenset(b'}]')
+_QUOTE = ord('"')
+_COLON = ord(':')
+_COMMA = ord(',')
+_OBJECT_START = ord('{')
+_OBJECT_END = ord('}')
+
+
+def _error(msg: str, pos: int):
+    return json.JSONDecodeError(f'{msg} (byte {pos})', '', pos)
+
+
+def _skip_ws(buf, pos: int) -> int:
+    return _WS.match(buf, pos).end()
+
+
+def _skip_container(buf, pos: int) -> int:
+    """
+    Find the end of the object or array starting at [pos], without parsing it
+
+    :return: position after the closing bracket
+    """
+    depth = 0
+    for m in _TOKEN.finditer(buf, pos):
+        c = buf[m.start()]
+        if c in _OPEN:
+            depth += 1
+        elif c in _CLOSE:
+            depth -= 1
+            if depth == 0:
+                return m.end()
+    raise _error('Unterminated container', pos)
+
+
+class _LazyValue:
+    """
+    Placeholder for an object or array that has not been parsed yet
+    """
+    __slots__ = ('_buf', '_start', '_end', '_depth')
+
+    def __init__(self, buf, start: int, end: int, depth: int):
+        self._buf = buf
+        self._start = start
+        self._end = end
+        self._depth = depth
+
+    def resolve(self):
+        if 0 < self._depth and self._buf[self._start] == _OBJECT_START:
+            return LazyPathDict._from_buffer(self._buf, self._start, self._depth)[0]
+        return get_serializer().loads(self._buf[self._start:self._end], PathDict)
+
+
+class LazyPathDict(PathDict):
+    """
+    PathDict whose subtrees are parsed on first access.
+    Unparsed subtrees never leak out: reads, copies (dict(d), {**d}, d.copy(), d | other),
+    comparisons and repr parse what they need.
+    """
+    _buffer = None
+
+    @staticmethod
+    def from_buffer(buf, pos: int = 0, depth: int = 1) -> 'LazyPathDict':
+        """
+        Index the members of the json object starting at [pos] in [buf]
+
+        :param buf: bytes like object (e.g. bytes or mmap) containing json
+        :param pos: byte offset of the object, only whitespace may follow it
+        :param depth: number of object levels to index lazily,
+                      subtrees below are fully parsed on first access
+        :return: a "LazyPathDict" for the object
+        """
+        d, end = LazyPathDict._from_buffer(buf, pos, depth)
+        end = _skip_ws(buf, end)
+        if end < len(buf):
+            raise _error('Extra data', end)
+        return d
+
+    @staticmethod
+    def _from_buffer(buf, pos: int, depth: int) -> tuple['LazyPathDict', int]:
+        """
+        :return: the object starting at [pos] and the position after it
+        """
+        d = LazyPathDict()
+        d._buffer = buf
+
+        pos = _skip_ws(buf, pos)
+        if pos >= len(buf) or buf[pos] != _OBJECT_START:
+            raise _error('Expecting object', pos)
+        pos = _skip_ws(buf, pos + 1)
+        if pos < len(buf) and buf[pos] == _OBJECT_END:
+            return d, pos + 1
+
+        while True:
+            m = _STRING.match(buf, pos)
+            if m is None:
+                raise _error('Expecting property name', pos)
+            key = json.loads(m.group())
+            pos = _skip_ws(buf, m.end())
+            if pos >= len(buf) or buf[pos] != _COLON:
+                raise _error('Expecting \':\' delimiter', pos)
+            pos = _skip_ws(buf, pos + 1)
+            if pos >= len(buf):
+                raise _error('Expecting value', pos)
+
+            c = buf[pos]
+            if c in _OPEN:
+                end = _skip_container(buf, pos)
+                value = _LazyValue(buf, pos, end, depth - 1)
+            else:
+                m = (_STRING if c == _QUOTE else _SCALAR).match(buf, pos)
+                if m is None:
+                    raise _error('Expecting value', pos)
+                end = m.end()
+                value = json.loads(m.group())
+            dict.__setitem__(d, key, value)
+
+            pos = _skip_ws(buf, end)
+            if pos >= len(buf):
+                raise _error('Unterminated object', pos)
+            if buf[pos] == _OBJECT_END:
+                return d, pos + 1
+            if buf[pos] != _COMMA:
+                raise _error('Expecting \',\' delimiter', pos)
+            pos = _skip_ws(buf, pos + 1)
+
+    @staticmethod
+    def load(f, depth: int = 1) -> 'LazyPathDict':
+        """
+        Memory-map a json file and index its top-level members
+
+        :param f: file object opened in binary mode (must support fileno())
+        :param depth: see from_buffer()
+        :return: a "LazyPathDict" backed by the mapped file
+        """
+        if os.fstat(f.fileno()).st_size == 0:
+            # empty files cannot be mapped
+            raise _error('Expecting object', 0)
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return LazyPathDict.from_buffer(buf, 0, depth)
+
+    @staticmethod
+    def loads(data: str | bytes, depth: int = 1) -> 'LazyPathDict':
+        """
+        Index the top-level members of a json string
+
+        :param data: json string
+        :param depth: see from_buffer()
+        :return: a "LazyPathDict" for the data
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return LazyPathDict.from_buffer(data, 0, depth)
+
+    def materialize(self) -> 'LazyPathDict':
+        """
+        Parse all remaining subtrees
+
+        :return: [this]
+        """
+        for key, value in dict.items(self):
+            if isinstance(value, _LazyValue):
+                value = value.resolve()
+                dict.__setitem__(self, key, value)
+            if isinstance(value, LazyPathDict):
+                value.materialize()
+        self._buffer = None
+        return self
+
+    def get(self, path: PathKey, default: Any = None):
+        try:
+            return self._walk(compile_path(path))
+        except (KeyError, TypeError):
+            return default
+
+    def pop(self, key: PathKey, default=_MISSING):
+        item = super().pop(key, default)
+        if isinstance(item, _LazyValue):
+            item = item.resolve()
+        return item
+
+    def __getitem__(self, path: PathKey):
+        # exact top level keys first: copies (dict(d), {**d}) read through keys() and d[key]
+        if isinstance(path, str) and dict.__contains__(self, path):
+            return self._walk((path,))
+        return super().__getitem__(path)
+
+    def __iter__(self):
+        # overriding __iter__ makes dict(d) / {**d} copy through keys() and d[key] instead of the raw storage
+        return dict.__iter__(self)
+
+    def __eq__(self, other):
+        self.materialize()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        self.materialize()
+        return dict.__ne__(self, other)
+
+    def __repr__(self):
+        self.materialize()
+        return super().__repr__()
+
+    def __or__(self, other):
+        self.materialize()
+        return super().__or__(other)
+
+    def copy(self):
+        self.materialize()
+        return super().copy()
+
+    def setdefault(self, key, default=None):
+        if dict.__contains__(self, key):
+            return self._walk((key,))
+        return super().setdefault(key, default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        if isinstance(value, _LazyValue):
+            value = value.resolve()
+        return key, value
+
+    def items(self):
+        self.materialize()
+        return super().items()
+
+    def values(self):
+        self.materialize()
+        return super().values()
+
+    def build_index(self):
+        self.materialize()
+        super().build_index()
+
+    def pstr(self, serializer: str | None = None):
+        self.materialize()
+        return super().pstr(serializer)
+
+    def to_snapshot(self) -> bytes:
+        self.materialize()
+        return super().to_snapshot()
+
+    def diff(self, other: dict) -> list[dict]:
+        self.materialize()
+        return super().diff(other)
+
+    def _walk(self, keys: tuple[str, ...]):
+        item = self
+        for key in keys:
+            child = dict.__getitem__(item, key)
+            if isinstance(child, _LazyValue):
+                child = child.resolve()
+                dict.__setitem__(item, key, child)
+            item = child
+        return item
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+JSON-Patch (RFC 6902) style diffs between json compatible trees.
+Only 'add', 'replace' and 'remove' operations are produced,
+lists are treated as values (a changed list is replaced as a whole).
+
+@author Kami-Kaze
+"""
+
+from typing import Any, Iterable
+
+from essentials.containers.serialization import _to_plain
+
+
+def to_pointer(keys: Iterable[str]) -> str:
+    """
+    Convert keys to a json pointer (RFC 6901), e.g. ('a', 'b/c') -> '/a/b~1c'
+    """
+    return ''.join('/' + str(k).replace('~', '~0').replace('/', '~1') for k in keys)
+
+
+def from_pointer(pointer: str) -> tuple[str, ...]:
+    """
+    Convert a json pointer (RFC 6901) to keys, e.g. '/a/b~1c' -> ('a', 'b/c')
+    """
+    if pointer == '':
+        return ()
+    if not pointer.startswith('/'):
+        raise ValueError(f'Invalid json pointer {pointer!r}')
+    return tuple(k.replace('~1', '/').replace('~0', '~') for k in pointer[1:].split('/'))
+
+
+def _diff(old: dict, new: dict, keys: tuple[str, ...], ops: list[dict]):
+    for key in dict.keys(old):
+        if not dict.__contains__(new, key):
+            ops.append({'op': 'remove', 'path': to_pointer(keys + (key,))})
+
+    for key, value in dict.items(new):
+        path = keys + (key,)
+        if not dict.__contains__(old, key):
+            ops.append({'op': 'add', 'path': to_pointer(path), 'value': _to_plain(value)})
+            continue
+
+        previous = dict.__getitem__(old, key)
+        if previous is value:
+            # shared subtree (e.g. copy-on-write versions), nothing changed
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            _diff(previous, value, path, ops)
+        elif type(previous) is not type(value) or previous != value:
+            ops.append({'op': 'replace', 'path': to_pointer(path), 'value': _to_plain(value)})
+
+
+def diff(old: Any, new: Any) -> list[dict]:
+    """
+    Compute a minimal patch that turns [old] into [new]
+
+    :param old: json compatible tree
+    :param new: json compatible tree
+    :return: list of json patch operations
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        _diff(old, new, (), ops)
+        return ops
+    if type(old) is type(new) and old == new:
+        return []
+    return [{'op': 'replace', 'path': '', 'value': _to_plain(new)}]
+
+
+def apply_patch(tree: Any, ops: Iterable[dict]) -> Any:
+    """
+    Apply patch operations to a tree of plain dicts and lists (in place).
+    For PathDicts use PathDict.apply_patch(), which keeps its index and change tracking consistent.
+
+    :param tree: json compatible tree
+    :param ops: json patch operations
+    :return: the patched tree (a new object if the root was replaced)
+    """
+    for op in ops:
+        keys = from_pointer(op['path'])
+        kind = op['op']
+        if not keys:
+            if kind == 'remove':
+                raise ValueError('Cannot remove the root')
+            tree = _to_plain(op['value'])
+            continue
+
+        parent = tree
+        for key in keys[:-1]:
+            parent = parent[int(key)] if isinstance(parent, list) else dict.__getitem__(parent, key)
+
+        key = keys[-1]
+        if kind == 'remove':
+            if isinstance(parent, list):
+                del parent[int(key)]
+            else:
+                dict.__delitem__(parent, key)
+        elif kind in ('add', 'replace'):
+            value = _to_plain(op['value'])
+            if isinstance(parent, dict):
+                dict.__setitem__(parent, key, value)
+            elif key == '-':
+                parent.append(value)
+            elif kind == 'add':
+                parent.insert(int(key), value)
+            else:
+                parent[int(key)] = value
+        else:
+            raise ValueError(f'Unsupported patch operation {kind!r}')
+    return tree
@@ -8,62 +8,370 @@ child access via 'path.to.child' as key
 @author Kami-Kaze
 """
 
-import json
+import weakref
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
+
+from essentials.containers.patch import to_pointer, from_pointer, diff
+from essentials.containers.serialization import get_serializer, dump_snapshot, load_snapshot, _from_plain, _to_plain
+
+_MISSING = object()
+
+PathKey = str | tuple[str, ...]
+
+
+@lru_cache(maxsize=4096)
+def _compile_str(path: str) -> tuple[str, ...]:
+    return tuple(path.split('.'))
+
+
+def compile_path(path: PathKey) -> tuple[str, ...]:
+    """
+    Compile a path into its tuple of keys.
+    Compiled string paths are cached, so repeated access with the same
+    'path.to.child' string only pays for the split once.
+    Tuples are assumed to already be compiled and returned as-is.
+
+    :param path: 'path.to.child' string or tuple of keys
+    :return: tuple of keys
+    """
+    if isinstance(path, tuple):
+        return path
+    return _compile_str(path)
+
+
+def _join_path(path: PathKey) -> str:
+    if isinstance(path, tuple):
+        return '.'.join(path)
+    return path
+
+
+def _iter_paths(prefix: str, value):
+    """
+    Yield (dotted_path, value) for [value] and, if it is a dictionary, all its descendants
+    """
+    yield prefix, value
+    if isinstance(value, dict):
+        for key, child in dict.items(value):
+            yield from _iter_paths(f'{prefix}.{key}', child)
 
 
 class PathDict(dict):
-    def pop(self, key: str):
-        # FIXME
-        item = self[key]
-        del self[key]
+    # optional flat 'dotted.path' -> value index, see build_index()
+    _index: dict[str, Any] | None = None
+    # optional list of recorded json patch operations, see track_changes()
+    _changes: list[dict] | None = None
+    # indexed trees [this] is a nested node of, their index is dropped when [this] is mutated
+    _indexed_roots: 'weakref.WeakValueDictionary[int, PathDict] | None' = None
+
+    def build_index(self):
+        """
+        Build a flat 'dotted.path' -> value index over the whole tree.
+        While the index exists get_many() resolves paths with a single lookup.
+        The index is patched on mutation through [this] and dropped
+        when a nested PathDict is mutated directly (e.g. d['a']['b'] = 1).
+
+        @note: mutating nested plain dicts directly bypasses the index, call build_index() again afterwards
+        """
+        index = {}
+        for key, value in dict.items(self):
+            index.update(_iter_paths(key, value))
+        self._index = index
+        self._register_nodes(index.values())
+
+    def _register_nodes(self, values: Iterable):
+        for value in values:
+            if isinstance(value, PathDict):
+                if value._indexed_roots is None:
+                    # keyed by id, dictionaries are not hashable
+                    value._indexed_roots = weakref.WeakValueDictionary()
+                value._indexed_roots[id(self)] = self
+
+    def _mutating(self):
+        """
+        Called before [this] is mutated directly: drop the index of trees containing [this]
+        """
+        if self._indexed_roots:
+            for root in list(self._indexed_roots.values()):
+                root._index = None
+            self._indexed_roots = None
+
+    def drop_index(self):
+        """
+        Drop the flat path index
+        """
+        self._index = None
+
+    @property
+    def indexed(self) -> bool:
+        return self._index is not None
+
+    def get_many(self, paths: Iterable[PathKey], default: Any = None) -> list:
+        """
+        Bulk lookup
+
+        :param paths: iterable of 'path.to.child' strings or tuples of keys
+        :param default: value used for paths that do not exist
+        :return: list of items, in order of [paths]
+        """
+        index = self._index
+        if index is None:
+            return [self.get(path, default) for path in paths]
+        return [index.get(_join_path(path), default) for path in paths]
+
+    def set_many(self, mapping: Mapping[PathKey, Any]):
+        """
+        Bulk assignment, equivalent to self[path] = value for all items in [mapping]
+
+        :param mapping: mapping of 'path.to.child' strings or tuples of keys to values
+        """
+        for path, value in mapping.items():
+            self[path] = value
+
+    def update(self, *args, **kwargs):
+        """
+        dict.update, keys are top level keys (not paths)
+        """
+        if self._index is None and self._changes is None:
+            self._mutating()
+            dict.update(self, *args, **kwargs)
+            return
+        for key, value in dict(*args, **kwargs).items():
+            self[(key,)] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        """
+        dict.setdefault, [key] is a top level key (not a path)
+        """
+        value = dict.get(self, key, _MISSING)
+        if value is not _MISSING:
+            return value
+        self[(key,)] = default
+        return default
+
+    def popitem(self):
+        self._mutating()
+        key, value = dict.popitem(self)
+        if self._index is not None:
+            self._index_remove((key,), value)
+        if self._changes is not None:
+            self._changes.append({'op': 'remove', 'path': to_pointer((key,))})
+        return key, value
+
+    def clear(self):
+        self._mutating()
+        if self._changes is not None:
+            self._changes.extend({'op': 'remove', 'path': to_pointer((key,))} for key in dict.keys(self))
+        if self._index is not None:
+            self._index.clear()
+        dict.clear(self)
+
+    def track_changes(self):
+        """
+        Start recording mutations through [this] (item assignment / deletion, pop, set_many, update, clear, ...)
+        as json patch operations, see pop_changes()
+
+        @note: like the path index, mutating nested children directly is not recorded
+        """
+        if self._changes is None:
+            self._changes = []
+
+    def untrack_changes(self):
+        """
+        Stop recording mutations and discard recorded operations
+        """
+        self._changes = None
+
+    @property
+    def tracking(self) -> bool:
+        return self._changes is not None
+
+    def pop_changes(self) -> list[dict]:
+        """
+        Get and clear the operations recorded since the last call
+
+        :return: list of json patch operations
+        """
+        changes = self._changes or []
+        if self._changes is not None:
+            self._changes = []
+        return changes
+
+    def diff(self, other: dict) -> list[dict]:
+        """
+        Compute a minimal patch that turns [this] into [other], see patch.diff()
+
+        :param other: tree to compare to
+        :return: list of json patch operations
+        """
+        # diff() reads the raw dict storage, parse all of a LazyPathDict first
+        if (materialize := getattr(other, 'materialize', None)) is not None:
+            materialize()
+        return diff(self, other)
+
+    def apply_patch(self, ops: Iterable[dict]):
+        """
+        Apply json patch operations (as produced by diff() or pop_changes()) to [this]
+
+        :param ops: json patch operations
+        """
+        for op in ops:
+            keys = from_pointer(op['path'])
+            if not keys:
+                raise ValueError('Cannot replace the root of a PathDict')
+            if op['op'] == 'remove':
+                del self[keys]
+            elif op['op'] in ('add', 'replace'):
+                self[keys] = _from_plain(_to_plain(op['value']), PathDict)
+            else:
+                raise ValueError(f'Unsupported patch operation {op["op"]!r}')
+
+    def _index_remove(self, keys: tuple[str, ...], value):
+        for path, item in _iter_paths('.'.join(keys), value):
+            self._index.pop(path, None)
+            if isinstance(item, PathDict) and item._indexed_roots is not None:
+                item._indexed_roots.pop(id(self), None)
+
+    def _index_add(self, keys: tuple[str, ...], value):
+        paths = dict(_iter_paths('.'.join(keys), value))
+        self._index.update(paths)
+        self._register_nodes(paths.values())
+
+    def pop(self, key: PathKey, default=_MISSING):
+        self._mutating()
+        keys = compile_path(key)
+        try:
+            parent = self._walk(keys[:-1])
+            item = dict.pop(parent, keys[-1])
+        except (KeyError, TypeError):
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        if self._index is not None:
+            self._index_remove(keys, item)
+        if self._changes is not None:
+            self._changes.append({'op': 'remove', 'path': to_pointer(keys)})
         return item
 
-    def __getitem__(self, path: str):
-        path = path.split('.')
+    def get(self, path: PathKey, default: Any = None):
+        """
+        Non-throwing lookup
+
+        :param path: 'path.to.child' string or tuple of keys
+        :param default: value returned if [path] does not exist
+        :return: the item at [path] or [default]
+        """
         item = self
-        while 0 < len(path):
-            item = item.__org_get__(path.pop(0))
+        for key in compile_path(path):
+            if not isinstance(item, dict):
+                return default
+            item = dict.get(item, key, _MISSING)
+            if item is _MISSING:
+                return default
         return item
 
-    def __setitem__(self, path: str, item):
-        path = path.split('.')
-        parent = self
-        while 1 < len(path):
-            parent = parent.__org_get__(path.pop(0))
-        parent.__org_set__(path[0], item)
+    def contains(self, path: PathKey) -> bool:
+        """
+        Check whether [path] exists, without raising and catching KeyError
+
+        :param path: 'path.to.child' string or tuple of keys
+        :return: True if [path] exists
+        """
+        return self.get(path, _MISSING) is not _MISSING
 
-    def __contains__(self, path: str):
-        # FIXME: I'm lazy
-        try:
-            # noinspection PyStatementEffect
-            self[path]
-            return True
-        except KeyError:
-            return False
-
-    def __delitem__(self, path: str):
-        path = path.split('.')
+    def __getitem__(self, path: PathKey):
+        return self._walk(compile_path(path))
+
+    def __setitem__(self, path: PathKey, item):
+        self._mutating()
+        keys = compile_path(path)
+        parent = self._walk(keys[:-1])
+        if self._index is None and self._changes is None:
+            dict.__setitem__(parent, keys[-1], item)
+            return
+
+        old = dict.get(parent, keys[-1], _MISSING)
+        dict.__setitem__(parent, keys[-1], item)
+        if self._index is not None:
+            if old is not _MISSING:
+                self._index_remove(keys, old)
+            self._index_add(keys, item)
+        if self._changes is not None:
+            self._changes.append({
+                'op'   : 'add' if old is _MISSING else 'replace',
+                'path' : to_pointer(keys),
+                # copy, later changes to [item] are recorded separately
+                'value': _to_plain(item),
+            })
+
+    def __contains__(self, path: PathKey):
+        return self.contains(path)
+
+    def __delitem__(self, path: PathKey):
+        self._mutating()
+        keys = compile_path(path)
+        parent = self._walk(keys[:-1])
+        if self._index is not None:
+            self._index_remove(keys, dict.__getitem__(parent, keys[-1]))
+        dict.__delitem__(parent, keys[-1])
+        if self._changes is not None:
+            self._changes.append({'op': 'remove', 'path': to_pointer(keys)})
+
+    def _walk(self, keys: tuple[str, ...]):
         item = self
-        while 1 < len(path):
-            item = item[path.pop(0)]
-        item.__org_del__(path[0])
+        for key in keys:
+            item = dict.__getitem__(item, key)
+        return item
+
+    def __reduce_ex__(self, protocol):
+        # pickle / copy the contents only: the index, recorded changes and index back references
+        # belong to this instance. Rebuilding through the constructor also keeps keys containing '.' literal
+        return type(self), (dict(self.items()),)
 
     def __org_get__(self, key):
         return super(PathDict, self).__getitem__(key)
 
     def __org_set__(self, key, value):
+        # raw access bypasses index patching and change tracking
+        self._mutating()
+        self._index = None
         return super(PathDict, self).__setitem__(key, value)
 
     def __org_del__(self, key):
+        self._mutating()
+        self._index = None
         return super(PathDict, self).__delitem__(key)
 
-    def pstr(self):
+    def pstr(self, serializer: str | None = None):
         """
         Get a pretty string representation of [this]
 
+        :param serializer: name of the json serializer to use (see available_serializers), None for stdlib json
         :return: pretty-printed json string representation of [this]
         """
-        return json.dumps(self, indent=2, sort_keys=True)
+        return get_serializer(serializer).dumps(self, indent=2, sort_keys=True)
+
+    def to_snapshot(self) -> bytes:
+        """
+        Create a compact binary snapshot of [this], see serialization.dump_snapshot()
+
+        :return: snapshot bytes
+        """
+        return dump_snapshot(self)
+
+    @staticmethod
+    def from_snapshot(data: bytes) -> 'PathDict':
+        """
+        Restore from a binary snapshot created by to_snapshot()
+
+        :param data: snapshot bytes
+        :return: a "PathDict" containing the data from given snapshot
+        """
+        return load_snapshot(data, PathDict)
 
     @staticmethod
     def default(d: 'PathDict'):
@@ -76,21 +384,34 @@ class PathDict(dict):
         return d.__dict__
 
     @staticmethod
-    def load(f):
+    def load(f, lazy: bool = False, depth: int = 1, serializer: str | None = None):
         """
         Load from json file
 
         :param f: file like object to read from
+        :param lazy: memory-map the file and parse subtrees on first access (see LazyPathDict),
+                     requires [f] to be opened in binary mode
+        :param depth: number of object levels to index if [lazy]
+        :param serializer: name of the json serializer to use (see available_serializers), None for stdlib json
         :return: a "PathDict" containing the data from given json
         """
-        return json.load(f, object_hook=PathDict)
+        if lazy:
+            from essentials.containers.lazy_path_dict import LazyPathDict
+            return LazyPathDict.load(f, depth)
+        return get_serializer(serializer).load(f, PathDict)
 
     @staticmethod
-    def loads(data: str | bytes):
+    def loads(data: str | bytes, lazy: bool = False, depth: int = 1, serializer: str | None = None):
         """
         Load from json string
 
         :param data: json string
+        :param lazy: parse subtrees on first access (see LazyPathDict)
+        :param depth: number of object levels to index if [lazy]
+        :param serializer: name of the json serializer to use (see available_serializers), None for stdlib json
         :return: a "PathDict" containing the data from given json
         """
-        return json.loads(data, object_hook=PathDict)
+        if lazy:
+            from essentials.containers.lazy_path_dict import LazyPathDict
+            return LazyPathDict.loads(data, depth)
+        return get_serializer(serializer).loads(data, PathDict)
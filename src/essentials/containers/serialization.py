@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+Pluggable json serializers and a compact binary snapshot format.
+The stdlib json module is used by default, faster libraries (orjson, ujson) are opt-in by name:
+they differ in edge cases (big ints, non-str keys, NaN, escaping of non-ASCII text).
+
+@author Kami-Kaze
+"""
+
+import abc
+import json
+import marshal
+from typing import Any, Callable
+
+_SNAPSHOT_MAGIC = b'PDSNAP'
+_SNAPSHOT_HEADER = _SNAPSHOT_MAGIC + bytes([marshal.version])
+
+
+def _from_plain(obj, mapping: Callable[[dict], dict]):
+    """
+    Recursively convert plain dicts (as returned by a json library) into [mapping].
+    Children are converted in place, [obj] must not be shared.
+    """
+    t = type(obj)
+    if t is dict:
+        for k, v in obj.items():
+            if type(v) is dict or type(v) is list:
+                obj[k] = _from_plain(v, mapping)
+        return mapping(obj)
+    if t is list:
+        for i, v in enumerate(obj):
+            if type(v) is dict or type(v) is list:
+                obj[i] = _from_plain(v, mapping)
+    return obj
+
+
+def _to_plain(obj):
+    """
+    Recursively convert dict subclasses and tuples into plain dicts and lists
+    """
+    if isinstance(obj, dict):
+        return {k: _to_plain(v) for k, v in dict.items(obj)}
+    if isinstance(obj, (list, tuple)):
+        return [_to_plain(v) for v in obj]
+    return obj
+
+
+class Serializer(abc.ABC):
+    name: str = ''
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any, indent: int | None = None, sort_keys: bool = False) -> str:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def loads(self, data: str | bytes, mapping: Callable[[dict], dict] = dict) -> Any:
+        """
+        :param data: json string
+        :param mapping: type (or factory) used for json objects
+        """
+        raise NotImplementedError()
+
+    def load(self, f, mapping: Callable[[dict], dict] = dict) -> Any:
+        return self.loads(f.read(), mapping)
+
+
+class JsonSerializer(Serializer):
+    name = 'json'
+
+    def dumps(self, obj: Any, indent: int | None = None, sort_keys: bool = False) -> str:
+        return json.dumps(obj, indent=indent, sort_keys=sort_keys)
+
+    def loads(self, data: str | bytes, mapping: Callable[[dict], dict] = dict) -> Any:
+        if mapping is dict:
+            return json.loads(data)
+        return json.loads(data, object_hook=mapping)
+
+    def load(self, f, mapping: Callable[[dict], dict] = dict) -> Any:
+        if mapping is dict:
+            return json.load(f)
+        return json.load(f, object_hook=mapping)
+
+
+class OrjsonSerializer(Serializer):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj: Any, indent: int | None = None, sort_keys: bool = False) -> str:
+        if indent not in (None, 2):
+            # orjson only supports an indentation of 2
+            return JsonSerializer().dumps(obj, indent, sort_keys)
+        option = 0
+        if indent is not None:
+            option |= self._orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+        return self._orjson.dumps(obj, option=option).decode('utf-8')
+
+    def loads(self, data: str | bytes, mapping: Callable[[dict], dict] = dict) -> Any:
+        return _from_plain(self._orjson.loads(data), mapping)
+
+
+class UjsonSerializer(Serializer):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, obj: Any, indent: int | None = None, sort_keys: bool = False) -> str:
+        return self._ujson.dumps(obj, indent=indent or 0, sort_keys=sort_keys)
+
+    def loads(self, data: str | bytes, mapping: Callable[[dict], dict] = dict) -> Any:
+        return _from_plain(self._ujson.loads(data), mapping)
+
+
+def _available() -> dict[str, Serializer]:
+    serializers = {}
+    # ordered by preference
+    for cls in (OrjsonSerializer, UjsonSerializer, JsonSerializer):
+        try:
+            serializers[cls.name] = cls()
+        except ImportError:
+            pass
+    return serializers
+
+
+_SERIALIZERS = _available()
+
+
+def available_serializers() -> list[str]:
+    """
+    :return: names of all installed serializers, fastest first (the default is 'json')
+    """
+    return list(_SERIALIZERS.keys())
+
+
+def get_serializer(name: str | None = None) -> Serializer:
+    """
+    Get a serializer by name
+
+    :param name: one of available_serializers() or None for the stdlib json serializer
+    :return: the serializer
+    """
+    if name is None:
+        return _SERIALIZERS[JsonSerializer.name]
+    if name not in _SERIALIZERS:
+        raise ValueError(f'Serializer {name} is not available (available: {available_serializers()})')
+    return _SERIALIZERS[name]
+
+
+def dump_snapshot(obj: Any) -> bytes:
+    """
+    Create a compact binary snapshot of a json compatible tree
+
+    @note: snapshots are only guaranteed to load on the same python version (they use marshal)
+    :param obj: tree to store
+    :return: snapshot bytes
+    """
+    return _SNAPSHOT_HEADER + marshal.dumps(_to_plain(obj))
+
+
+def load_snapshot(data: bytes, mapping: Callable[[dict], dict] = dict) -> Any:
+    """
+    Restore a tree from a snapshot created by dump_snapshot()
+
+    :param data: snapshot bytes
+    :param mapping: type (or factory) used for objects
+    :return: the restored tree
+    """
+    header = bytes(data[:len(_SNAPSHOT_HEADER)])
+    if not header.startswith(_SNAPSHOT_MAGIC):
+        raise ValueError('Not a snapshot')
+    if header != _SNAPSHOT_HEADER:
+        raise ValueError(f'Incompatible snapshot version {header[-1]} (expected {marshal.version})')
+    return _from_plain(marshal.loads(memoryview(data)[len(_SNAPSHOT_HEADER):]), mapping)
@@ -6,6 +6,7 @@
 """
 
 import ctypes
+import time
 from dataclasses import dataclass
 
 import OpenGL.GL as gl
@@ -15,7 +16,9 @@ import pystray
 from PIL import Image
 from imgui.integrations.glfw import GlfwRenderer
 
+from essentials.gui.config import flush_pending_saves
 from essentials.gui.core import _CORE_LOGGER
+from essentials.gui.frame_scheduler import FrameScheduler
 from essentials.io.logging import log_call
 
 _DWM = ctypes.windll.dwmapi
@@ -32,12 +35,20 @@ class AppConfig:
 
     @note icon_path: must be an .ico file
     @note background_color: rgb values range from 0 to 1
+    @note target_fps: frame rate limit, None for no limit (besides vsync)
+    @note idle_mode: opt-in, only render on input, redraw requests or while animating (see App.request_redraw),
+                     apps showing data that changes without input must request redraws themselves
+    @note idle_interval: maximum seconds between update() calls while idle / hidden
     """
     width: int
     height: int
     title: str
     icon_path: str = None
     start_minimized: bool = False
+    target_fps: float | None = 60.
+    vsync: bool = True
+    idle_mode: bool = False
+    idle_interval: float = .5
 
 
 class Window:
@@ -88,6 +99,12 @@ class App:
             self._icon_image = Image.open(config.icon_path)
         self._raw_window = self._init_glfw()
         self._imgui_impl = self._init_imgui()
+        self._scheduler = FrameScheduler(
+                target_fps=config.target_fps,
+                idle_interval=config.idle_interval,
+                idle_mode=config.idle_mode,
+                wake=glfw.post_empty_event,
+        )
 
         self._tray_icon = None
         if self._icon_image is not None:
@@ -155,6 +172,26 @@ class App:
         :return:
         """
         self._should_exit = True
+        glfw.post_empty_event()
+
+    def request_redraw(self, frames: int = 1):
+        """
+        Render the next [frames] frames even if the app is idle.
+        Can be called from update() / render() and other threads (e.g. when data changed)
+        :return:
+        """
+        self._scheduler.request_redraw(frames)
+
+    @property
+    def animating(self) -> bool:
+        """
+        Set to True to render continuously (at target fps), e.g. while an animation is running
+        """
+        return self._scheduler.animating
+
+    @animating.setter
+    def animating(self, value: bool):
+        self._scheduler.animating = value
 
     def run(self):
         """
@@ -171,15 +208,26 @@ class App:
                 self._tray_icon.run_detached()
             self.on_start()
 
+            scheduler = self._scheduler
             while not self._should_exit:
-                glfw.poll_events()
+                visible = bool(glfw.get_window_attrib(self._raw_window, glfw.VISIBLE))
+                timeout = scheduler.wait_timeout(visible)
+                if timeout is None:
+                    glfw.poll_events()
+                else:
+                    # blocks until events arrive, a redraw is requested or the timeout expires
+                    start = time.monotonic()
+                    glfw.wait_events_timeout(timeout)
+                    scheduler.after_wait(time.monotonic() - start, timeout)
                 self._imgui_impl.process_inputs()
 
                 if glfw.window_should_close(self._raw_window):
                     self._should_exit = True
 
                 self.update()
-                self._imgui_frame()
+                if scheduler.should_render(visible):
+                    self._imgui_frame()
+                    scheduler.frame_rendered()
         except KeyboardInterrupt:
             pass
         except Exception as e:
@@ -237,6 +285,7 @@ class App:
 
         # init opengl
         glfw.make_context_current(window)
+        glfw.swap_interval(1 if self._config.vsync else 0)
 
         hndl = glfw.get_win32_window(window)
 
@@ -324,9 +373,12 @@ class App:
         glfw.restore_window(self._raw_window)
         glfw.focus_window(self._raw_window)
         self.on_show()
+        # also wakes up the main loop if it is waiting for events
+        self.request_redraw(2)
 
     def _stop(self, *_):
         self._should_exit = True
+        glfw.post_empty_event()
 
     @log_call(_CORE_LOGGER, name='Shutdown')
     def _shutdown(self):
@@ -336,6 +388,7 @@ class App:
             self._logger.error(f'Exception while running on_stop: {e}')
             raise e
         finally:
+            flush_pending_saves()
             self._imgui_impl.shutdown()
             glfw.terminate()
             if self._tray_icon is not None:
@@ -5,15 +5,36 @@
 @author Kami-Kaze
 """
 
-import inspect
 import json
 import os
 import shutil
+import stat as _stat
+import time
+import weakref
 from datetime import datetime
+from threading import Condition, Event, Lock, Thread
+from typing import Callable
 
-import attrs
-
+from essentials.gui.config_schema import compile_schema
 from essentials.gui.core import _CORE_LOGGER
+from essentials.io.file import atomic_write
+
+# (cls, path, load options) -> (stat key, config), see Config.load_or_defaults
+_CACHE: dict[tuple, tuple[tuple, 'Config']] = {}
+_CACHE_LOCK = Lock()
+
+
+def _stat_key(path: str) -> tuple | None:
+    """
+    :return: (mtime, size, inode) of [path] or None if it is not a file
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not _stat.S_ISREG(st.st_mode):
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
 
 
 class Config:
@@ -21,7 +42,9 @@ class Config:
     Base class for configs.
     Sub classes should be annotated with @attrs.define
     and provide default values for all members
-    so load() can use cls() to construct a default config if loading fails
+    so load() can use cls() to construct a default config if loading fails.
+    Members are converted / validated according to their type hints (see config_schema),
+    nested attrs classes are supported.
     """
 
     @staticmethod
@@ -31,76 +54,123 @@ class Config:
             ignore_missing_keys: bool = True,
             backup: bool = True,
             backup_suffix: str = '.backup_%Y%m%dT%H%M%S%f',
+            cache: bool = True,
     ):
         """
         Attempt to load config from (json at) given path
         If any key is missing in the json file the default value
         from the class definition will be used.
-        If loading the config fails all default values will be used
+        Values that cannot be converted use their default value.
+        If loading the config fails (e.g. invalid json) all default values will be used
 
         :param ignore_unknown_keys: omit keys present in json but not in class
         :param ignore_missing_keys: use default values for keys missing in json
-        :param backup: do a backup if json keys mismatch config members
+        :param backup: do a backup if json keys mismatch config members or values are invalid
         :param backup_suffix: string appended to the original filepath if [backup] applies
                               It is passed to now.strftime so supports including date formatting.
                               If <filepath><backup_suffix> exists <filepath><backup_suffix>.N
                               is used instead where N = first integer so that the filename is unique
+        :param cache: return a copy of the previously loaded config if the file did not change
+                      (same mtime, size and inode), instead of parsing it again
         """
+        if not cache:
+            return Config._load_or_defaults(cls, path, ignore_unknown_keys, ignore_missing_keys, backup, backup_suffix)
 
-        if not attrs.has(cls):
-            raise RuntimeError('Config classes should be annotated with @attrs.define')
+        key = (cls, os.path.abspath(path), ignore_unknown_keys, ignore_missing_keys)
+        stat = _stat_key(path)
+        if stat is not None:
+            with _CACHE_LOCK:
+                cached = _CACHE.get(key)
+            if cached is not None and cached[0] == stat:
+                return compile_schema(cls).copy(cached[1])
 
-        defined_args = inspect.signature(cls).parameters.values()
-        if any(p.default is p.empty for p in defined_args):
-            raise RuntimeError('Config classes should provide default values for all members')
+        config, loaded = Config._load_or_defaults(
+                cls, path, ignore_unknown_keys, ignore_missing_keys, backup, backup_suffix, with_status=True
+        )
+        if loaded and stat is not None:
+            with _CACHE_LOCK:
+                _CACHE[key] = (stat, compile_schema(cls).copy(config))
+        return config
 
-        arg_names = set(p.name for p in defined_args)
+    @staticmethod
+    def _load_or_defaults(
+            cls, path: str,
+            ignore_unknown_keys: bool,
+            ignore_missing_keys: bool,
+            backup: bool,
+            backup_suffix: str,
+            with_status: bool = False,
+    ):
+        """
+        Uncached implementation of load_or_defaults
+
+        :param with_status: return (config, True if it was loaded from [path])
+        """
+        schema = compile_schema(cls)
+        if not schema.complete:
+            raise RuntimeError('Config classes should provide default values for all members')
 
         if os.path.exists(path) and os.path.isfile(path):
             try:
                 with open(path, 'rb') as f:
                     data: dict = json.load(f)
-                    cls_name = data.pop('__name__')
-
-                    # sanity checks
-                    if not cls.__name__ == cls_name:
-                        raise RuntimeError(f'Cannot convert config of type {cls_name} to {cls.__name__}!')
-
-                    found_names = set(data.keys())
-                    if (missing := arg_names - found_names):
-                        if ignore_missing_keys:
-                            _CORE_LOGGER.warn(f'Missing config keys {missing}. Using defaults...')
-                        else:
-                            raise RuntimeError(f'Missing config keys {missing}')
-
-                    if (unknown := found_names - arg_names):
-                        if ignore_unknown_keys:
-                            _CORE_LOGGER.warn(f'Unknown config keys {unknown}. Ignoring...')
-                        else:
-                            raise RuntimeError(f'Unknown config keys {unknown}')
-
-                    if backup and missing | unknown:
-                        Config.create_backup(path, backup_suffix)
-                    # idk, this is a funny one
-                    return cls(**{k: data[k] for k in arg_names & found_names})
-            except (json.JSONDecodeError, TypeError) as e:
+                cls_name = data.pop('__name__')
+
+                # sanity checks
+                if not cls.__name__ == cls_name:
+                    raise RuntimeError(f'Cannot convert config of type {cls_name} to {cls.__name__}!')
+
+                missing, unknown, invalid = [], [], []
+                config = schema.load(data, missing, unknown, invalid=invalid)
+
+                if invalid:
+                    # only the invalid members fall back to their defaults
+                    _CORE_LOGGER.warn(f'Invalid config values {invalid}. Using defaults...')
+
+                if missing:
+                    if ignore_missing_keys:
+                        _CORE_LOGGER.warn(f'Missing config keys {set(missing)}. Using defaults...')
+                    else:
+                        raise RuntimeError(f'Missing config keys {set(missing)}')
+
+                if unknown:
+                    if ignore_unknown_keys:
+                        _CORE_LOGGER.warn(f'Unknown config keys {set(unknown)}. Ignoring...')
+                    else:
+                        raise RuntimeError(f'Unknown config keys {set(unknown)}')
+
+                if backup and (missing or unknown or invalid):
+                    Config.create_backup(path, backup_suffix)
+                return (config, True) if with_status else config
+            except (json.JSONDecodeError, TypeError, ValueError) as e:
                 _CORE_LOGGER.error(f'Failed to load config: {e} using fallback...')
                 Config.create_backup(path, backup_suffix)
         else:
             _CORE_LOGGER.warn(f'No config found at {path} using default')
-        return cls()
+        return (cls(), False) if with_status else cls()
 
     @staticmethod
     def save(cls, path: str, config: 'Config'):
+        """
+        Write [config] to [path] (atomically, [path] is never left half written).
+        See ConfigPersister to save frequently without blocking the caller.
+        """
         try:
-            data = attrs.asdict(config, recurse=True)
-            data['__name__'] = cls.__name__
-
-            with open(path, 'w') as f:
-                json.dump(data, f)
-        except (FileNotFoundError, TypeError) as e:
+            Config._write(path, Config._dump(cls, config))
+        except (OSError, TypeError) as e:
             _CORE_LOGGER.error(f'Failed to save config to {path}: {e}')
 
+    @staticmethod
+    def _dump(cls, config: 'Config') -> dict:
+        data = compile_schema(cls).dump(config)
+        data['__name__'] = cls.__name__
+        return data
+
+    @staticmethod
+    def _write(path: str, data: dict, fsync: bool = True):
+        with atomic_write(path, fsync=fsync) as f:
+            json.dump(data, f)
+
     @staticmethod
     def create_backup(path: str, backup_suffix: str):
         backup_suffix = datetime.now().strftime(backup_suffix)
@@ -111,3 +181,230 @@ class Config:
             backup_path = f'{path}{backup_suffix}.{i}'
         _CORE_LOGGER.info(f'Backing up config at {backup_path}')
         shutil.copy(path, backup_path)
+
+
+class ConfigWatcher:
+    """
+    Reloads a config in the background when its file changes
+    and notifies subscribers with the new instance.
+    The file is polled (os.stat) every [interval] seconds, so the caller never blocks on disk I/O.
+    """
+
+    def __init__(self, cls, path: str, interval: float = 1., **load_options):
+        """
+        :param cls: config class, see Config.load_or_defaults
+        :param path: config file
+        :param interval: seconds between checks
+        :param load_options: passed on to Config.load_or_defaults
+        """
+        self._cls = cls
+        self._path = path
+        self._interval = interval
+        self._load_options = load_options
+
+        self._lock = Lock()
+        self._subscribers: list[Callable[['Config'], None]] = []
+        self._stop = Event()
+        self._daemon: Thread | None = None
+
+        self._stat = _stat_key(path)
+        self._config = Config.load_or_defaults(cls, path, **load_options)
+
+    @property
+    def config(self) -> 'Config':
+        """
+        The most recently loaded config
+        """
+        return self._config
+
+    def subscribe(self, callback: Callable[['Config'], None]):
+        """
+        Call [callback] with the new config (on the watcher thread) whenever the file changed
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[['Config'], None]):
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def start(self) -> 'ConfigWatcher':
+        if self._daemon is None:
+            self._stop.clear()
+            self._daemon = Thread(target=self._run, name='ConfigWatcher', daemon=True)
+            self._daemon.start()
+        return self
+
+    def stop(self):
+        if self._daemon is not None:
+            self._stop.set()
+            self._daemon.join()
+            self._daemon = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def check(self) -> bool:
+        """
+        Reload now if the file changed
+
+        :return: True if the config was reloaded
+        """
+        stat = _stat_key(self._path)
+        if stat is None or stat == self._stat:
+            return False
+        self._stat = stat
+
+        config = Config.load_or_defaults(self._cls, self._path, **self._load_options)
+        self._config = config
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(config)
+            except Exception as e:
+                _CORE_LOGGER.error(f'Exception in config subscriber: {e}')
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.check()
+
+
+# all live persisters, flushed by flush_pending_saves
+_PERSISTERS: 'weakref.WeakSet[ConfigPersister]' = weakref.WeakSet()
+
+
+class ConfigPersister:
+    """
+    Saves a config on a background thread.
+    Saves in quick succession (e.g. on every slider change) are coalesced into one write
+    [delay] seconds after the last one, but at most [max_delay] seconds after the first unsaved one.
+    Files are written atomically (temporary file + rename).
+    """
+
+    def __init__(self, cls, path: str, delay: float = .5, max_delay: float | None = 5., fsync: bool = True):
+        """
+        :param cls: config class, see Config.save
+        :param path: config file
+        :param delay: seconds to wait for further changes before writing
+        :param max_delay: upper bound for postponing a write, None to wait for a pause of [delay] seconds
+        :param fsync: fsync the written file
+        """
+        self._cls = cls
+        self._path = path
+        self._delay = delay
+        self._max_delay = max_delay
+        self._fsync = fsync
+
+        self._cond = Condition()
+        self._pending: dict | None = None
+        self._deadline = 0.
+        self._limit = 0.
+        self._writing = False
+        self._closed = False
+        self._daemon: Thread | None = None
+        _PERSISTERS.add(self)
+
+    @property
+    def dirty(self) -> bool:
+        """
+        True if there are changes that have not been written yet
+        """
+        with self._cond:
+            return self._pending is not None or self._writing
+
+    def save(self, config: 'Config'):
+        """
+        Schedule writing [config].
+        The config is serialized immediately, later modifications of it are not included.
+        """
+        data = Config._dump(self._cls, config)
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('ConfigPersister is closed')
+            if self._pending is None:
+                self._limit = now + self._max_delay if self._max_delay is not None else float('inf')
+            self._pending = data
+            self._deadline = min(now + self._delay, self._limit)
+            if self._daemon is None:
+                self._daemon = Thread(target=self._run, name='ConfigPersister', daemon=True)
+                self._daemon.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Write pending changes now and wait until they are on disk
+
+        :return: False if [timeout] expired before that
+        """
+        with self._cond:
+            self._deadline = 0.
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def close(self):
+        """
+        Flush and stop the background thread
+        """
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._daemon is not None:
+            self._daemon.join()
+            self._daemon = None
+        _PERSISTERS.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def _next(self) -> dict | None:
+        """
+        Wait until pending data is due
+
+        :return: data to write or None once closed
+        """
+        with self._cond:
+            while True:
+                if self._pending is None:
+                    if self._closed:
+                        return None
+                    self._cond.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                data, self._pending = self._pending, None
+                self._writing = True
+                return data
+
+    def _run(self):
+        while (data := self._next()) is not None:
+            try:
+                Config._write(self._path, data, self._fsync)
+            except (OSError, TypeError) as e:
+                _CORE_LOGGER.error(f'Failed to save config to {self._path}: {e}')
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+
+def flush_pending_saves(timeout: float | None = None):
+    """
+    Write the pending changes of all ConfigPersisters (called by App on shutdown)
+    """
+    for persister in list(_PERSISTERS):
+        if not persister.flush(timeout):
+            _CORE_LOGGER.warn(f'Timed out saving config to {persister._path}')
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per-class loaders / dumpers for attrs based configs.
+A class is analysed once (fields, defaults, type hints) and the result is cached,
+so loading only runs the conversion needed for each member.
+
+@author Kami-Kaze
+"""
+
+import copy
+import enum
+import types
+import typing
+from threading import RLock
+from typing import Any, Callable
+
+import attrs
+
+# complete schemas only, read without locking
+_SCHEMAS: dict[type, 'ConfigSchema'] = {}
+# schemas being compiled by the thread holding _SCHEMAS_LOCK, published once the outermost compile finished
+_COMPILING: dict[type, 'ConfigSchema'] = {}
+_SCHEMAS_LOCK = RLock()
+
+# converter: plain (json) value -> member value, None = use the value as is
+_Converter = Callable[[Any], Any] | None
+
+
+def compile_schema(cls: type) -> 'ConfigSchema':
+    """
+    :return: the (cached) schema of the attrs class [cls]
+    """
+    schema = _SCHEMAS.get(cls)
+    if schema is not None:
+        return schema
+    if not attrs.has(cls):
+        raise RuntimeError('Config classes should be annotated with @attrs.define')
+
+    with _SCHEMAS_LOCK:
+        if (schema := _SCHEMAS.get(cls)) is not None:
+            return schema
+        if (schema := _COMPILING.get(cls)) is not None:
+            # (mutually) self referencing class, completed by the outer compile
+            return schema
+
+        outermost = not _COMPILING
+        schema = ConfigSchema(cls)
+        _COMPILING[cls] = schema
+        try:
+            schema._compile()
+        except BaseException:
+            if outermost:
+                _COMPILING.clear()
+            raise
+        if outermost:
+            # schemas compiled along the way may reference each other, publish them together once all are complete
+            _SCHEMAS.update(_COMPILING)
+            _COMPILING.clear()
+    return schema
+
+
+class ConfigSchema:
+    """
+    Compiled loader / dumper of one attrs class, use compile_schema to get one.
+    Members are converted according to their type hints:
+    int, float, str, bool, Enum, Literal, nested attrs classes,
+    list / set / tuple / dict of those and unions (including Optional).
+    Values of other (or missing) types are passed through unchanged.
+    """
+
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.keys: frozenset[str] = frozenset()
+        # True if all members have a default value (cls() works)
+        self.complete = True
+        # (key, init argument, converter)
+        self._loaders: tuple[tuple[str, str, _Converter], ...] = ()
+        # keys of members defaulting to None, None is accepted whatever their type hint
+        self._nullable: frozenset[str] = frozenset()
+        # (key, dumper)
+        self._dumpers: tuple[tuple[str, _Converter], ...] = ()
+        # (key, init argument, copier)
+        self._copiers: tuple[tuple[str, str, _Converter], ...] = ()
+
+    def _compile(self):
+        try:
+            attrs.resolve_types(self.cls)
+        except (NameError, TypeError):
+            # unresolvable forward references: treat them as untyped
+            pass
+
+        loaders, dumpers, copiers, nullable = [], [], [], []
+        for field in attrs.fields(self.cls):
+            if not field.init:
+                continue
+            if field.default is attrs.NOTHING:
+                self.complete = False
+            elif field.default is None:
+                # e.g. icon_path: str = None
+                nullable.append(field.name)
+            hint = field.type if not isinstance(field.type, str) else Any
+            arg = getattr(field, 'alias', None) or field.name.lstrip('_')
+            loaders.append((field.name, arg, _loader(hint)))
+            dumpers.append((field.name, _dumper(hint)))
+            copiers.append((field.name, arg, _copier(hint)))
+        self.keys = frozenset(key for key, _, _ in loaders)
+        self._nullable = frozenset(nullable)
+        self._loaders = tuple(loaders)
+        self._dumpers = tuple(dumpers)
+        self._copiers = tuple(copiers)
+
+    def load(
+            self, data: dict,
+            missing: list[str] | None = None,
+            unknown: list[str] | None = None,
+            prefix: str = '',
+            invalid: list[str] | None = None,
+    ):
+        """
+        Construct an instance from plain (json) [data].
+        Missing members use their default value, unknown keys are ignored.
+        Members defaulting to None accept None regardless of their type hint.
+
+        :param missing: list to append the (dotted) names of missing keys to
+        :param unknown: list to append the (dotted) names of unknown keys to
+        :param prefix: prepended to the reported names
+        :param invalid: list to append '<name>: <error>' of values that cannot be converted to,
+                        these members use their default value. None to raise instead
+        :raise TypeError: if a value has the wrong type (and [invalid] is None)
+        :raise ValueError: if a value cannot be converted (and [invalid] is None)
+        """
+        if not isinstance(data, dict):
+            raise TypeError(f'{prefix.rstrip(".") or self.cls.__name__}: expected object, got {type(data).__name__}')
+
+        kwargs = {}
+        for key, arg, convert in self._loaders:
+            try:
+                value = data[key]
+            except KeyError:
+                if missing is not None:
+                    missing.append(prefix + key)
+                continue
+            if convert is not None and not (value is None and key in self._nullable):
+                try:
+                    if isinstance(convert, ConfigSchema):
+                        value = convert.load(value, missing, unknown, f'{prefix}{key}.', invalid)
+                    else:
+                        value = convert(value)
+                except (TypeError, ValueError) as e:
+                    if not isinstance(convert, ConfigSchema):
+                        # nested schemas report their own (prefixed) names
+                        e = type(e)(f'{prefix}{key}: {e}')
+                    if invalid is None:
+                        raise e from None
+                    invalid.append(str(e))
+                    continue
+            kwargs[arg] = value
+
+        # every found key ends up in kwargs, so there are unknown keys iff data is larger
+        if unknown is not None and len(kwargs) < len(data):
+            unknown.extend(prefix + key for key in data if key not in self.keys)
+        return self.cls(**kwargs)
+
+    def dump(self, config) -> dict:
+        """
+        :return: plain (json compatible) copy of [config]
+        """
+        data = {}
+        for key, dump in self._dumpers:
+            value = getattr(config, key)
+            data[key] = value if dump is None or value is None else dump(value)
+        return data
+
+    def copy(self, config):
+        """
+        :return: deep copy of [config], immutable members are shared
+        """
+        kwargs = {}
+        for key, arg, copy_ in self._copiers:
+            value = getattr(config, key)
+            kwargs[arg] = value if copy_ is None or value is None else copy_(value)
+        return self.cls(**kwargs)
+
+    def __call__(self, value):
+        return self.load(value)
+
+
+def _loader(hint) -> _Converter:
+    if hint is Any or hint is object:
+        return None
+    if isinstance(hint, type) and attrs.has(hint):
+        return compile_schema(hint)
+
+    origin, args = typing.get_origin(hint), typing.get_args(hint)
+    if origin is typing.Union or origin is types.UnionType:
+        return _union_loader(args)
+    if origin is typing.Literal:
+        return _literal_loader(args)
+    if origin in (list, set, frozenset):
+        return _sequence_loader(origin, _loader(args[0]) if args else None)
+    if origin is tuple:
+        return _tuple_loader(args)
+    if origin is dict:
+        return _dict_loader(_loader(args[1]) if len(args) == 2 else None)
+    if hint in (list, set, frozenset, tuple, dict):
+        return _sequence_loader(hint, None) if hint is not dict else _dict_loader(None)
+
+    if hint is bool:
+        return _checked(bool)
+    if hint is int:
+        return _int
+    if hint is float:
+        return _float
+    if hint is str:
+        return _checked(str)
+    if isinstance(hint, type) and issubclass(hint, enum.Enum):
+        return hint
+    return None
+
+
+def _checked(tp: type) -> Callable:
+    def convert(value):
+        if type(value) is not tp:
+            raise TypeError(f'expected {tp.__name__}, got {type(value).__name__}')
+        return value
+
+    return convert
+
+
+def _int(value):
+    if type(value) is int:
+        return value
+    if type(value) is float and value.is_integer():
+        return int(value)
+    raise TypeError(f'expected int, got {type(value).__name__}')
+
+
+def _float(value):
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return float(value)
+    raise TypeError(f'expected float, got {type(value).__name__}')
+
+
+def _union_loader(args: tuple) -> _Converter:
+    optional = type(None) in args
+    options = [_loader(arg) for arg in args if arg is not type(None)]
+    if None in options:
+        # one option accepts anything
+        return None
+
+    def convert(value):
+        if value is None and optional:
+            return None
+        errors = []
+        for option in options:
+            try:
+                return option(value)
+            except (TypeError, ValueError) as e:
+                errors.append(str(e))
+        raise TypeError(' / '.join(errors))
+
+    return convert
+
+
+def _literal_loader(args: tuple) -> _Converter:
+    allowed = set(args)
+
+    def convert(value):
+        if value not in allowed:
+            raise ValueError(f'expected one of {args}, got {value!r}')
+        return value
+
+    return convert
+
+
+def _sequence_loader(origin: type, item: _Converter) -> _Converter:
+    def convert(value):
+        if not isinstance(value, list):
+            raise TypeError(f'expected list, got {type(value).__name__}')
+        if item is None:
+            return origin(value)
+        return origin([item(v) for v in value])
+
+    return convert
+
+
+def _tuple_loader(args: tuple) -> _Converter:
+    if not args or (len(args) == 2 and args[1] is Ellipsis):
+        return _sequence_loader(tuple, _loader(args[0]) if args else None)
+    items = [_loader(arg) or (lambda v: v) for arg in args]
+
+    def convert(value):
+        if not isinstance(value, list):
+            raise TypeError(f'expected list, got {type(value).__name__}')
+        if len(value) != len(items):
+            raise ValueError(f'expected {len(items)} items, got {len(value)}')
+        return tuple(item(v) for item, v in zip(items, value))
+
+    return convert
+
+
+def _dict_loader(item: _Converter) -> _Converter:
+    def convert(value):
+        if not isinstance(value, dict):
+            raise TypeError(f'expected object, got {type(value).__name__}')
+        if item is None:
+            return dict(value)
+        return {k: item(v) for k, v in value.items()}
+
+    return convert
+
+
+def _dumper(hint) -> _Converter:
+    if isinstance(hint, type):
+        if attrs.has(hint):
+            return compile_schema(hint).dump
+        if issubclass(hint, enum.Enum):
+            return _enum_value
+        if hint in (bool, int, float, str):
+            return None
+    # containers (and untyped members) are copied, so the result does not share state with the config
+    return _to_plain
+
+
+def _enum_value(value):
+    return value.value
+
+
+def _to_plain(value):
+    if type(value) in (bool, int, float, str) or value is None:
+        return value
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_to_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_plain(v) for k, v in value.items()}
+    if isinstance(value, enum.Enum):
+        return value.value
+    if attrs.has(type(value)):
+        return compile_schema(type(value)).dump(value)
+    return value
+
+
+_IMMUTABLE = (bool, int, float, str, bytes, type(None))
+
+
+def _copier(hint) -> _Converter:
+    """
+    :return: function copying a value of type [hint], None if values are immutable
+    """
+    if isinstance(hint, type):
+        if attrs.has(hint):
+            return compile_schema(hint).copy
+        if hint in _IMMUTABLE or issubclass(hint, enum.Enum):
+            return None
+
+    origin, args = typing.get_origin(hint), typing.get_args(hint)
+    if origin is typing.Literal:
+        return None
+    if origin is typing.Union or origin is types.UnionType:
+        if all(_copier(arg) is None for arg in args):
+            return None
+    elif origin in (list, set):
+        item = _copier(args[0]) if args else copy.deepcopy
+        if item is None:
+            return origin
+        return lambda value: origin(item(v) for v in value)
+    elif origin in (tuple, frozenset):
+        if args and all(_copier(arg) is None for arg in args if arg is not Ellipsis):
+            return None
+    elif origin is dict and len(args) == 2:
+        item = _copier(args[1])
+        if item is None:
+            return dict
+        return lambda value: {k: item(v) for k, v in value.items()}
+    return copy.deepcopy
@@ -4,7 +4,7 @@
 
 @author Kami-Kaze
 """
-from essentials.io.logging import get_logger
+from essentials.io.logging import lazy_logger
 
 _LOGGER_NAME = 'core'
-_CORE_LOGGER = get_logger(_LOGGER_NAME)
\ No newline at end of file
+_CORE_LOGGER = lazy_logger(_LOGGER_NAME)
\ No newline at end of file
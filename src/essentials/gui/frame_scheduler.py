@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+Frame pacing for the App main loop.
+Independent of glfw / imgui: the loop asks the scheduler how long to wait for events
+and whether to render, see App.run.
+
+@author Kami-Kaze
+"""
+
+import time
+from threading import Lock
+from typing import Callable
+
+# frames rendered at startup, even if idle (ImGui lays out windows over the first frames)
+_STARTUP_FRAMES = 2
+
+
+class FrameScheduler:
+    """
+    Decides when the main loop renders and how long it may block waiting for events.
+
+    The app is 'active' while it is animating, redraws are requested or input arrived
+    less than [settle_time] seconds ago. Active apps render at (up to) [target_fps],
+    otherwise the loop blocks for up to [idle_interval] seconds (waking up early on events)
+    and nothing is rendered, so idle / hidden apps use next to no CPU.
+    """
+
+    def __init__(
+            self,
+            target_fps: float | None = 60.,
+            idle_interval: float = .5,
+            settle_time: float = .25,
+            idle_mode: bool = False,
+            clock: Callable[[], float] = time.monotonic,
+            wake: Callable[[], None] | None = None,
+    ):
+        """
+        :param target_fps: frame rate limit while active, None for no limit (e.g. paced by vsync)
+        :param idle_interval: maximum seconds to block while idle, the loop (and App.update) runs at least this often
+        :param settle_time: seconds to keep rendering after input (ImGui needs a few frames to settle)
+        :param idle_mode: True to only render while active, False to render continuously (never idle)
+        :param clock: monotonic time source
+        :param wake: called (from any thread) to interrupt a blocking wait, e.g. glfw.post_empty_event
+        """
+        self._period = 1. / target_fps if target_fps else 0.
+        self._idle_interval = idle_interval
+        self._settle_time = settle_time
+        self._idle_mode = idle_mode
+        self._clock = clock
+        self._wake = wake
+
+        self._lock = Lock()
+        self._redraw_frames = _STARTUP_FRAMES
+        self._animating = False
+        self._last_input = float('-inf')
+        self._next_frame = float('-inf')
+        self._frame_start = 0.
+
+    @property
+    def animating(self) -> bool:
+        """
+        While True every frame is rendered (at target fps)
+        """
+        return self._animating
+
+    @animating.setter
+    def animating(self, value: bool):
+        self._animating = value
+        if value:
+            self._notify()
+
+    def request_redraw(self, frames: int = 1):
+        """
+        Render (at least) the next [frames] frames, can be called from any thread
+        """
+        with self._lock:
+            self._redraw_frames = max(self._redraw_frames, frames)
+        self._notify()
+
+    def _notify(self):
+        if self._wake is not None:
+            self._wake()
+
+    def active(self, visible: bool = True) -> bool:
+        """
+        :return: True if frames should be rendered
+        """
+        if not visible:
+            return False
+        if not self._idle_mode or self._animating or self._redraw_frames > 0:
+            return True
+        return self._clock() - self._last_input < self._settle_time
+
+    def wait_timeout(self, visible: bool = True) -> float | None:
+        """
+        :return: seconds to block waiting for events, None to only poll
+        """
+        if not self.active(visible):
+            return self._idle_interval
+        remaining = self._next_frame - self._clock()
+        return remaining if remaining > 0 else None
+
+    def after_wait(self, waited: float, timeout: float | None):
+        """
+        Report the time spent waiting for events, returning before [timeout] means events arrived
+        """
+        if timeout is not None and waited < timeout:
+            self._last_input = self._clock()
+
+    def should_render(self, visible: bool = True) -> bool:
+        """
+        :return: True if a frame is due now
+        """
+        if not self.active(visible):
+            return False
+        now = self._clock()
+        if now < self._next_frame:
+            return False
+        self._frame_start = now
+        return True
+
+    def frame_rendered(self):
+        """
+        Report a rendered frame
+        """
+        # keep a steady rhythm (frames are due every period), after idling / missed frames restart from this frame
+        self._next_frame = max(self._next_frame, self._frame_start) + self._period
+        with self._lock:
+            if self._redraw_frames > 0:
+                self._redraw_frames -= 1
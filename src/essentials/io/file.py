@@ -5,16 +5,186 @@
 @author Kami-Kaze
 """
 
+import mmap
 import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, IO
+
+_DEFAULT_CHUNK_SIZE = 1 << 20
 
 
 def open_or_create(path: str, mode: str, default: str = ''):
-    if not os.path.exists(path):
-        with open(path, 'w') as f:
+    try:
+        # exclusive create, no race between the existence check and writing the default
+        with open(path, 'x') as f:
             f.write(default)
+    except FileExistsError:
+        pass
 
     return open(path, mode)
 
 
 def join_path(p0, *args):
     return os.path.join(p0, *args)
+
+
+@contextmanager
+def mmap_read(path: str) -> Iterator[mmap.mmap | bytes]:
+    """
+    Memory-map a file for reading
+
+    :param path: file to map
+    :return: context manager yielding the read-only mapping (b'' for empty files, which can not be mapped)
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            yield m
+
+
+def iter_chunks(path: str, chunk_size: int = _DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Iterate over the contents of a file in chunks of (at most) [chunk_size] bytes
+    """
+    with open(path, 'rb', buffering=0) as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def iter_lines(path: str, buffer_size: int = _DEFAULT_CHUNK_SIZE, encoding: str | None = None) -> Iterator[bytes | str]:
+    """
+    Iterate over the lines of a file (including line endings) using a read buffer of [buffer_size] bytes
+
+    :param path: file to read
+    :param buffer_size: size of the read buffer
+    :param encoding: decode lines with this encoding, None to iterate over bytes
+    """
+    if encoding is None:
+        f = open(path, 'rb', buffering=buffer_size)
+    else:
+        f = open(path, 'r', buffering=buffer_size, encoding=encoding)
+    with f:
+        yield from f
+
+
+def read_into(f: IO[bytes], buffer: bytearray | memoryview) -> int:
+    """
+    Fill [buffer] from [f] without intermediate copies
+
+    :param f: binary file object (ideally unbuffered)
+    :param buffer: preallocated writable buffer
+    :return: number of bytes read, less than len(buffer) only at the end of the file
+    """
+    view = memoryview(buffer).cast('B')
+    total = 0
+    while total < len(view):
+        n = f.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total
+
+
+def iter_into(path: str, buffer: bytearray | memoryview) -> Iterator[memoryview]:
+    """
+    Iterate over a file, reusing a single preallocated buffer (zero-copy alternative to iter_chunks)
+
+    @note: the yielded view is only valid until the next iteration
+    :param path: file to read
+    :param buffer: preallocated writable buffer, determines the chunk size
+    :return: iterator of views into [buffer]
+    """
+    view = memoryview(buffer).cast('B')
+    with open(path, 'rb', buffering=0) as f:
+        while n := read_into(f, view):
+            yield view[:n]
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', encoding: str | None = None, fsync: bool = True) -> Iterator[IO]:
+    """
+    Crash-safe write: the content is written to a temporary file in the same directory,
+    which replaces [path] (atomically) once the context exits without an exception.
+    [path] either keeps its old content or has the complete new content.
+
+    :param path: file to write
+    :param mode: 'w' or 'wb'
+    :param encoding: text encoding
+    :param fsync: fsync the file (and directory) before / after renaming
+    """
+    if mode not in ('w', 'wb'):
+        raise ValueError(f'Unsupported mode {mode}')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        # mkstemp creates the file private, keep the permissions of the file being replaced
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        with open(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        # persist the rename
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def copy_file(src: str, dst: str, chunk_size: int = 64 * _DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Copy the contents of [src] to [dst] (created / truncated) in the kernel where possible
+    (copy_file_range, sendfile), falling back to a buffered copy.
+    [src] is copied until EOF, its reported size is only a hint
+    (procfs / sysfs files and pipes report 0 or a page).
+
+    :return: number of bytes copied
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        # files reporting size 0 are read, kernel copies cannot tell them apart from empty files
+        if os.fstat(fsrc.fileno()).st_size > 0:
+            for fn in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+                if fn is None:
+                    continue
+                try:
+                    copied = _copy_kernel(fn, fsrc.fileno(), fdst.fileno(), chunk_size)
+                except OSError:
+                    # not supported for these files (e.g. cross-device copy_file_range)
+                    copied = 0
+                if copied:
+                    return copied
+                # nothing copied although the file is not empty (e.g. sysfs), try the next one
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst, chunk_size)
+        return fdst.tell()
+
+
+def _copy_kernel(fn, src_fd: int, dst_fd: int, chunk_size: int) -> int:
+    offset = 0
+    # until EOF, the file may be longer than its size when the copy started
+    while True:
+        if fn is os.sendfile:
+            n = fn(dst_fd, src_fd, offset, chunk_size)
+        else:
+            n = fn(src_fd, dst_fd, chunk_size, offset, offset)
+        if n == 0:
+            return offset
+        offset += n
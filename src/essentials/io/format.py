@@ -8,13 +8,28 @@ Formatting utilities (pretty-print)
 
 import json
 from datetime import timedelta
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 
-def pformat(obj: Any, sink=None, prefix=''):
+def pformat(obj: Any, sink=None, prefix='', stream: bool = True):
+    """
+    Pretty-print [obj] as json
+
+    :param obj: object to format, strings are used as-is
+    :param sink: if given, called with each (prefixed) line instead of returning the string
+    :param prefix: prefix for each line passed to [sink]
+    :param stream: with a [sink], encode incrementally and pass lines on as soon as they are complete,
+                   so memory use is bounded by the longest line instead of the whole output
+    :return: the formatted string if no [sink] is given
+    """
     if obj is None:
         obj = {}
 
+    if sink is not None and stream and not isinstance(obj, str):
+        for line in _iter_lines(json.JSONEncoder(indent=4, sort_keys=True).iterencode(obj)):
+            sink(f'{prefix}{line}')
+        return
+
     if isinstance(obj, str):
         pretty = obj
     else:
@@ -26,6 +41,23 @@ def pformat(obj: Any, sink=None, prefix=''):
         return pretty
 
 
+def _iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Re-split a stream of string chunks into complete lines
+    """
+    pending = []
+    for chunk in chunks:
+        if '\n' not in chunk:
+            pending.append(chunk)
+            continue
+        first, *lines, last = chunk.split('\n')
+        pending.append(first)
+        yield ''.join(pending)
+        yield from lines
+        pending = [last]
+    yield ''.join(pending)
+
+
 __TIME_INDEX = [
     ('s', 60),
     ('m', 60),
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+Sampling, rate limiting and deduplication for high-frequency log call sites
+
+    logger = limited(get_logger('worker'), first=10, every=1000)
+    for item in items:
+        logger.debug('processing {}', item)  # formatted only if actually logged
+
+Policies (per call site, i.e. per source line calling the logger):
+    rate / burst:  token bucket, at most [rate] messages per second with bursts of up to [burst]
+    first / every: log the first [first] messages, then every [every]th
+    dedup:         collapse consecutive identical messages (per logger),
+                   a 'suppressed K repeated messages' line is logged when the message changes
+                   or at most every [dedup_interval] seconds
+
+Suppressed messages are counted and reported with the next message logged from the same call site.
+
+@author Kami-Kaze
+"""
+
+import sys
+import time
+from threading import Lock
+from typing import TYPE_CHECKING, Callable
+
+from essentials.io.logging import LogLevel, is_enabled, get_logger
+
+if TYPE_CHECKING:
+    import spdlog
+
+
+class _CallSite:
+    __slots__ = ('count', 'suppressed', 'tokens', 'updated')
+
+    def __init__(self, tokens: float):
+        self.count = 0
+        self.suppressed = 0
+        self.tokens = tokens
+        self.updated = time.monotonic()
+
+
+class LimitedLogger:
+    def __init__(
+            self,
+            logger: 'spdlog.Logger',
+            rate: float | None = None,
+            burst: int | None = None,
+            first: int | None = None,
+            every: int | None = None,
+            dedup: bool = False,
+            dedup_interval: float = 10.,
+    ):
+        """
+        See module documentation, policies can be combined (a message must pass all of them)
+        """
+        self._logger = logger
+        self._rate = rate
+        self._burst = burst if burst is not None else max(int(rate or 1), 1)
+        self._first = first
+        self._every = every
+        self._dedup = dedup
+        self._dedup_interval = dedup_interval
+
+        self._lock = Lock()
+        self._sites: dict[tuple, _CallSite] = {}
+
+        # dedup state
+        self._last: tuple[int, str] | None = None
+        self._repeated = 0
+        self._repeated_since = 0.
+
+    def log(self, level: int, msg: str | Callable[[], str], *args, **kwargs):
+        self._log(level, msg, args, kwargs)
+
+    def trace(self, msg: str | Callable[[], str], *args, **kwargs):
+        self._log(LogLevel.TRACE, msg, args, kwargs)
+
+    def debug(self, msg: str | Callable[[], str], *args, **kwargs):
+        self._log(LogLevel.DEBUG, msg, args, kwargs)
+
+    def info(self, msg: str | Callable[[], str], *args, **kwargs):
+        self._log(LogLevel.INFO, msg, args, kwargs)
+
+    def warn(self, msg: str | Callable[[], str], *args, **kwargs):
+        self._log(LogLevel.WARN, msg, args, kwargs)
+
+    def error(self, msg: str | Callable[[], str], *args, **kwargs):
+        self._log(LogLevel.ERR, msg, args, kwargs)
+
+    def critical(self, msg: str | Callable[[], str], *args, **kwargs):
+        self._log(LogLevel.CRITICAL, msg, args, kwargs)
+
+    def flush(self):
+        """
+        Log pending 'suppressed' summaries and flush the underlying logger
+        """
+        with self._lock:
+            self._flush_repeated()
+        self._logger.flush()
+
+    def __getattr__(self, item):
+        return getattr(self._logger, item)
+
+    def _log(self, level: int, msg, args, kwargs):
+        if not is_enabled(level):
+            return
+
+        # caller of log / debug / ...
+        frame = sys._getframe(2)
+        key = (frame.f_code, frame.f_lineno)
+
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                site = self._sites[key] = _CallSite(self._burst)
+
+            if not self._sample(site):
+                site.suppressed += 1
+                return
+
+            if callable(msg):
+                msg = msg()
+            elif args or kwargs:
+                msg = msg.format(*args, **kwargs)
+
+            if self._dedup:
+                now = time.monotonic()
+                if self._last == (level, msg):
+                    self._repeated += 1
+                    if self._repeated_since + self._dedup_interval <= now:
+                        self._flush_repeated()
+                        self._repeated_since = now
+                    return
+                self._flush_repeated()
+                self._last = (level, msg)
+                self._repeated_since = now
+
+            if site.suppressed:
+                msg = f'{msg} ({site.suppressed} similar messages suppressed)'
+                site.suppressed = 0
+
+        self._logger.log(level, msg)
+
+    def _sample(self, site: _CallSite) -> bool:
+        # lock must be held
+        site.count += 1
+        if self._first is not None and self._first < site.count:
+            if self._every is None or (site.count - self._first) % self._every:
+                return False
+        elif self._first is None and self._every is not None and (site.count - 1) % self._every:
+            return False
+
+        if self._rate is not None:
+            now = time.monotonic()
+            site.tokens = min(self._burst, site.tokens + (now - site.updated) * self._rate)
+            site.updated = now
+            if site.tokens < 1:
+                return False
+            site.tokens -= 1
+        return True
+
+    def _flush_repeated(self):
+        # lock must be held
+        if self._repeated:
+            level, msg = self._last
+            self._logger.log(level, f'suppressed {self._repeated} repeated messages: {msg}')
+            self._repeated = 0
+
+
+def limited(logger: 'spdlog.Logger | str', **policy) -> LimitedLogger:
+    """
+    Wrap a logger (or the logger of given name, see get_logger) with sampling / rate limiting / deduplication
+
+    :param logger: logger or logger name
+    :param policy: see LimitedLogger
+    """
+    if isinstance(logger, str):
+        logger = get_logger(logger)
+    return LimitedLogger(logger, **policy)
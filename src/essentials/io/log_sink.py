@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+"""
+Structured (JSON-lines) log file sink with size- and time-based rotation.
+
+Records are buffered and flushed by a background thread,
+which also gzip-compresses rotated files, so the logging thread
+never waits for compression (and rarely for disk I/O).
+
+Rotated files are named <path>.<YYYYmmddTHHMMSSffffff>[.gz],
+only the newest [backups] are kept.
+
+@author Kami-Kaze
+"""
+
+import glob
+import gzip
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+from threading import Condition, Thread
+
+_ROTATED_SUFFIX = '.%Y%m%dT%H%M%S%f'
+
+
+class RotatingJsonSink:
+    def __init__(
+            self,
+            path: str,
+            max_bytes: int = 10 << 20,
+            interval: float | None = None,
+            backups: int = 5,
+            compress: bool = True,
+            flush_interval: float = 1.,
+    ):
+        """
+        :param path: log file, appended to if it exists
+        :param max_bytes: rotate once the file exceeds this size (0: never)
+        :param interval: rotate once the file is older than this many seconds (None: never)
+        :param backups: number of rotated files to keep
+        :param compress: gzip rotated files (on the background thread)
+        :param flush_interval: seconds between background flushes
+        """
+        self._path = path
+        self._max_bytes = max_bytes
+        self._interval = interval
+        self._backups = backups
+        self._compress = compress
+        self._flush_interval = flush_interval
+
+        self._cond = Condition()
+        self._pending: list[str] = []
+        self._running = True
+
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.
+        self._open()
+
+        self._daemon = Thread(target=self._run, name='RotatingJsonSink', daemon=True)
+        self._daemon.start()
+
+    def write(self, logger: str, level: str, msg: str):
+        """
+        Append a record, rotating the file first if required
+        """
+        now = time.time()
+        line = json.dumps({
+            'time'  : datetime.fromtimestamp(now).isoformat(timespec='milliseconds'),
+            'logger': logger,
+            'level' : level,
+            'msg'   : msg,
+        }) + '\n'
+
+        with self._cond:
+            if self._file is None:
+                return
+            if self._should_rotate(now):
+                self._rotate()
+            self._file.write(line)
+            self._size += len(line)
+
+    def flush(self):
+        with self._cond:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """
+        Flush, finish pending compressions and close the file
+        """
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        self._daemon.join()
+        with self._cond:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        self._file = open(self._path, 'a', encoding='utf-8')
+        self._size = self._file.tell()
+        # an existing file counts as opened at its last modification, like logging.handlers.TimedRotatingFileHandler
+        self._opened_at = os.fstat(self._file.fileno()).st_mtime if self._size else time.time()
+
+    def _should_rotate(self, now: float) -> bool:
+        if 0 < self._max_bytes <= self._size:
+            return True
+        return self._interval is not None and self._opened_at + self._interval <= now
+
+    def _rotate(self):
+        # lock must be held
+        self._file.close()
+        rotated = f'{self._path}{datetime.now().strftime(_ROTATED_SUFFIX)}'
+        os.replace(self._path, rotated)
+        self._open()
+        self._pending.append(rotated)
+        self._cond.notify_all()
+
+    def _run(self):
+        # errors are reported and the loop continues, a dead flush thread would silently drop records
+        while True:
+            with self._cond:
+                if self._running and not self._pending:
+                    self._cond.wait(self._flush_interval)
+                pending, self._pending = self._pending, []
+                running = self._running
+                try:
+                    self._file.flush()
+                except OSError as e:
+                    _report(f'flushing {self._path} failed', e)
+
+            if pending:
+                if self._compress:
+                    for rotated in pending:
+                        self._compress_file(rotated)
+                self._prune()
+
+            if not running:
+                return
+
+    def _compress_file(self, rotated: str):
+        try:
+            with open(rotated, 'rb') as src, gzip.open(f'{rotated}.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        except OSError as e:
+            # keep the uncompressed file
+            _report(f'compressing {rotated} failed', e)
+            _remove(f'{rotated}.gz')
+        else:
+            _remove(rotated)
+
+    def _prune(self):
+        """
+        Remove the oldest rotated files beyond [backups], files still waiting for compression are skipped
+        """
+        with self._cond:
+            waiting = set(self._pending)
+        # timestamps sort lexicographically, oldest first
+        backups = sorted(
+                path for path in glob.glob(f'{glob.escape(self._path)}.*[0-9]') + glob.glob(f'{glob.escape(self._path)}.*[0-9].gz')
+                if path not in waiting and path.removesuffix('.gz') not in waiting
+        )
+        for old in backups[:max(len(backups) - self._backups, 0)]:
+            try:
+                _remove(old)
+            except OSError as e:
+                _report(f'removing {old} failed', e)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _report(msg: str, e: Exception):
+    print(f'ERROR: RotatingJsonSink: {msg}: {e}', file=sys.stderr)
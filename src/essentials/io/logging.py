@@ -3,6 +3,15 @@
 """
 TODO: Document logging configuration
 
+Environment variables:
+    log_level, log_file, log_file_level
+    log_async:          '1' / 'true' to create loggers in async mode (spdlog thread pool)
+    log_queue_size:     size of the async queue (default: 8192)
+    log_queue_overflow: 'block' (default) or 'overrun_oldest'
+    log_file_format:    'text' (default, truncated on start) or 'json' (JSON-lines, appended, see io.log_sink)
+    log_file_max_bytes, log_file_rotate_interval (seconds), log_file_backups, log_file_compress ('0' / '1'):
+                        rotation of 'json' log files
+
 Simple wrapper around (py-) spdlog
 https://github.com/bodgergely/spdlog-python
 https://github.com/gabime/spdlog
@@ -10,19 +19,47 @@ https://github.com/gabime/spdlog
 @author Kami-Kaze
 """
 
+import atexit
 import os
 import sys
+import time
 from functools import wraps
-from typing import Type, Callable, Any
+from threading import Lock
+from typing import TYPE_CHECKING, Type, Callable, Any
+
+from essentials.io.profiling import get_profile, profile_report
+
+if TYPE_CHECKING:
+    import spdlog
+
 
-import spdlog
+class LogLevel:
+    """
+    Log levels, same values as spdlog.LogLevel (plain ints in the binding).
+    Defined here so importing this module does not load spdlog, it is imported when the first logger is created.
+    """
+    TRACE = 0
+    DEBUG = 1
+    INFO = 2
+    WARN = 3
+    ERR = 4
+    CRITICAL = 5
+    OFF = 6
+
+
+def _spdlog():
+    import spdlog
+    return spdlog
 
-from spdlog import LogLevel as _LogLevel
-LogLevel = _LogLevel  # seems python doesn't like to re-import stuff w/o its own (?) name (from io.logging import LogLevel)
 
 _log_file_name_fallback = 'log.txt'
 _log_level_name_fallback = 'info'
 _log_file_level_name_fallback = 'debug'
+_log_queue_size_fallback = 8192
+_log_queue_overflow_fallback = 'block'
+_log_file_format_fallback = 'text'
+_log_file_max_bytes_fallback = 10 << 20
+_log_file_backups_fallback = 5
 _name_to_level_map = {
     'critical': LogLevel.CRITICAL,
     'error'   : LogLevel.ERR,
@@ -32,9 +69,29 @@ _name_to_level_map = {
     'trace'   : LogLevel.TRACE,
     'none'    : LogLevel.OFF,
 }
+# values of spdlog.AsyncOverflowPolicy
+_name_to_overflow_policy_map = {
+    'block'         : 0,
+    'overrun_oldest': 1,
+}
+
+_level_to_name_map = {level: name for name, level in _name_to_level_map.items()}
+
+
+def _env_number(name: str, fallback, parse=int):
+    value = os.environ.get(name)
+    if value is None:
+        return fallback
+    try:
+        return parse(value)
+    except ValueError:
+        print(f'ERROR: Invalid {name} {value}!', file=sys.stderr)
+        print(f'Using fallback: {fallback}', file=sys.stderr)
+        return fallback
+
 
 # initialize logging
-_loggers: dict[str, spdlog.Logger] = {}
+_loggers: dict[str, 'spdlog.Logger'] = {}
 _log_level_name = os.environ.get('log_level', _log_level_name_fallback)
 _log_file = os.environ.get('log_file', _log_file_name_fallback)
 _log_file_level_name = os.environ.get('log_file_level', _log_file_level_name_fallback)
@@ -46,22 +103,120 @@ if _log_level is None:
     print(f'Using fallback: {_log_level_name_fallback}', file=sys.stderr)
     _log_level = _name_to_level_map[_log_level_name_fallback]
 
-_console_sink = spdlog.stdout_sink_mt()
-_console_sink.set_level(_log_level)
-
 if _log_file_level is None and _log_file is not None:
     print(f'ERROR: Unknown log file level {_log_file_level_name}!', file=sys.stderr)
     print(f'Using fallback: {_log_file_level_name_fallback}', file=sys.stderr)
     _log_file_level = _name_to_level_map[_log_file_level_name_fallback]
 
-if _log_file == '':
-    _file_sink = spdlog.null_sink_mt()
-else:
-    _file_sink = spdlog.basic_file_sink_mt(_log_file, truncate=True)
-_file_sink.set_level(LogLevel.DEBUG)
+_log_file_format = os.environ.get('log_file_format', _log_file_format_fallback).lower()
+if _log_file_format not in ('text', 'json'):
+    print(f'ERROR: Unknown log file format {_log_file_format}!', file=sys.stderr)
+    print(f'Using fallback: {_log_file_format_fallback}', file=sys.stderr)
+    _log_file_format = _log_file_format_fallback
+_log_file_max_bytes = _env_number('log_file_max_bytes', _log_file_max_bytes_fallback)
+_log_file_rotate_interval = _env_number('log_file_rotate_interval', None, float)
+_log_file_backups = _env_number('log_file_backups', _log_file_backups_fallback)
+_log_file_compress = os.environ.get('log_file_compress', '1').lower() in ('1', 'true')
+
+# lowest level any sink accepts, messages below are discarded anyway
+_min_level = min(_log_level, _log_file_level if _log_file_format == 'json' else LogLevel.DEBUG)
+
+# async mode
+_log_async = os.environ.get('log_async', '').lower() in ('1', 'true')
+_log_queue_size = _env_number('log_queue_size', _log_queue_size_fallback)
+_log_queue_overflow_name = os.environ.get('log_queue_overflow', _log_queue_overflow_fallback)
+_log_queue_overflow = _name_to_overflow_policy_map.get(_log_queue_overflow_name.lower())
+
+if _log_queue_overflow is None:
+    print(f'ERROR: Unknown log queue overflow policy {_log_queue_overflow_name}!', file=sys.stderr)
+    print(f'Using fallback: {_log_queue_overflow_fallback}', file=sys.stderr)
+    _log_queue_overflow_name = _log_queue_overflow_fallback
+    _log_queue_overflow = _name_to_overflow_policy_map[_log_queue_overflow_fallback]
+
+_async_initialized = False
 
+# sinks are created by the first get_logger call (opening/truncating the log file is deferred until needed)
+_console_sink: 'spdlog.Sink | None' = None
+_file_sink: 'spdlog.Sink | None' = None
+_json_sink = None
+_sinks_lock = Lock()
+
+
+def _init_sinks() -> bool:
+    """
+    Create the console and file sinks
+
+    :return: True if the sinks were created by this call
+    """
+    global _console_sink, _file_sink, _json_sink
+    with _sinks_lock:
+        if _console_sink is not None:
+            return False
+        spdlog = _spdlog()
+
+        if _log_file == '':
+            file_sink = spdlog.null_sink_mt()
+            file_sink.set_level(LogLevel.DEBUG)
+            _file_sink = file_sink
+        elif _log_file_format == 'json':
+            from essentials.io.log_sink import RotatingJsonSink
+            _json_sink = RotatingJsonSink(
+                    _log_file,
+                    max_bytes=_log_file_max_bytes,
+                    interval=_log_file_rotate_interval,
+                    backups=_log_file_backups,
+                    compress=_log_file_compress,
+            )
+        else:
+            file_sink = spdlog.basic_file_sink_mt(_log_file, truncate=True)
+            file_sink.set_level(LogLevel.DEBUG)
+            _file_sink = file_sink
+
+        console_sink = spdlog.stdout_sink_mt()
+        console_sink.set_level(_log_level)
+        _console_sink = console_sink
+        return True
+
+
+def set_async_mode(queue_size: int = _log_queue_size, overflow: str = _log_queue_overflow_name):
+    """
+    (Re-) initialize the spdlog thread pool used by async loggers.
+    Loggers created afterwards with async_mode use a bounded queue of [queue_size] messages,
+    drained by a background thread.
+
+    :param queue_size: maximum number of queued messages
+    :param overflow: 'block' (wait for space) or 'overrun_oldest' (drop the oldest queued message)
+    """
+    global _async_initialized
+    policy = _name_to_overflow_policy_map.get(overflow.lower())
+    if policy is None:
+        raise ValueError(f'Unknown overflow policy {overflow}')
+    # the binding names the last argument overflow_policy (async_overflow_policy in the C++ code), pass positionally
+    _spdlog().set_async_mode(queue_size, 1, policy)
+    _async_initialized = True
+
+
+def is_enabled(level: int) -> bool:
+    """
+    Check whether a message of [level] would be written by any sink
+
+    :param level: log level
+    :return: True if messages of [level] are written
+    """
+    return _min_level <= level
+
+
+def get_logger(*name: str or Type, async_mode: bool | None = None) -> 'spdlog.Logger':
+    """
+    Get or create a logger
+
+    :param name: parts of the name, joined with ':'
+    :param async_mode: create the logger in async mode (default: log_async environment variable),
+                       only applies if the logger does not exist yet
+    """
+    if _console_sink is None and _init_sinks():
+        get_logger('core').debug('Logging initialized')
 
-def get_logger(*name: str or Type) -> spdlog.Logger:
     parts = []
 
     for part in name:
@@ -76,37 +231,190 @@ def get_logger(*name: str or Type) -> spdlog.Logger:
         sinks = [_console_sink]
         if _file_sink is not None:
             sinks.append(_file_sink)
-        logger = spdlog.SinkLogger(name, sinks)
+        if async_mode is None:
+            async_mode = _log_async
+        if async_mode and not _async_initialized:
+            set_async_mode(_log_queue_size, _log_queue_overflow_name)
+        spdlog = _spdlog()
+        logger = spdlog.SinkLogger(name, sinks, async_mode)
         logger.set_pattern('%T [%n|%l]: %v', spdlog.PatternTimeType.local)
         logger.set_level(LogLevel.TRACE)
+        if _json_sink is not None:
+            logger = _StructuredLogger(logger, name)
         _loggers[name] = logger
 
     return _loggers[name]
 
 
-def drop_logger(logger: spdlog.Logger) -> None:
+class _StructuredLogger:
+    """
+    Forwards records to the spdlog logger and the json file sink
+    """
+
+    def __init__(self, logger: 'spdlog.Logger', name: str):
+        self._logger = logger
+        self._name = name
+
+    def log(self, level: int, msg: str):
+        self._logger.log(level, msg)
+        if _log_file_level <= level:
+            _json_sink.write(self._name, _level_to_name_map.get(level, str(level)), msg)
+
+    def trace(self, msg: str):
+        self.log(LogLevel.TRACE, msg)
+
+    def debug(self, msg: str):
+        self.log(LogLevel.DEBUG, msg)
+
+    def info(self, msg: str):
+        self.log(LogLevel.INFO, msg)
+
+    def warn(self, msg: str):
+        self.log(LogLevel.WARN, msg)
+
+    def error(self, msg: str):
+        self.log(LogLevel.ERR, msg)
+
+    def critical(self, msg: str):
+        self.log(LogLevel.CRITICAL, msg)
+
+    def flush(self):
+        self._logger.flush()
+        _json_sink.flush()
+
+    def __getattr__(self, item):
+        return getattr(self._logger, item)
+
+
+class _LazyLogger:
+    """
+    Proxy creating the logger on first use, see lazy_logger()
+    """
+
+    def __init__(self, name: tuple):
+        self._name = name
+        self._logger = None
+
+    def __getattr__(self, item):
+        if self._logger is None:
+            self._logger = get_logger(*self._name)
+        return getattr(self._logger, item)
+
+
+def lazy_logger(*name: str or Type) -> 'spdlog.Logger':
+    """
+    Get a logger that is only created (see get_logger) when it is first used.
+    Use this for module level loggers, so importing a module does not initialize logging.
+    """
+    return _LazyLogger(name)
+
+
+def drop_logger(logger: 'spdlog.Logger') -> None:
     name = logger.name()
-    spdlog.drop(name)
+    _spdlog().drop(name)
     _loggers.pop(name)
 
 
-def log_call(logger: spdlog.Logger | str, log_level=LogLevel.DEBUG, name: str | None = None):
+def log_lazy(logger: 'spdlog.Logger', level: int, msg: str | Callable[[], str], *args, **kwargs) -> None:
+    """
+    Log a message, only building it if [level] is enabled.
+    e.g. log_lazy(logger, LogLevel.DEBUG, 'processed {} items in {:.2f}s', count, dt)
+      or log_lazy(logger, LogLevel.DEBUG, lambda: expensive_summary())
+
+    :param logger: logger to log to
+    :param level: log level
+    :param msg: str.format() format string (formatted with [args] and [kwargs]) or callable returning the message
+    """
+    if _min_level > level:
+        return
+    if callable(msg):
+        msg = msg()
+    elif args or kwargs:
+        msg = msg.format(*args, **kwargs)
+    logger.log(level, msg)
+
+
+def log_call(
+        logger: 'spdlog.Logger | str',
+        log_level=LogLevel.DEBUG,
+        name: str | None = None,
+        profile: bool = False,
+        sample_every: int = 1,
+        slow_threshold: float | None = None,
+):
+    """
+    Decorator logging each call of a function
+
+    :param logger: logger (or name of the logger) to log to
+    :param log_level: level of the call message
+    :param name: name to log (and to key the profile by), defaults to the function name
+                 (profiles: <module>.<qualified name>, so e.g. methods of different classes are kept apart)
+    :param profile: record wall and cpu time of calls in a histogram (see io.profiling)
+    :param sample_every: if [profile], only measure every Nth call
+    :param slow_threshold: if [profile], log a warning for measured calls slower than this (in seconds)
+    :raise ValueError: if [sample_every] is less than 1
+    """
+    if sample_every < 1:
+        raise ValueError(f'sample_every must be at least 1, got {sample_every}')
     if isinstance(logger, str):
-        logger = get_logger(logger)
+        logger = lazy_logger(logger)
 
     def decorator(f: Callable[..., Any]):
         f_name = name or f.__name__
 
+        if not profile:
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                if _min_level <= log_level:
+                    logger.log(log_level, f_name)
+                r = f(*args, **kwargs)
+                return r
+
+            return wrapper
+
+        call_profile = get_profile(name or f'{f.__module__}.{f.__qualname__}')
+        slow_ns = None if slow_threshold is None else int(slow_threshold * 1e9)
+
         @wraps(f)
-        def wrapper(*args, **kwargs):
-            logger.log(log_level, f'{f_name}')
-            r = f(*args, **kwargs)
-            return r
+        def profiled(*args, **kwargs):
+            if _min_level <= log_level:
+                logger.log(log_level, f_name)
+
+            call_profile.calls += 1
+            if call_profile.calls % sample_every:
+                return f(*args, **kwargs)
 
-        return wrapper
+            wall = time.perf_counter_ns()
+            cpu = time.thread_time_ns()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                cpu = time.thread_time_ns() - cpu
+                wall = time.perf_counter_ns() - wall
+                call_profile.wall.record(wall)
+                call_profile.cpu.record(cpu)
+                if slow_ns is not None and slow_ns < wall:
+                    logger.warn(f'{f_name} took {wall / 1e6:.3f}ms (cpu {cpu / 1e6:.3f}ms)')
+
+        return profiled
 
     return decorator
 
 
-_core_logger = get_logger('core')
-_core_logger.debug('Logging initialized')
+def log_profile_report(logger: 'spdlog.Logger | str', log_level=LogLevel.INFO) -> None:
+    """
+    Log the p50/p95/p99 report of all functions decorated with log_call(profile=True)
+    """
+    if isinstance(logger, str):
+        logger = get_logger(logger)
+    for line in profile_report():
+        logger.log(log_level, line)
+
+
+@atexit.register
+def _flush_loggers():
+    # async loggers may still have queued messages
+    for logger in _loggers.values():
+        logger.flush()
+    if _json_sink is not None:
+        _json_sink.close()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+"""
+Low-overhead latency histograms, used by log_call(profile=True)
+
+Histograms are log-linear (8 buckets per power of two, ~12.5% relative error)
+over integer nanoseconds, so recording is a few integer operations.
+
+@author Kami-Kaze
+"""
+
+import json
+from threading import Lock
+from typing import Any
+
+_PERCENTILES = (50, 95, 99)
+
+
+def _bucket(ns: int) -> int:
+    if ns < 8:
+        return max(ns, 0)
+    shift = ns.bit_length() - 4
+    return (shift << 3) + (ns >> shift)
+
+
+def _bucket_upper(index: int) -> int:
+    if index < 16:
+        return index
+    shift = (index >> 3) - 1
+    return (((index & 7) + 9) << shift) - 1
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self._lock = Lock()
+        self._buckets: dict[int, int] = {}
+        self._count = 0
+        self._total = 0
+        self._max = 0
+
+    def record(self, ns: int):
+        """
+        Record a single duration
+
+        :param ns: duration in nanoseconds
+        """
+        b = _bucket(ns)
+        with self._lock:
+            self._buckets[b] = self._buckets.get(b, 0) + 1
+            self._count += 1
+            self._total += ns
+            if self._max < ns:
+                self._max = ns
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def percentile(self, p: float) -> int:
+        """
+        :param p: percentile (0 - 100)
+        :return: upper bound of the bucket containing the [p]th percentile in nanoseconds
+        """
+        with self._lock:
+            if self._count == 0:
+                return 0
+            rank = self._count * p / 100
+            seen = 0
+            for b in sorted(self._buckets):
+                seen += self._buckets[b]
+                if rank <= seen:
+                    return min(_bucket_upper(b), self._max)
+            return self._max
+
+    def stats(self) -> dict[str, Any]:
+        """
+        :return: count, mean, max and percentiles in seconds
+        """
+        stats = {
+            'count': self._count,
+            'total': self._total / 1e9,
+            'mean' : self._total / self._count / 1e9 if self._count else 0.,
+            'max'  : self._max / 1e9,
+        }
+        for p in _PERCENTILES:
+            stats[f'p{p}'] = self.percentile(p) / 1e9
+        return stats
+
+
+class CallProfile:
+    """
+    Wall and cpu time histograms of a single function
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.reset()
+
+    def reset(self) -> None:
+        self.wall = LatencyHistogram()
+        self.cpu = LatencyHistogram()
+        self.calls = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'calls'  : self.calls,
+            'sampled': self.wall.count,
+            'wall'   : self.wall.stats(),
+            'cpu'    : self.cpu.stats(),
+        }
+
+
+_profiles: dict[str, CallProfile] = {}
+_profiles_lock = Lock()
+
+
+def get_profile(name: str) -> CallProfile:
+    with _profiles_lock:
+        if name not in _profiles:
+            _profiles[name] = CallProfile(name)
+        return _profiles[name]
+
+
+def reset_profiles() -> None:
+    # reset in place: decorated functions keep a reference to their profile
+    with _profiles_lock:
+        for p in _profiles.values():
+            p.reset()
+
+
+def profile_stats() -> dict[str, dict[str, Any]]:
+    """
+    :return: stats of all profiled functions, times in seconds
+    """
+    with _profiles_lock:
+        profiles = list(_profiles.values())
+    return {p.name: p.stats() for p in profiles}
+
+
+def _ms(seconds: float) -> str:
+    return f'{seconds * 1e3:.3f}ms'
+
+
+def profile_report() -> list[str]:
+    """
+    :return: one human readable line per profiled function, slowest (p99) first
+    """
+    lines = []
+    stats = profile_stats()
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]['wall']['p99']):
+        wall, cpu = s['wall'], s['cpu']
+        lines.append(
+                f'{name}: calls={s["calls"]} sampled={s["sampled"]} | '
+                f'wall p50={_ms(wall["p50"])} p95={_ms(wall["p95"])} p99={_ms(wall["p99"])} max={_ms(wall["max"])} | '
+                f'cpu mean={_ms(cpu["mean"])}'
+        )
+    return lines
+
+
+def export_profiles(path: str) -> None:
+    """
+    Write profile_stats() as json to [path]
+    """
+    with open(path, 'w') as f:
+        json.dump(profile_stats(), f, indent=2, sort_keys=True)
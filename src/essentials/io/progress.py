@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+Shared progress renderer
+
+A single background thread per output stream drives any number of
+spinners and progress bars. All items are rendered into one status line
+(separated by ' | '), written with a single flush per tick and only
+if the line changed.
+
+@author Kami-Kaze
+"""
+
+import abc
+import shutil
+import sys
+import time
+from threading import Lock, Thread, current_thread
+from typing import IO
+
+from essentials.tui.utilities import progress_line
+
+_SEPARATOR = ' | '
+
+
+class ProgressItem:
+    @abc.abstractmethod
+    def render(self, width: int) -> str:
+        """
+        Render the current state, called once per tick by the renderer
+
+        :param width: maximum number of characters available
+        """
+        raise NotImplementedError()
+
+
+class ProgressRenderer:
+    def __init__(self, sink: IO, interval: float = .25):
+        self._sink = sink
+        self._interval = interval
+        self._lock = Lock()
+        self._items: list[ProgressItem] = []
+        self._daemon: Thread | None = None
+        self._last = ''
+
+    def add(self, item: ProgressItem):
+        with self._lock:
+            self._items.append(item)
+            if self._daemon is None:
+                self._daemon = Thread(target=self._run, name='ProgressRenderer', daemon=True)
+                self._daemon.start()
+
+    def remove(self, item: ProgressItem):
+        """
+        Remove [item] and wait until the line was redrawn without it
+        (the line is cleared once the last item was removed)
+        """
+        with self._lock:
+            self._items.remove(item)
+            daemon = self._daemon
+            last = not self._items
+            if last:
+                self._daemon = None
+        if daemon is not None and last:
+            daemon.join()
+        else:
+            self._draw()
+
+    def _run(self):
+        try:
+            while True:
+                with self._lock:
+                    if self._daemon is not current_thread():
+                        break
+                self._draw()
+                time.sleep(self._interval)
+        finally:
+            # clear the line
+            with self._lock:
+                if self._daemon is current_thread():
+                    # the loop failed, let the next add() start a new renderer
+                    self._daemon = None
+                if self._last:
+                    self._write(f'\r{" " * len(self._last)}\r')
+                    self._last = ''
+
+    def _draw(self):
+        with self._lock:
+            if not self._items:
+                return
+            width = shutil.get_terminal_size().columns - 1
+            n = len(self._items)
+            item_width = max((width - len(_SEPARATOR) * (n - 1)) // n, 1)
+            line = _SEPARATOR.join(item.render(item_width)[:item_width] for item in self._items)
+
+            if line == self._last:
+                return
+            # pad to overwrite leftovers of a longer previous line
+            self._write(f'\r{line:<{len(self._last)}}')
+            self._last = line
+
+    def _write(self, text: str):
+        self._sink.write(text)
+        self._sink.flush()
+
+
+_renderers: dict[int, ProgressRenderer] = {}
+_renderers_lock = Lock()
+
+
+def get_renderer(sink: IO = None) -> ProgressRenderer:
+    """
+    Get the shared renderer of [sink] (default: sys.stdout)
+    """
+    sink = sink or sys.stdout
+    with _renderers_lock:
+        if id(sink) not in _renderers:
+            _renderers[id(sink)] = ProgressRenderer(sink)
+        return _renderers[id(sink)]
+
+
+class ProgressBar(ProgressItem):
+    def __init__(self, msg: str = '', sink: IO = None):
+        """
+        Plain-terminal progress bar, rendered by the shared renderer of [sink] (default: sys.stdout)
+        while used as context manager
+        """
+        self._msg = msg
+        self._progress = 0.
+        self._renderer = get_renderer(sink)
+
+    def __enter__(self):
+        self._renderer.add(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._renderer.remove(self)
+        return False
+
+    def update(self, progress: float, msg: str | None = None):
+        """
+        :param progress: progress from 0 to 1
+        :param msg: new message, None to keep the current one
+        """
+        self._progress = min(max(progress, 0.), 1.)
+        if msg is not None:
+            self._msg = msg
+
+    def render(self, width: int) -> str:
+        start = f'{self._msg} {self._progress:05.1%} ' if self._msg else f'{self._progress:05.1%} '
+        if width < len(start) + 2:
+            # no room for the bar (narrow terminal)
+            return start.rstrip()
+        return progress_line(self._progress, start, '', width)
@@ -8,49 +8,45 @@ Self-Updating Spinner
 
 import sys
 import time
-from threading import Thread
-from typing.io import IO
+from typing import IO
 
+from essentials.io.progress import ProgressItem, get_renderer
 
-class Spinner:
+
+class Spinner(ProgressItem):
     _STATES = ['|', '/', '-', '\\']
+    # seconds per state, independent of how often the line is redrawn
+    _STATE_TIME = .25
 
     def __init__(self, msg='', sink: IO = sys.stdout, flush: bool = False):
+        """
+        Spinner rendered by the shared renderer of [sink] (see io.progress) while used as context manager
+
+        :param flush: kept for compatibility, the renderer flushes once per tick
+        """
         self._msg = msg
-        self._state = 0
-        self._running = False
+        self._start = time.monotonic()
 
         self._sink = sink
         self._flush = flush
-        self._daemon: Thread = None
 
     def __enter__(self):
-        self._state = 0
-        self._running = True
-        self._daemon = Thread(target=self._print)
-        self._daemon.start()
+        self._start = time.monotonic()
+        get_renderer(self._sink).add(self)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._running = False
-        self._daemon.join()
+        get_renderer(self._sink).remove(self)
         return False
 
     def update(self, msg: str):
         self._msg = msg
 
-    def _print(self):
-        while self._running:
-            state = Spinner._STATES[self._state]
-            self._state = (self._state + 1) % len(Spinner._STATES)
-
-            text = ''
-            if self._msg:
-                text = f' {self._msg}'
-
-            print(f'\r{state}{text}', file=self._sink, flush=self._flush, end='')
-
-            time.sleep(.25)
+    def render(self, width: int) -> str:
+        frame = int((time.monotonic() - self._start) / Spinner._STATE_TIME)
+        state = Spinner._STATES[frame % len(Spinner._STATES)]
 
-        # FIXME: I think we need to 'blank the line' (e.g. print a lot of spaces)
-        print(f'\r', file=self._sink, flush=self._flush, end='')
+        text = ''
+        if self._msg:
+            text = f' {self._msg}'
+        return f'{state}{text}'
@@ -4,4 +4,21 @@
 
 """
 
-from .sorting import SortBy
+from essentials.util.lazy_import import lazy_exports
+
+# name -> (module, attribute or None for the module itself), imported on first access
+_LAZY = {
+    'SortBy'         : ('.sorting', 'SortBy'),
+    'CompositeSortBy': ('.sorting', 'CompositeSortBy'),
+    'top_k'          : ('.sorting', 'top_k'),
+    'batched'        : ('.chunking', 'batched'),
+    'chunked_by_size': ('.chunking', 'chunked_by_size'),
+    'windowed'       : ('.chunking', 'windowed'),
+    'thread_imap'    : ('.parallel', 'thread_imap'),
+    'process_imap'   : ('.parallel', 'process_imap'),
+    'external_sort'  : ('.external_sort', 'external_sort'),
+}
+
+__all__ = list(_LAZY)
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY)
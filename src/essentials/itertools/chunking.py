@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+Streaming chunking iterators, all run in constant memory (per chunk / window)
+
+"""
+
+from collections import deque
+from itertools import islice
+from typing import TypeVar, Iterable, Iterator, Callable
+
+_T = TypeVar('_T')
+
+
+def batched(iterable: Iterable[_T], n: int) -> Iterator[tuple[_T, ...]]:
+    """
+    Split [iterable] into tuples of [n] items, the last one may be shorter
+    e.g. batched('ABCDE', 2) -> AB CD E
+    """
+    if n < 1:
+        raise ValueError('n must be at least one')
+    it = iter(iterable)
+    while batch := tuple(islice(it, n)):
+        yield batch
+
+
+def chunked_by_size(iterable: Iterable[_T], max_size: int, size: Callable[[_T], int] = len) -> Iterator[list[_T]]:
+    """
+    Split [iterable] into lists whose total [size] does not exceed [max_size]
+    An item larger than [max_size] is yielded as a chunk of its own.
+    e.g. chunked_by_size(['aa', 'b', 'ccc', 'd'], 3) -> ['aa', 'b'] ['ccc'] ['d']
+
+    :param iterable: items to split
+    :param max_size: maximum total size of a chunk
+    :param size: size of an item
+    """
+    chunk = []
+    chunk_size = 0
+    for item in iterable:
+        item_size = size(item)
+        if chunk and max_size < chunk_size + item_size:
+            yield chunk
+            chunk = []
+            chunk_size = 0
+        chunk.append(item)
+        chunk_size += item_size
+    if chunk:
+        yield chunk
+
+
+def windowed(iterable: Iterable[_T], n: int, step: int = 1) -> Iterator[tuple[_T, ...]]:
+    """
+    Sliding windows of [n] items, advancing by [step] items
+    e.g. windowed('ABCDE', 3) -> ABC BCD CDE
+
+    Yields nothing if [iterable] has less than [n] items.
+    """
+    if n < 1 or step < 1:
+        raise ValueError('n and step must be at least one')
+    window = deque(maxlen=n)
+    skip = 0
+    for item in iterable:
+        window.append(item)
+        if len(window) < n:
+            continue
+        if skip == 0:
+            yield tuple(window)
+            skip = step
+        skip -= 1
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+External merge sort for iterables larger than memory.
+Chunks that fit a memory budget are sorted and spilled to temporary files as sorted runs,
+which are lazily k-way merged with heapq.merge.
+
+"""
+
+import heapq
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from typing import TypeVar, Iterable, Iterator, Callable, Any
+
+from .chunking import batched, chunked_by_size
+from .parallel import process_imap
+
+_T = TypeVar('_T')
+
+# number of items pickled together, also the read-ahead per run while merging
+_RUN_BATCH = 1024
+
+
+def _write_run(path: str, items: list, key: Callable[[Any], Any] | None, reverse: bool) -> str:
+    items.sort(key=key, reverse=reverse)
+    with open(path, 'wb') as f:
+        for batch in batched(items, _RUN_BATCH):
+            pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _write_run_args(args) -> str:
+    return _write_run(*args)
+
+
+def _read_run(path: str) -> Iterator:
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+def external_sort(
+        iterable: Iterable[_T],
+        key: Callable[[_T], Any] | None = None,
+        reverse: bool = False,
+        memory_budget: int = 64 << 20,
+        size: Callable[[_T], int] = sys.getsizeof,
+        num_workers: int = 0,
+        tmp_dir: str | None = None,
+) -> Iterator[_T]:
+    """
+    Sort [iterable] without holding all items in memory (stable, same result as sorted())
+
+    :param iterable: items to sort, must be picklable
+    :param key: sort key (e.g. a SortBy), must be picklable if [num_workers] is used
+    :param reverse: sort descending
+    :param memory_budget: approximate memory (as measured by [size]) used for one run
+    :param size: approximate memory used by an item
+    :param num_workers: sort runs in this many processes in parallel (0: sort in this process)
+    :param tmp_dir: directory for the runs (default: system temp directory)
+    :return: generator over the sorted items, runs are deleted when it is exhausted or closed
+    """
+    chunks = chunked_by_size(iterable, memory_budget, size)
+
+    first = next(chunks, None)
+    if first is None:
+        return
+    second = next(chunks, None)
+    if second is None:
+        # fits into memory, no need to spill
+        first.sort(key=key, reverse=reverse)
+        yield from first
+        return
+
+    # drop local references, so a chunk can be freed as soon as its run is written
+    pending = [first, second]
+    del first, second
+
+    run_dir = tempfile.mkdtemp(prefix='external_sort_', dir=tmp_dir)
+    try:
+        def run_args():
+            i = 0
+            while pending:
+                yield os.path.join(run_dir, f'run{i}'), pending.pop(0), key, reverse
+                i += 1
+            for chunk in chunks:
+                yield os.path.join(run_dir, f'run{i}'), chunk, key, reverse
+                i += 1
+
+        if num_workers:
+            runs = list(process_imap(_write_run_args, run_args(), num_workers, prefetch=num_workers))
+        else:
+            runs = [_write_run_args(args) for args in run_args()]
+
+        yield from heapq.merge(*[_read_run(run) for run in runs], key=key, reverse=reverse)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
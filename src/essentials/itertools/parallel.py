@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+Streaming parallel map with backpressure.
+Items are pulled from the input iterator only as results are consumed,
+at most [prefetch] items are in flight at any time.
+
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import TypeVar, Iterable, Iterator, Callable
+
+_T = TypeVar('_T')
+_R = TypeVar('_R')
+
+
+def _imap_ordered(executor: Executor, fn: Callable[[_T], _R], it: Iterator[_T], prefetch: int) -> Iterator[_R]:
+    pending: deque[Future] = deque(executor.submit(fn, item) for item in islice(it, prefetch))
+    while pending:
+        result = pending.popleft().result()
+        for item in islice(it, 1):
+            pending.append(executor.submit(fn, item))
+        yield result
+
+
+def _imap_unordered(executor: Executor, fn: Callable[[_T], _R], it: Iterator[_T], prefetch: int) -> Iterator[_R]:
+    pending: set[Future] = set(executor.submit(fn, item) for item in islice(it, prefetch))
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            # one new item per result handed out (like _imap_ordered), not per completed task
+            for item in islice(it, 1):
+                pending.add(executor.submit(fn, item))
+            yield result
+
+
+def _imap(executor: Executor, fn, iterable, prefetch: int, ordered: bool):
+    if prefetch < 1:
+        raise ValueError('prefetch must be at least one')
+    try:
+        if ordered:
+            yield from _imap_ordered(executor, fn, iter(iterable), prefetch)
+        else:
+            yield from _imap_unordered(executor, fn, iter(iterable), prefetch)
+    finally:
+        # also reached if the consumer stops early or a task failed
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def thread_imap(
+        fn: Callable[[_T], _R],
+        iterable: Iterable[_T],
+        num_workers: int = 5,
+        prefetch: int | None = None,
+        ordered: bool = True,
+) -> Iterator[_R]:
+    """
+    Lazily map [fn] over [iterable] using a thread pool
+
+    :param fn: function to apply
+    :param iterable: input items, may be unbounded
+    :param num_workers: number of threads
+    :param prefetch: maximum number of items in flight (default: 2 * num_workers)
+    :param ordered: yield results in input order, otherwise in completion order
+    :return: iterator over the results
+    """
+    if prefetch is None:
+        prefetch = 2 * num_workers
+    return _imap(ThreadPoolExecutor(max_workers=num_workers), fn, iterable, prefetch, ordered)
+
+
+def process_imap(
+        fn: Callable[[_T], _R],
+        iterable: Iterable[_T],
+        num_workers: int | None = None,
+        prefetch: int | None = None,
+        ordered: bool = True,
+) -> Iterator[_R]:
+    """
+    Lazily map [fn] over [iterable] using a process pool.
+    [fn], the items and the results must be picklable.
+
+    :param fn: function to apply
+    :param iterable: input items, may be unbounded
+    :param num_workers: number of processes (default: os.cpu_count())
+    :param prefetch: maximum number of items in flight (default: 2 * num_workers)
+    :param ordered: yield results in input order, otherwise in completion order
+    :return: iterator over the results
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    if prefetch is None:
+        prefetch = 2 * num_workers
+    return _imap(ProcessPoolExecutor(max_workers=num_workers), fn, iterable, prefetch, ordered)
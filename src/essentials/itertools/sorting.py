@@ -4,25 +4,97 @@
 
 """
 
-from typing import TypeVar, Generic, Callable
+import heapq
+from typing import TypeVar, Generic, Callable, Iterable, Any
 
 _T = TypeVar('_T')
 _K = TypeVar('_K')
 
 
+class _Reversed:
+    """
+    Sort key wrapper inverting the order of arbitrary comparable values
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: '_Reversed'):
+        return other.value < self.value
+
+    def __gt__(self, other: '_Reversed'):
+        return other.value > self.value
+
+    def __eq__(self, other):
+        return isinstance(other, _Reversed) and self.value == other.value
+
+
 class SortBy(Generic[_T, _K]):
-    def __init__(self, prop: Callable[[_T], _K], priorities: list[_K] = None):
+    def __init__(self, prop: Callable[[_T], _K], priorities: list[_K] = None, reverse: bool = False):
+        """
+        :param prop: property to sort by
+        :param priorities: if given, sort by position of the property value in [priorities],
+                           unknown values are sorted to the end
+        :param reverse: sort descending
+        """
         self._property = prop
         self._priorities = priorities
+        self._reverse = reverse
+        self._ranks = None
+        self._unknown_rank = 0
+        if priorities is not None:
+            # first occurrence wins, same as list.index
+            self._ranks = {}
+            for i, val in enumerate(priorities):
+                self._ranks.setdefault(val, i)
+            self._unknown_rank = len(priorities) + 1
 
     def __call__(self, item):
         val = self._property(item)
-        # sort by value
-        if self._priorities is None:
-            return val
         # sort by priorities
-        try:
-            return self._priorities.index(val)
-        except ValueError:
-            # sort unknown to end
-            return len(self._priorities) + 1
+        if self._ranks is not None:
+            val = self._ranks.get(val, self._unknown_rank)
+        if not self._reverse:
+            return val
+        if isinstance(val, (int, float)):
+            return -val
+        return _Reversed(val)
+
+    def then(self, prop: Callable[[_T], Any], priorities: list = None, reverse: bool = False) -> 'CompositeSortBy[_T]':
+        """
+        Chain another sort key, used to order items that compare equal by [this]
+        e.g. SortBy(lambda t: t.status, [...]).then(lambda t: t.eta, reverse=True)
+
+        :return: composite sort key
+        """
+        return CompositeSortBy(self, SortBy(prop, priorities, reverse))
+
+
+class CompositeSortBy(Generic[_T]):
+    def __init__(self, *keys: Callable[[_T], Any]):
+        self._keys = keys
+
+    def __call__(self, item):
+        return tuple(key(item) for key in self._keys)
+
+    def then(self, prop: Callable[[_T], Any], priorities: list = None, reverse: bool = False) -> 'CompositeSortBy[_T]':
+        """
+        Chain another sort key, see SortBy.then()
+        """
+        return CompositeSortBy(*self._keys, SortBy(prop, priorities, reverse))
+
+
+def top_k(items: Iterable[_T], k: int, key: Callable[[_T], Any] = None) -> list[_T]:
+    """
+    Partial sort: get the first [k] items in sorted order, without sorting everything.
+    Equivalent to sorted(items, key=key)[:k] (stable).
+
+    :param items: items to sort
+    :param k: number of items to return
+    :param key: sort key
+    :return: the first k items in sorted order
+    """
+    if k <= 0:
+        return []
+    return heapq.nsmallest(k, items, key=key)
@@ -4,5 +4,15 @@
 
 """
 
-from .processor import MTProcessor
-from .task import Task, TaskStatus
+from essentials.util.lazy_import import lazy_exports
+
+# name -> (module, attribute or None for the module itself), imported on first access
+_LAZY = {
+    'MTProcessor': ('.processor', 'MTProcessor'),
+    'Task'       : ('.task', 'Task'),
+    'TaskStatus' : ('.task', 'TaskStatus'),
+}
+
+__all__ = list(_LAZY)
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY)
@@ -85,7 +85,8 @@ class MTProcessor:
                                    sort=SortBy(
                                            lambda t: t.status,
                                            [TaskStatus.PREPARING, TaskStatus.IN_PROGRESS, TaskStatus.FAILED, TaskStatus.COMPLETED]
-                                   ))
+                                   ),
+                                   partial_sort=True)
 
         with ThreadPoolExecutor(max_workers=self._num_workers) as pool:
             # queue tasks
@@ -4,6 +4,15 @@
 
 """
 
-from .scrollable_list import ScrollableList
-from . import formatter
-from . import utilities
+from essentials.util.lazy_import import lazy_exports
+
+# name -> (module, attribute or None for the module itself), imported on first access
+_LAZY = {
+    'ScrollableList': ('.scrollable_list', 'ScrollableList'),
+    'formatter'     : ('.formatter', None),
+    'utilities'     : ('.utilities', None),
+}
+
+__all__ = list(_LAZY)
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY)
@@ -7,6 +7,7 @@
 from typing import TypeVar, Generic, Callable, Iterable
 
 from .formatter import Formatter
+from ..itertools.sorting import top_k
 
 _T = TypeVar('_T')
 
@@ -16,11 +17,17 @@ class ScrollableList(Generic[_T]):
                  items: Iterable[_T],
                  formatter: Formatter[_T] or None = None,
                  filter: Callable[[_T], bool] or None = None,
-                 sort: Callable[[_T], int] or None = None):
+                 sort: Callable[[_T], int] or None = None,
+                 partial_sort: bool = False):
+        """
+        :param partial_sort: only sort the items that can be visible (see itertools.top_k)
+                             every item must be formatted to at least one line
+        """
         self._items = items
         self._formatter = formatter
         self._filter = filter
         self._sort = sort
+        self._partial_sort = partial_sort
         self._max_lines = 0
         self._max_scroll = 0
         self._scroll_offset = 0
@@ -53,7 +60,17 @@ class ScrollableList(Generic[_T]):
         items = self._items
         if self._filter is not None:
             items = filter(self._filter, items)
-        if self._sort is not None:
+
+        # with partial sorting only the first [visible] items are formatted,
+        # each takes at least one line, so there are enough lines to fill the screen
+        # (if there are more items the line count is unknown and the offset needs no clamping)
+        partial = False
+        if self._sort is not None and self._partial_sort:
+            items = list(items)
+            visible = max(self._scroll_offset, 0) + max_lines
+            partial = visible < len(items)
+            items = top_k(items, visible, key=self._sort)
+        elif self._sort is not None:
             items = sorted(items, key=self._sort)
 
         lines = []
@@ -67,10 +84,10 @@ class ScrollableList(Generic[_T]):
         # calculate actual offset
         if self._scroll_offset < 0:
             self._scroll_offset = 0
-        elif count <= self._scroll_offset:
-            self._scroll_offset = 0
-
-        if count < max_lines:
+        elif partial:
+            # more items than formatted, the offset is always valid
+            pass
+        elif count <= self._scroll_offset or count < max_lines:
             self._scroll_offset = 0
         else:
             self._scroll_offset = min(self._scroll_offset, count - max_lines)
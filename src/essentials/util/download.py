@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+"""
+Resumable, parallel file downloads.
+Large files are fetched with concurrent HTTP range requests straight into the target file,
+progress is kept in a sidecar state file so interrupted downloads continue where they stopped.
+
+@author Kami-Kaze
+"""
+
+import hashlib
+import json
+import os
+import time
+from threading import Event, Lock
+from typing import Callable
+
+import requests
+
+from essentials.io.file import atomic_write
+from essentials.itertools.parallel import thread_imap
+from essentials.util.http import shared_session
+
+# bytes per read from the network / from disk (checksum catch up)
+_CHUNK_SIZE = 1 << 16
+_READ_SIZE = 1 << 20
+_MIN_PART_SIZE = 8 << 20
+_TIMEOUT = 10.
+# seconds between writes of the state file
+_STATE_INTERVAL = 1.
+
+_PART_SUFFIX = '.part'
+_STATE_SUFFIX = '.part.json'
+
+
+class _Part:
+    __slots__ = ('start', 'end', 'done')
+
+    def __init__(self, start: int, end: int, done: int):
+        # byte range [start, end), bytes [start, done) are on disk
+        self.start = start
+        self.end = end
+        self.done = done
+
+
+class _Download:
+    """
+    State of one download: parts, incremental checksum and the sidecar state file
+    """
+
+    def __init__(
+            self, path: str, url: str, size: int, etag: str | None, parts: list[_Part],
+            algorithm: str | None, progress: Callable[[int, int], None] | None,
+    ):
+        self.path = path
+        self.url = url
+        self.size = size
+        self.etag = etag
+        self.parts = parts
+        self.progress = progress
+        # only ranged downloads can be resumed
+        self.resumable = bool(parts)
+
+        self.lock = Lock()
+        self.cancelled = Event()
+        self._saved = 0.
+
+        # the checksum is fed in file order: data at the hash position is hashed as it arrives,
+        # data other parts wrote ahead of it is read back once the hash position reaches it
+        self._hash = hashlib.new(algorithm) if algorithm else None
+        self._hash_pos = 0
+        if self._hash is not None and self.resumable:
+            # data of a previous attempt
+            self._catch_up()
+
+    @property
+    def part_path(self) -> str:
+        return self.path + _PART_SUFFIX
+
+    @property
+    def state_path(self) -> str:
+        return self.path + _STATE_SUFFIX
+
+    @property
+    def done(self) -> int:
+        return sum(part.done - part.start for part in self.parts)
+
+    def wrote(self, part: _Part, offset: int, data: bytes):
+        """
+        Record that [data] was written at [offset]
+        """
+        with self.lock:
+            part.done = offset + len(data)
+            if self._hash is not None and offset == self._hash_pos:
+                self._hash.update(data)
+                self._hash_pos += len(data)
+                if self.resumable and self._hash_pos == part.end:
+                    self._catch_up()
+            if self.resumable and (now := time.monotonic()) - self._saved > _STATE_INTERVAL:
+                self._saved = now
+                self._save_state()
+        if self.progress is not None:
+            self.progress(self.done, self.size)
+
+    def _catch_up(self):
+        """
+        Hash data that was written ahead of the hash position
+        """
+        with open(self.part_path, 'rb', buffering=0) as f:
+            for part in self.parts:
+                if part.end <= self._hash_pos:
+                    continue
+                if part.start > self._hash_pos or part.done <= self._hash_pos:
+                    break
+                f.seek(self._hash_pos)
+                while self._hash_pos < part.done:
+                    data = f.read(min(_READ_SIZE, part.done - self._hash_pos))
+                    self._hash.update(data)
+                    self._hash_pos += len(data)
+                if part.done < part.end:
+                    break
+
+    def hexdigest(self) -> str | None:
+        with self.lock:
+            if self._hash is None:
+                return None
+            if self.resumable:
+                self._catch_up()
+            if self._hash_pos != self.size:
+                raise RuntimeError(f'Download of {self.url} is incomplete')
+            return self._hash.hexdigest()
+
+    def save_state(self):
+        if self.resumable:
+            with self.lock:
+                self._save_state()
+
+    def _save_state(self):
+        state = {
+            'url'  : self.url,
+            'size' : self.size,
+            'etag' : self.etag,
+            'parts': [(part.start, part.end, part.done) for part in self.parts],
+        }
+        with atomic_write(self.state_path, fsync=False) as f:
+            json.dump(state, f)
+
+
+def _probe(session: requests.Session, url: str, timeout: float) -> tuple[str, int | None, str | None, bool]:
+    """
+    :return: final url (after redirects), size, etag, True if range requests are supported
+    """
+    r = session.head(url, allow_redirects=True, timeout=timeout)
+    r.raise_for_status()
+    size = r.headers.get('Content-Length')
+    encoding = r.headers.get('Content-Encoding', 'identity')
+    ranges = r.headers.get('Accept-Ranges', '').lower() == 'bytes' and encoding == 'identity'
+    return r.url, int(size) if size is not None and encoding == 'identity' else None, r.headers.get('ETag'), ranges
+
+
+def _resume(path: str, url: str, size: int, etag: str | None) -> list[_Part] | None:
+    """
+    :return: parts of a previous download of the same content or None
+    """
+    try:
+        with open(path + _STATE_SUFFIX, 'rb') as f:
+            state = json.load(f)
+        if state['size'] != size or state['etag'] != etag or (etag is None and state['url'] != url):
+            return None
+        if os.path.getsize(path + _PART_SUFFIX) != size:
+            return None
+        return [_Part(*part) for part in state['parts']]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _split(size: int, num_parts: int) -> list[_Part]:
+    step = -(-size // num_parts)
+    return [_Part(start, min(start + step, size), start) for start in range(0, size, step)]
+
+
+def download(
+        url: str,
+        path: str,
+        checksum: str | None = None,
+        algorithm: str = 'sha256',
+        session: requests.Session | None = None,
+        num_workers: int = 4,
+        min_part_size: int = _MIN_PART_SIZE,
+        timeout: float = _TIMEOUT,
+        progress: Callable[[int, int], None] | None = None,
+) -> str:
+    """
+    Download [url] to [path]
+
+    Data is streamed into <path>.part and renamed to [path] once complete (and verified).
+    If the server supports range requests, files larger than [min_part_size] are split into
+    up to [num_workers] parts downloaded concurrently, and progress is recorded in <path>.part.json,
+    so calling download again after an interruption only fetches the missing bytes.
+
+    :param url: file to download
+    :param path: target file
+    :param checksum: expected hex digest of the content, None to skip verification
+    :param algorithm: hashlib algorithm of [checksum]
+    :param session: session to use, None for the shared pooled session
+    :param num_workers: maximum number of concurrent requests
+    :param min_part_size: minimum number of bytes per part
+    :param timeout: seconds to wait for connecting / receiving data
+    :param progress: called with (bytes done, total bytes or None) while downloading
+    :return: [path]
+    :raise requests.RequestException: if a request fails (the partial download is kept)
+    :raise ValueError: if the checksum does not match (the partial download is removed)
+    """
+    session = session or shared_session()
+    url, size, etag, ranges = _probe(session, url, timeout)
+
+    if not ranges or not size:
+        dl = _Download(path, url, size, etag, [], algorithm if checksum else None, progress)
+        _download_stream(session, dl, timeout)
+    else:
+        parts = _resume(path, url, size, etag)
+        if parts is None:
+            with open(path + _PART_SUFFIX, 'wb') as f:
+                f.truncate(size)
+            parts = _split(size, max(1, min(num_workers, size // max(1, min_part_size))))
+        dl = _Download(path, url, size, etag, parts, algorithm if checksum else None, progress)
+        dl.save_state()
+
+        def fetch(part: _Part):
+            try:
+                _download_part(session, dl, part, timeout)
+            except BaseException:
+                # stop the other parts early, the state file keeps their progress
+                dl.cancelled.set()
+                raise
+
+        try:
+            for _ in thread_imap(fetch, [part for part in parts if part.done < part.end], num_workers, ordered=False):
+                pass
+        finally:
+            dl.save_state()
+
+    if checksum is not None and (digest := dl.hexdigest()) != checksum.lower():
+        _remove(dl.part_path, dl.state_path)
+        raise ValueError(f'Checksum mismatch for {url}: expected {checksum}, got {digest}')
+    os.replace(dl.part_path, path)
+    _remove(dl.state_path)
+    return path
+
+
+def _download_part(session: requests.Session, dl: _Download, part: _Part, timeout: float):
+    headers = {'Range': f'bytes={part.done}-{part.end - 1}', 'Accept-Encoding': 'identity'}
+    if dl.etag is not None:
+        headers['If-Range'] = dl.etag
+    with session.get(dl.url, headers=headers, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise RuntimeError(f'Server ignored range request for {dl.url} (status {r.status_code})')
+        with open(dl.part_path, 'r+b', buffering=0) as f:
+            f.seek(part.done)
+            for data in r.iter_content(_CHUNK_SIZE):
+                if dl.cancelled.is_set():
+                    return
+                data = data[:part.end - part.done]
+                offset = part.done
+                f.write(data)
+                dl.wrote(part, offset, data)
+                if part.done == part.end:
+                    break
+    if part.done != part.end:
+        raise requests.ConnectionError(f'Connection closed after {part.done - part.start} of '
+                                       f'{part.end - part.start} bytes of {dl.url}')
+
+
+def _download_stream(session: requests.Session, dl: _Download, timeout: float):
+    """
+    Single request download, used if the server does not support range requests
+    """
+    with session.get(dl.url, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        part = _Part(0, 0, 0)
+        dl.parts.append(part)
+        with open(dl.part_path, 'wb', buffering=0) as f:
+            for data in r.iter_content(_CHUNK_SIZE):
+                f.write(data)
+                offset = part.done
+                part.end = offset + len(data)
+                dl.wrote(part, offset, data)
+    dl.size = part.end
+
+
+def _remove(*paths: str):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
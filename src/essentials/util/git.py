@@ -5,7 +5,7 @@
 @author Kami-Kaze
 """
 
-_GIT_URL = 'https://github.com'
+_GIT_URL = 'github.com'
 _GIT_USER_CONTENT_URL = 'raw.githubusercontent.com'
 
 
@@ -19,3 +19,34 @@ def releases_url(owner: str, repo: str, latest: bool) -> str:
 
 def file_url(owner: str, repo: str, path: str, branch: str = 'main') -> str:
     return f'{repo_url(_GIT_USER_CONTENT_URL, owner, repo, branch)}/{path}'
+
+
+def release_asset_url(owner: str, repo: str, name: str, tag: str | None = None) -> str:
+    """
+    :param name: file name of the asset
+    :param tag: release tag, None for the latest release
+    """
+    release = f'download/{tag}' if tag else 'latest/download'
+    return f'{repo_url(_GIT_URL, owner, repo)}/releases/{release}/{name}'
+
+
+def download_release_asset(owner: str, repo: str, name: str, path: str, tag: str | None = None, **kwargs) -> str:
+    """
+    Download a release asset to [path], see essentials.util.download.download for [kwargs]
+    (e.g. checksum, num_workers, progress)
+
+    :return: [path]
+    """
+    # imported here, the url helpers should not pull in requests
+    from essentials.util.download import download
+    return download(release_asset_url(owner, repo, name, tag), path, **kwargs)
+
+
+def download_file(owner: str, repo: str, file: str, path: str, branch: str = 'main', **kwargs) -> str:
+    """
+    Download a file of the repository to [path], see essentials.util.download.download for [kwargs]
+
+    :return: [path]
+    """
+    from essentials.util.download import download
+    return download(file_url(owner, repo, file, branch), path, **kwargs)
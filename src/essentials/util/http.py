@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+"""
+Shared HTTP session
+
+@author Kami-Kaze
+"""
+
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_POOL_SIZE = 16
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = Lock()
+
+
+def shared_session() -> requests.Session:
+    """
+    :return: process wide session, connections are pooled and reused across requests
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = requests.Session()
+            adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE)
+            _SESSION.mount('http://', adapter)
+            _SESSION.mount('https://', adapter)
+        return _SESSION
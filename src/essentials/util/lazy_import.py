@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""
+Lazy package exports (PEP 562), keeps importing a package cheap
+when only some of its submodules are used.
+
+@author Kami-Kaze
+"""
+
+# no typing import: it would cost more than the lazy packages save
+import importlib
+import sys
+
+
+def lazy_exports(package: str, exports: dict[str, tuple[str, str | None]]) -> tuple:
+    """
+    Create the module level __getattr__ and __dir__ of [package], e.g.
+        __getattr__, __dir__ = lazy_exports(__name__, {'SortBy': ('.sorting', 'SortBy')})
+
+    :param package: __name__ of the package
+    :param exports: name -> (module relative to [package], attribute or None for the module itself),
+                    imported on first access and cached in the package namespace
+    :return: __getattr__, __dir__
+    """
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+        module, attr = exports[name]
+        value = importlib.import_module(module, package)
+        if attr is not None:
+            value = getattr(value, attr)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
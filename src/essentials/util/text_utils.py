@@ -4,10 +4,161 @@
 
 @author Kami-Kaze
 """
-from typing import Callable, TypeVar
+from array import array
+from typing import IO, Any, Callable, Iterable, Iterator, Sequence, TypeVar
 
 _SPLIT_TYPE = TypeVar('_SPLIT_TYPE')
 
 
 def split_parse(value: str, separator: str, parse: Callable[[str], _SPLIT_TYPE]) -> list[_SPLIT_TYPE]:
     return [parse(part) for part in value.split(separator)]
+
+
+_DEFAULT_CHUNK_SIZE = 1 << 20
+
+# array typecodes of the builtin converters
+_TYPECODES = {int: 'q', float: 'd'}
+
+# column spec: converter, converter + array typecode / numpy dtype
+ColumnSpec = Callable[[str], Any] | tuple[Callable[[str], Any], Any]
+
+
+def parse_columns(
+        source: str | IO[str] | Iterable[str],
+        separator: str,
+        converters: Sequence[ColumnSpec] | dict[int, ColumnSpec],
+        header: bool = False,
+        output: str = 'array',
+        chunk_size: int = _DEFAULT_CHUNK_SIZE,
+        encoding: str = 'utf-8',
+) -> Iterator[tuple]:
+    """
+    Columnar split_parse for large delimited files.
+    The input is read in chunks of about [chunk_size] characters, each chunk is split at once
+    and converted column by column, so memory use only depends on [chunk_size].
+    There is no quoting / escaping, use the csv module for such files.
+    Empty lines are skipped (like csv / numpy.loadtxt), line numbers in errors still count them.
+
+    Columns of int / float (or with an explicit typecode / dtype) are emitted as array.array
+    (output='array') or numpy arrays (output='numpy'), all others as lists.
+
+    :param source: path, text file or iterable of lines
+    :param separator: field separator
+    :param converters: one converter per column (sequence) or column index -> converter (dict, other columns
+                       are skipped). A converter is a callable (int, float, str, ...) or a (callable, typecode) tuple,
+                       where typecode is an array typecode or numpy dtype
+    :param header: skip the first line
+    :param output: 'array', 'numpy' or 'list'
+    :param chunk_size: number of characters per batch
+    :param encoding: encoding used if [source] is a path
+    :return: iterator over batches, tuples with one column per converter
+    :raise ValueError: if a line has the wrong number of fields or a value cannot be converted
+    """
+    if output not in ('array', 'numpy', 'list'):
+        raise ValueError(f'Unknown output {output!r}')
+    if output == 'numpy':
+        import numpy
+
+    if not isinstance(converters, dict):
+        converters = dict(enumerate(converters))
+    columns = []
+    for index, spec in converters.items():
+        convert, typecode = spec if isinstance(spec, tuple) else (spec, _TYPECODES.get(spec))
+        columns.append((index, convert, typecode))
+
+    num_fields = None
+    line_number = 1
+    for block in _line_blocks(source, chunk_size, encoding):
+        if header:
+            header = False
+            block = block.partition('\n')[2]
+            line_number += 1
+            if not block:
+                continue
+
+        # physical lines, including empty ones
+        block_lines = block.count('\n') + 1
+        lines = block
+        if not block or '\n\n' in block or block[0] == '\n' or block[-1] == '\n':
+            lines = '\n'.join(filter(None, block.split('\n')))
+            if not lines:
+                line_number += block_lines
+                continue
+
+        num_lines = lines.count('\n') + 1
+        if num_fields is None:
+            end = lines.find('\n')
+            num_fields = lines.count(separator, 0, end if end != -1 else len(lines)) + 1
+            if (missing := [i for i, _, _ in columns if i >= num_fields]):
+                raise ValueError(f'Columns {missing} do not exist, lines have {num_fields} fields')
+        # line ends become fields of their own, they must follow every [num_fields] fields,
+        # so rows with too many / too few fields are detected even if they add up
+        fields = lines.replace('\n', f'{separator}\n{separator}').split(separator)
+        stride = num_fields + 1
+        if len(fields) != num_lines * stride - 1 or fields[num_fields::stride].count('\n') != num_lines - 1:
+            _raise_field_count(block, separator, num_fields, line_number)
+
+        batch = []
+        for index, convert, typecode in columns:
+            values = fields[index::stride]
+            try:
+                if output == 'numpy' and convert in _TYPECODES and typecode == _TYPECODES[convert]:
+                    # numpy parses numbers from strings itself
+                    batch.append(numpy.array(values, dtype=typecode))
+                    continue
+                if convert is not str:
+                    values = map(convert, values)
+                if output == 'numpy':
+                    if typecode is None:
+                        batch.append(numpy.array(list(values), dtype=object))
+                    else:
+                        batch.append(numpy.fromiter(values, dtype=typecode, count=num_lines))
+                elif output == 'array' and typecode is not None:
+                    batch.append(array(typecode, values))
+                else:
+                    batch.append(values if isinstance(values, list) else list(values))
+            except ValueError as e:
+                raise ValueError(f'Column {index} (lines {line_number}-{line_number + block_lines - 1}): {e}') from None
+        line_number += block_lines
+        yield tuple(batch)
+
+
+def _line_blocks(source: str | IO[str] | Iterable[str], chunk_size: int, encoding: str) -> Iterator[str]:
+    """
+    :return: iterator over blocks of complete lines ('\n' separated, without trailing newline)
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding=encoding) as f:
+            yield from _line_blocks(f, chunk_size, encoding)
+        return
+
+    if hasattr(source, 'read'):
+        rest = ''
+        while chunk := source.read(chunk_size):
+            chunk = rest + chunk
+            end = chunk.rfind('\n')
+            if end == -1:
+                rest = chunk
+                continue
+            rest = chunk[end + 1:]
+            yield chunk[:end]
+        if rest:
+            yield rest
+        return
+
+    lines, size = [], 0
+    for line in source:
+        line = line.rstrip('\r\n')
+        lines.append(line)
+        size += len(line) + 1
+        if size >= chunk_size:
+            yield '\n'.join(lines)
+            lines, size = [], 0
+    if lines:
+        yield '\n'.join(lines)
+
+
+def _raise_field_count(block: str, separator: str, num_fields: int, line_number: int):
+    for i, line in enumerate(block.split('\n')):
+        if line and (count := line.count(separator) + 1) != num_fields:
+            raise ValueError(f'Line {line_number + i}: expected {num_fields} fields, got {count}')
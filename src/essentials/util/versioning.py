@@ -5,63 +5,548 @@
 @author Kami-Kaze
 """
 
-from dataclasses import dataclass
+import json
+import operator
+import os
+import re
+import sys
+import time
+from functools import lru_cache
+from operator import itemgetter
+from threading import Lock
+from typing import Callable, Iterable, Iterator
 
 import requests
 
-from essentials.util.text_utils import split_parse
+from essentials.io.file import atomic_write
+from essentials.itertools.parallel import thread_imap
+from essentials.util.http import shared_session
 
+_TIMEOUT = 5.
+_TTL = 3600.
 
-@dataclass
-class Version:
-    major: int
-    minor: int = 0
-    patch: int = 0
+# default cache argument of check_versions: use the shared on-disk cache
+_DEFAULT_CACHE = object()
 
-    def __gt__(self, other: 'Version'):
-        return self.to_tuple() > other.to_tuple()
 
-    def __ge__(self, other: 'Version'):
-        return self.to_tuple() >= other.to_tuple()
+# pre-release key of releases, sorts after every pre-release key (identifiers are (0, n, '') / (1, 0, s))
+_RELEASE = ((2,),)
 
-    def __lt__(self, other: 'Version'):
-        return self.to_tuple() < other.to_tuple()
+_VERSION_RE = re.compile(r'\s*v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+([0-9A-Za-z.-]+))?\s*')
 
-    def __le__(self, other: 'Version'):
-        return self.to_tuple() <= other.to_tuple()
+
+def _pre_key(prerelease: str) -> tuple:
+    if not prerelease:
+        return _RELEASE
+    return tuple((0, int(part), '') if part.isdigit() else (1, 0, part) for part in prerelease.split('.'))
+
+
+class Version(tuple):
+    """
+    Semantic version major.minor.patch[-prerelease][+build]
+
+    Versions are tuples (major, minor, patch, pre-release key),
+    so comparing, sorting and hashing run natively without allocating.
+    Pre-releases sort before their release (1.0.0-rc.1 < 1.0.0) as defined by SemVer.
+    Build metadata is kept as attribute outside the tuple, it does not affect precedence
+    (1.2.3+abc == 1.2.3, SemVer §10).
+    Versions are immutable (parsed versions are cached and shared), attributes cannot be assigned.
+    """
+    build: str
+
+    def __new__(cls, major: int, minor: int = 0, patch: int = 0, prerelease: str = '', build: str = ''):
+        self = tuple.__new__(cls, (major, minor, patch, _pre_key(prerelease)))
+        object.__setattr__(self, 'build', build)
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    major = property(itemgetter(0))
+    minor = property(itemgetter(1))
+    patch = property(itemgetter(2))
+
+    @property
+    def prerelease(self) -> str:
+        pre = self[3]
+        if pre is _RELEASE:
+            return ''
+        return '.'.join(str(n) if kind == 0 else s for kind, n, s in pre)
+
+    @property
+    def is_prerelease(self) -> bool:
+        return self[3] is not _RELEASE
+
+    def __getnewargs__(self):
+        return self[0], self[1], self[2], self.prerelease, self.build
 
     def __str__(self):
-        return f'{self.major}.{self.minor}.{self.patch}'
+        s = f'{self[0]}.{self[1]}.{self[2]}'
+        if self[3] is not _RELEASE:
+            s = f'{s}-{self.prerelease}'
+        return f'{s}+{self.build}' if self.build else s
 
     def __repr__(self):
-        return f'Version(major={self.major}, minor={self.minor} patch={self.patch})'
-
-    def __eq__(self, other):
-        return self.to_tuple() == other.to_tuple()
+        extra = ''.join(f', {name}={value!r}' for name, value in (('prerelease', self.prerelease), ('build', self.build)) if value)
+        return f'Version(major={self[0]}, minor={self[1]}, patch={self[2]}{extra})'
 
     def to_tuple(self):
-        return self.major, self.minor, self.patch
+        return self[0], self[1], self[2]
 
     @staticmethod
     def parse_version(version_str: str) -> 'Version':
         """
-        Parse a version string in the format major[.minor?[.patch?]]
+        Parse a version string in the format [v]major[.minor?[.patch?]][-prerelease][+build]
+        Results are cached, parsing the same string again is a dict lookup.
+
+        :raise ValueError: if [version_str] is not a version
         """
-        return Version(*split_parse(version_str, '.', int))
+        return _parse_version(version_str)
+
+
+@lru_cache(maxsize=1 << 16)
+def _parse_version(version_str: str) -> Version:
+    match = _VERSION_RE.fullmatch(version_str)
+    if match is None:
+        raise ValueError(f'Invalid version {version_str!r}')
+    major, minor, patch, prerelease, build = match.groups()
+    return Version(int(major), int(minor or 0), int(patch or 0), prerelease or '', build or '')
+
+
+def _as_version(version: str or Version) -> Version:
+    return version if isinstance(version, Version) else _parse_version(version)
+
+
+def _as_versions(versions: Iterable[str or Version]) -> Iterator[tuple[Version, str or Version]]:
+    """
+    :return: (parsed, original) pairs, invalid version strings are skipped
+    """
+    for version in versions:
+        if isinstance(version, Version):
+            yield version, version
+            continue
+        try:
+            yield _parse_version(version), version
+        except ValueError:
+            pass
+
+
+def sort_versions(versions: Iterable[str or Version], reverse: bool = False) -> list[str or Version]:
+    """
+    Sort version strings and / or Versions by precedence
+
+    :raise ValueError: if a version string is invalid
+    """
+    return sorted(versions, key=_as_version, reverse=reverse)
+
 
+_COMPARATOR_RE = re.compile(
+        r'(>=|<=|>|<|==|=|!=|\^|~=|~)?v?(\d+|[xX*])(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?'
+        r'(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?'
+)
 
-def check_version(version: str or Version, reference_url: str) -> Version or None:
+
+def _outside(version: Version, bounds: tuple[Version, Version]) -> bool:
+    return version < bounds[0] or version > bounds[1]
+
+
+def _outside_open(version: Version, bounds: tuple[Version, Version]) -> bool:
+    return version < bounds[0] or version >= bounds[1]
+
+
+def _names_prerelease(prereleases: tuple[tuple[int, int, int], ...], version: Version) -> bool:
+    # compared by index, slicing [version] would allocate
+    for major, minor, patch in prereleases:
+        if version[0] == major and version[1] == minor and version[2] == patch:
+            return True
+    return False
+
+
+class VersionRange:
+    """
+    Set of versions described by a range expression
+
+    Comparators separated by spaces or commas must all match, alternatives are separated by '||':
+        =1.2.3 / 1.2.3   exactly 1.2.3 (any build)
+        1.2.x / 1.2 / *  x-ranges, missing components match anything
+        >=, >, <=, <     comparisons, missing components are filled in (>1.2 means >=1.3.0)
+        !=1.2.3          anything but 1.2.3
+        ~1.2.3           >=1.2.3 <1.3.0 (~1 means >=1.0.0 <2.0.0)
+        ~=1.2 / ~=1.2.3  >=1.2.0 <2.0.0 / >=1.2.3 <1.3.0 (compatible release)
+        ^1.2.3           >=1.2.3 <2.0.0 (^0.2.3 means <0.3.0, ^0.0.3 means <0.0.4)
+        1.2 - 2.3.4      >=1.2.0 <=2.3.4
+
+    Build metadata is ignored.
+    Pre-releases only match if [include_prerelease] is set
+    or a comparator of the same alternative names a pre-release of the same major.minor.patch.
+    Expressions are compiled once, matching only compares the version to precomputed bounds.
+    """
+
+    def __init__(self, expression: str, include_prerelease: bool = False):
+        """
+        :raise ValueError: if [expression] is invalid
+        """
+        self.expression = expression
+        self.include_prerelease = include_prerelease
+        # alternatives of (comparators, (major, minor, patch) of pre-releases that may match)
+        self._alternatives: tuple[tuple[tuple[tuple[Callable, object], ...], tuple[tuple[int, int, int], ...]], ...] = tuple(
+                self._compile_alternative(alternative) for alternative in expression.split('||')
+        )
+
+    @classmethod
+    def _compile_alternative(cls, expression: str):
+        tokens = re.sub(r'(>=|<=|>|<|==|=|!=|\^|~=|~)\s+', r'\1', expression.replace(',', ' ')).split()
+        comparators, prereleases = [], set()
+        i = 0
+        while i < len(tokens):
+            if i + 2 < len(tokens) and tokens[i + 1] == '-':
+                lower, upper = cls._parse_token(tokens[i]), cls._parse_token(tokens[i + 2])
+                if lower[0] or upper[0]:
+                    raise ValueError(f'Invalid hyphen range {" ".join(tokens[i:i + 3])!r}')
+                comparators += cls._comparators('>=', *lower[1:]) + cls._comparators('<=', *upper[1:])
+                parsed = (lower, upper)
+                i += 3
+            else:
+                token = cls._parse_token(tokens[i])
+                comparators += cls._comparators(*token)
+                parsed = (token,)
+                i += 1
+            for _, major, minor, patch, prerelease in parsed:
+                if prerelease:
+                    prereleases.add((major, minor or 0, patch or 0))
+        return tuple(comparators), tuple(prereleases)
+
+    @staticmethod
+    def _parse_token(token: str) -> tuple[str, int | None, int | None, int | None, str]:
+        """
+        :return: operator, major, minor, patch (None for wildcards / missing), prerelease
+        """
+        match = _COMPARATOR_RE.fullmatch(token)
+        if match is None:
+            raise ValueError(f'Invalid version comparator {token!r}')
+        op, *parts, prerelease = match.groups()
+        numbers = []
+        for part in parts:
+            if part is None or not part.isdigit():
+                break
+            numbers.append(int(part))
+        numbers += [None] * (3 - len(numbers))
+        return op or '', *numbers, prerelease or ''
+
+    @staticmethod
+    def _comparators(op: str, major: int | None, minor: int | None, patch: int | None, prerelease: str):
+        """
+        Translate one comparator into (function, bound) pairs
+        """
+        if major is None:
+            if op in ('<', '>', '!='):
+                # nothing is smaller / larger than everything
+                return [(operator.lt, Version(0, 0, 0, '0'))]
+            return []
+        full = patch is not None
+        lower = Version(major, minor or 0, patch or 0, prerelease)
+        if full:
+            upper = lower
+        elif minor is None:
+            upper = Version(major + 1, 0, 0, '0')
+        else:
+            upper = Version(major, minor + 1, 0, '0')
+        # upper bounds of partial versions exclude the pre-releases of the next version
+        upper_op = operator.le if full else operator.lt
+
+        if op in ('', '=', '=='):
+            return [(operator.ge, lower), (upper_op, upper)]
+        if op == '!=':
+            return [(_outside if full else _outside_open, (lower, upper))]
+        if op == '>=':
+            return [(operator.ge, lower)]
+        if op == '>':
+            return [(operator.gt, upper)] if full else [(operator.ge, upper)]
+        if op == '<':
+            return [(operator.lt, lower)]
+        if op == '<=':
+            return [(upper_op, upper)]
+        if op == '~':
+            bump = Version(major, minor + 1, 0, '0') if minor is not None else Version(major + 1, 0, 0, '0')
+            return [(operator.ge, lower), (operator.lt, bump)]
+        if op == '~=':
+            if minor is None:
+                raise ValueError('~= requires at least major.minor')
+            bump = Version(major, minor + 1, 0, '0') if full else Version(major + 1, 0, 0, '0')
+            return [(operator.ge, lower), (operator.lt, bump)]
+        # ^: the left-most non-zero component is fixed
+        if major > 0 or minor is None:
+            bump = Version(major + 1, 0, 0, '0')
+        elif minor > 0 or patch is None:
+            bump = Version(0, minor + 1, 0, '0')
+        else:
+            bump = Version(0, 0, patch + 1, '0')
+        return [(operator.ge, lower), (operator.lt, bump)]
+
+    def __contains__(self, version: str or Version) -> bool:
+        return self.matches(_as_version(version))
+
+    def matches(self, version: Version) -> bool:
+        for comparators, prereleases in self._alternatives:
+            if version[3] is not _RELEASE and not self.include_prerelease \
+                    and not _names_prerelease(prereleases, version):
+                continue
+            for op, bound in comparators:
+                if not op(version, bound):
+                    break
+            else:
+                return True
+        return False
+
+    def filter(self, versions: Iterable[str or Version]) -> list[str or Version]:
+        """
+        :return: the matching items of [versions] (invalid version strings are skipped)
+        """
+        matches = self.matches
+        return [original for version, original in _as_versions(versions) if matches(version)]
+
+    def max_satisfying(self, versions: Iterable[str or Version]) -> str or Version or None:
+        """
+        :return: the highest matching item of [versions], None if there is none
+        """
+        matches = self.matches
+        best, best_original = None, None
+        for version, original in _as_versions(versions):
+            if (best is None or version > best) and matches(version):
+                best, best_original = version, original
+        return best_original
+
+    def __repr__(self):
+        return f'VersionRange({self.expression!r})'
+
+
+@lru_cache(maxsize=1024)
+def version_range(expression: str, include_prerelease: bool = False) -> VersionRange:
+    """
+    :return: (cached) VersionRange of [expression]
+    """
+    return VersionRange(expression, include_prerelease)
+
+
+def max_satisfying(
+        versions: Iterable[str or Version],
+        expression: str,
+        include_prerelease: bool = False,
+) -> str or Version or None:
+    """
+    :return: the highest item of [versions] in the range [expression], None if there is none
+    """
+    return version_range(expression, include_prerelease).max_satisfying(versions)
+
+
+def filter_versions(
+        versions: Iterable[str or Version],
+        *expressions: str,
+        include_prerelease: bool = False,
+) -> list[str or Version]:
+    """
+    :return: the items of [versions] that satisfy all range [expressions]
+    """
+    ranges = [version_range(expression, include_prerelease) for expression in expressions]
+    return [original for version, original in _as_versions(versions) if all(r.matches(version) for r in ranges)]
+
+
+def default_cache_path() -> str:
+    """
+    :return: path of the shared on-disk version cache in the user's cache directory
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'essentials', 'versions.json')
+
+
+class VersionCache:
+    """
+    Persistent cache of reference files (url -> content, ETag, Last-Modified, time of the last check).
+    Entries younger than [ttl] are used without any request,
+    older ones are revalidated with a conditional request (If-None-Match / If-Modified-Since).
+    """
+
+    def __init__(self, path: str | None = None, ttl: float = _TTL):
+        """
+        :param path: cache file, None for default_cache_path()
+        :param ttl: seconds an entry is used without revalidation
+        """
+        self.path = path or default_cache_path()
+        self.ttl = ttl
+        self._lock = Lock()
+        self._entries: dict[str, dict] | None = None
+        self._modified = False
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, 'rb') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, url: str) -> dict | None:
+        with self._lock:
+            return self._load().get(url)
+
+    def put(self, url: str, entry: dict):
+        with self._lock:
+            self._load()[url] = entry
+            self._modified = True
+
+    def fresh(self, entry: dict | None) -> bool:
+        return entry is not None and time.time() - entry['checked'] < self.ttl
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._modified = True
+
+    def save(self):
+        """
+        Write the cache file if entries changed (failures are ignored, the cache is an optimization)
+        """
+        with self._lock:
+            if not self._modified:
+                return
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with atomic_write(self.path, fsync=False) as f:
+                    json.dump(self._entries, f)
+                self._modified = False
+            except OSError:
+                pass
+
+
+_CACHE: VersionCache | None = None
+_CACHE_LOCK = Lock()
+
+
+def _default_cache() -> VersionCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = VersionCache()
+        return _CACHE
+
+
+def fetch_version(
+        reference_url: str,
+        session: requests.Session | None = None,
+        cache: VersionCache | None = None,
+        timeout: float = _TIMEOUT,
+) -> Version:
+    """
+    Get the version string at [reference_url] and parse it
+
+    :param session: session to use, None for a shared pooled session
+    :param cache: VersionCache (e.g. VersionCache() for the shared on-disk cache), None to always download
+    :param timeout: seconds to wait for connecting / receiving data
+    :raise requests.RequestException: if the request fails and nothing is cached
+    :raise ValueError: if the content is not a version string
+    """
+    entry = cache.get(reference_url) if cache is not None else None
+    if entry is not None and cache.fresh(entry):
+        return Version.parse_version(entry['text'])
+
+    headers = {}
+    if entry is not None:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    try:
+        r = (session or shared_session()).get(reference_url, headers=headers, timeout=timeout)
+        r.raise_for_status()
+    except requests.RequestException:
+        if entry is None:
+            raise
+        # stale but better than nothing, retried after the next ttl
+        entry = {**entry, 'checked': time.time()}
+    else:
+        if r.status_code == 304 and entry is not None:
+            entry = {**entry, 'checked': time.time()}
+        else:
+            entry = {
+                'text'         : r.text.strip(),
+                'etag'         : r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified'),
+                'checked'      : time.time(),
+            }
+    if cache is not None:
+        cache.put(reference_url, entry)
+    return Version.parse_version(entry['text'])
+
+
+def check_version(
+        version: str or Version,
+        reference_url: str,
+        session: requests.Session | None = None,
+        cache: VersionCache | None = None,
+        timeout: float = _TIMEOUT,
+) -> Version or None:
     """
     Check version against given target
     :param version: version to check, either a version string or [Version]
     :param reference_url: url to a file containing a version string
+    :param session: session to use, None for a shared pooled session
+    :param cache: VersionCache (e.g. VersionCache() for the shared on-disk cache), None to always download
+    :param timeout: seconds to wait for connecting / receiving data
     :return: the latest version if its newer than the current one, None otherwise
     """
     if isinstance(version, str):
         version = Version.parse_version(version)
 
-    r = requests.get(reference_url)
-
-    # todo: try catch + check status code
-    ref = Version.parse_version(r.text)
+    ref = fetch_version(reference_url, session, cache, timeout)
+    if cache is not None:
+        cache.save()
     return ref if version < ref else None
+
+
+def check_versions(
+        checks: Iterable[tuple[str or Version, str]],
+        num_workers: int = 8,
+        session: requests.Session | None = None,
+        cache: VersionCache | None = _DEFAULT_CACHE,
+        timeout: float = _TIMEOUT,
+        raise_errors: bool = False,
+) -> list[Version or None]:
+    """
+    check_version for many (version, reference_url) pairs concurrently
+
+    :param checks: (version, reference_url) pairs
+    :param num_workers: number of concurrent requests
+    :param session: session to use, None for a shared pooled session
+    :param cache: VersionCache, defaults to the shared on-disk cache (default_cache_path()), None to always download
+    :param timeout: seconds to wait for connecting / receiving data (per request)
+    :param raise_errors: raise the first error, otherwise failed checks result in None
+    :return: for each pair the latest version if its newer than the given one, None otherwise
+    """
+    if cache is _DEFAULT_CACHE:
+        cache = _default_cache()
+
+    def check(pair) -> Version or None:
+        version, url = pair
+        try:
+            # an invalid local version only fails its own check
+            version = _as_version(version)
+            ref = fetch_version(url, session, cache, timeout)
+        except (requests.RequestException, ValueError):
+            if raise_errors:
+                raise
+            return None
+        return ref if version < ref else None
+
+    try:
+        return list(thread_imap(check, checks, num_workers))
+    finally:
+        if cache is not None:
+            cache.save()
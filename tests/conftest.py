@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test setup: sources from src/, stand-ins for native dependencies that are not installed
+
+@author Kami-Kaze
+"""
+
+import importlib.util
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(_ROOT, 'src'))
+
+if importlib.util.find_spec('spdlog') is None:
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stubs'))
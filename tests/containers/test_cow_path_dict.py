@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import pytest
+
+from essentials.containers.cow_path_dict import CowPathDict
+
+
+@pytest.mark.parametrize('mutate', [
+    lambda s: s.__setitem__('x', 1),
+    lambda s: s.__delitem__('a'),
+    lambda s: s.__ior__({'x': 1}),
+    lambda s: s.__org_set__('x', 1),
+    lambda s: s.__org_del__('a'),
+    lambda s: s.pop('a'),
+    lambda s: s.popitem(),
+    lambda s: s.set_many({'x': 1}),
+    lambda s: s.setdefault('x', 1),
+    lambda s: s.update(x=1),
+    lambda s: s.clear(),
+    lambda s: s.apply_patch([{'op': 'add', 'path': '/x', 'value': 1}]),
+    lambda s: s.track_changes(),
+    lambda s: s.build_index(),
+    lambda s: s['a'].__setitem__('b', 2),
+])
+def test_snapshot_is_immutable(mutate):
+    cow = CowPathDict({'a': {'b': 1}})
+    snap = cow.snapshot()
+    with pytest.raises(TypeError):
+        mutate(snap)
+    assert snap == {'a': {'b': 1}}
+    assert not snap.tracking and not snap.indexed
+
+
+def test_ior_statement_on_snapshot():
+    snap = CowPathDict({'a': 1}).snapshot()
+    with pytest.raises(TypeError):
+        snap |= {'x': 1}
+    assert snap == {'a': 1}
+
+
+def test_writes_share_unmodified_nodes():
+    cow = CowPathDict({'a': {'b': 1}, 'c': {'d': 2}})
+    old = cow.snapshot()
+    cow.set('a.b', 5)
+    new = cow.snapshot()
+    assert old['a.b'] == 1 and new['a.b'] == 5
+    assert new['c'] is old['c']
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import os
+
+from essentials.containers.journal import PathDictJournal
+
+
+def test_save_and_reload(tmp_path):
+    path = str(tmp_path / 'data.json')
+    with PathDictJournal(path) as j:
+        j.data['a'] = {'b': 1}
+        j.save()
+        j.data['a.b'] = 2
+    with PathDictJournal(path) as j:
+        assert j.data == {'a': {'b': 2}}
+
+
+def test_save_after_torn_entry(tmp_path):
+    path = str(tmp_path / 'data.json')
+    with PathDictJournal(path) as j:
+        j.data['a'] = 1
+    # crash while appending an entry
+    with open(path + '.journal', 'ab') as f:
+        f.write(b'{"seq": 2, "ops": [{"op": "add", "pa')
+
+    with PathDictJournal(path) as j:
+        assert j.data == {'a': 1}
+        j.data['b'] = 2
+    with PathDictJournal(path) as j:
+        assert j.data == {'a': 1, 'b': 2}
+
+
+def test_entry_without_newline_is_dropped(tmp_path):
+    path = str(tmp_path / 'data.json')
+    with PathDictJournal(path) as j:
+        j.data['a'] = 1
+    journal = path + '.journal'
+    with open(journal, 'rb+') as f:
+        f.truncate(os.path.getsize(journal) - 1)
+
+    with PathDictJournal(path) as j:
+        assert j.data == {}
+        j.data['b'] = 2
+    with PathDictJournal(path) as j:
+        assert j.data == {'b': 2}
+
+
+def test_only_root_writes_are_journaled(tmp_path):
+    path = str(tmp_path / 'data.json')
+    with PathDictJournal(path) as j:
+        j.data['a'] = {'b': 1}
+        j.save()
+        # nested node mutated directly: not recorded
+        j.data['a']['c'] = 3
+        # written through the root with a path: recorded
+        j.data['a', 'd'] = 4
+    with PathDictJournal(path) as j:
+        assert j.data == {'a': {'b': 1, 'd': 4}}
+
+
+def test_compaction(tmp_path):
+    path = str(tmp_path / 'data.json')
+    with PathDictJournal(path, compact_after=1) as j:
+        for i in range(10):
+            j.data[f'k{i}'] = i
+            j.save()
+        j.compact(wait=True)
+    with PathDictJournal(path) as j:
+        assert j.data == {f'k{i}': i for i in range(10)}
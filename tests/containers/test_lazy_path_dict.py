@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import json
+
+import pytest
+
+from essentials.containers.lazy_path_dict import LazyPathDict
+from essentials.containers.path_dict import PathDict
+
+DATA = '{"a": {"b": [1, {"c": 2}], "d": {"e": null}}, "x.y": {"z": 1}, "n": 3}'
+
+
+@pytest.mark.parametrize('depth', [1, 2])
+@pytest.mark.parametrize('read', [
+    dict,
+    lambda d: {**d},
+    lambda d: d.copy(),
+    lambda d: d | {},
+    lambda d: {} | d,
+    lambda d: dict(zip(d.keys(), d.values())),
+    lambda d: dict(d.items()),
+    lambda d: eval(repr(d)),
+])
+def test_reads_never_leak_placeholders(read, depth):
+    assert read(LazyPathDict.loads(DATA, depth)) == json.loads(DATA)
+    assert json.loads(json.dumps(read(LazyPathDict.loads(DATA, depth)))) == json.loads(DATA)
+
+
+def test_equality():
+    assert LazyPathDict.loads(DATA) == PathDict.loads(DATA)
+    assert PathDict.loads(DATA) == LazyPathDict.loads(DATA)
+    assert json.loads(DATA) == LazyPathDict.loads(DATA, depth=3)
+    assert not LazyPathDict.loads(DATA) != PathDict.loads(DATA)
+    assert LazyPathDict.loads(DATA) != PathDict.loads('{"a": 1}')
+
+
+def test_paths():
+    d = LazyPathDict.loads(DATA, depth=2)
+    assert d['a.b'] == [1, {'c': 2}]
+    assert d['a', 'd', 'e'] is None
+    assert d.get('a.missing', 5) == 5
+
+
+@pytest.mark.parametrize('data', ['{"a": 1} x', '{"a": 1}{}', '{"a": {"b": 1}} ]'])
+def test_trailing_data(data):
+    with pytest.raises(json.JSONDecodeError):
+        LazyPathDict.loads(data)
+
+
+def test_trailing_whitespace():
+    assert LazyPathDict.loads('  {"a": 1} \n\t') == {'a': 1}
+
+
+def test_load(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text(DATA)
+    with open(path, 'rb') as f:
+        assert PathDict.load(f, lazy=True) == json.loads(DATA)
+
+
+def test_load_empty_file(tmp_path):
+    path = tmp_path / 'empty.json'
+    path.write_bytes(b'')
+    with open(path, 'rb') as f, pytest.raises(json.JSONDecodeError):
+        LazyPathDict.load(f)
+
+
+def test_setdefault():
+    d = LazyPathDict.loads(DATA)
+    assert d.setdefault('a', {}) == json.loads(DATA)['a']
+    assert isinstance(d.setdefault('a', {}), PathDict)
+    assert d.setdefault('new', 1) == 1
+
+
+def test_popitem():
+    d = LazyPathDict.loads(DATA)
+    expected = json.loads(DATA)
+    while d:
+        key, value = d.popitem()
+        assert value == expected.pop(key)
+    assert expected == {}
+
+
+def test_snapshot():
+    d = LazyPathDict.loads(DATA, depth=2)
+    assert PathDict.from_snapshot(d.to_snapshot()) == json.loads(DATA)
+
+
+def test_diff():
+    other = json.loads(DATA)
+    other['n'] = 4
+    assert LazyPathDict.loads(DATA, depth=2).diff(other) == [{'op': 'replace', 'path': '/n', 'value': 4}]
+    assert PathDict.loads(DATA).diff(LazyPathDict.loads(json.dumps(other))) == \
+           [{'op': 'replace', 'path': '/n', 'value': 4}]
+
+
+@pytest.mark.parametrize('serializer', [None, 'json'])
+def test_pstr(serializer):
+    assert json.loads(LazyPathDict.loads(DATA).pstr(serializer)) == json.loads(DATA)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import pickle
+from copy import copy as shallow_copy, deepcopy
+
+import pytest
+
+from essentials.containers.path_dict import PathDict
+
+
+def _indexed() -> PathDict:
+    d = PathDict({'a': PathDict({'b': 1, 'c': PathDict({'d': 2})}), 'x': 0})
+    d.build_index()
+    return d
+
+
+def _check(d: PathDict):
+    """
+    get_many (through the index if it still exists) must agree with a plain walk
+    """
+    paths = ['a', 'a.b', 'a.c', 'a.c.d', 'x', 'new', 'new.y']
+    assert d.get_many(paths) == [d.get(path) for path in paths]
+
+
+def test_setitem_and_delitem_patch_the_index():
+    d = _indexed()
+    d['a.c.e'] = 3
+    del d['a.b']
+    assert d.indexed
+    assert d.get_many(['a.c.e', 'a.b']) == [3, None]
+
+
+def test_update():
+    d = _indexed()
+    d.update({'new': 1}, x=2)
+    assert d.get_many(['new', 'x']) == [1, 2]
+    _check(d)
+
+
+def test_ior():
+    d = _indexed()
+    d |= {'new': PathDict({'y': 1})}
+    assert d.get_many(['new.y']) == [1]
+    _check(d)
+
+
+def test_setdefault():
+    d = _indexed()
+    assert d.setdefault('x', 5) == 0
+    assert d.setdefault('new', 5) == 5
+    assert d.get_many(['new']) == [5]
+    _check(d)
+
+
+def test_clear():
+    d = _indexed()
+    d.clear()
+    assert d.get_many(['a', 'a.b', 'x']) == [None, None, None]
+
+
+def test_popitem():
+    d = _indexed()
+    key, _ = d.popitem()
+    assert d.get_many([key]) == [None]
+    _check(d)
+
+
+def test_pop():
+    d = _indexed()
+    assert d.pop('a.c') == {'d': 2}
+    assert d.get_many(['a.c', 'a.c.d']) == [None, None]
+
+
+@pytest.mark.parametrize('mutate', [
+    lambda d: d['a'].__setitem__('b', 5),
+    lambda d: d['a'].__delitem__('b'),
+    lambda d: d['a'].update(b=5),
+    lambda d: d['a'].pop('b'),
+    lambda d: d['a'].clear(),
+    lambda d: d['a'].popitem(),
+    lambda d: d['a'].setdefault('z', 5),
+    lambda d: d['a'].__ior__({'b': 5}),
+    lambda d: d['a', 'c'].__setitem__('d', 5),
+])
+def test_nested_mutation_drops_the_index(mutate):
+    d = _indexed()
+    mutate(d)
+    assert not d.indexed
+    _check(d)
+
+
+def test_removed_nodes_do_not_drop_the_index():
+    d = _indexed()
+    a = d.pop('a')
+    a['b'] = 5
+    assert d.indexed
+
+
+def test_org_set_and_del():
+    d = _indexed()
+    d.__org_set__('new', 1)
+    d.__org_del__('x')
+    _check(d)
+
+
+def test_changes_are_recorded():
+    d = PathDict({'a': 1, 'b': 2})
+    d.track_changes()
+    d.update(c=3)
+    d.setdefault('d', 4)
+    d.clear()
+    other = PathDict({'a': 1, 'b': 2})
+    other.apply_patch(d.pop_changes())
+    assert other == {}
+
+
+def test_pickle():
+    d = _indexed()
+    d['a.y'] = 1
+    d.track_changes()
+    d[('dotted.key',)] = 2
+    copy = pickle.loads(pickle.dumps(d))
+    assert copy == d and type(copy) is PathDict and type(copy['a']) is PathDict
+    assert not copy.indexed and not copy.tracking
+    assert copy.get(('dotted.key',)) == 2
+
+
+def test_deepcopy_keeps_the_original_index():
+    d = _indexed()
+    copy = deepcopy(d)
+    assert d.indexed and not copy.indexed
+    assert copy == d and copy['a'] is not d['a']
+    copy['a']['b'] = 5
+    assert d.indexed and d.get_many(['a.b']) == [1]
+
+
+def test_shallow_copy():
+    d = _indexed()
+    copy = shallow_copy(d)
+    assert copy == d and copy['a'] is d['a'] and not copy.indexed
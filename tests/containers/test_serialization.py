@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import json
+import math
+
+import pytest
+
+from essentials.containers.path_dict import PathDict
+from essentials.containers.serialization import Serializer, get_serializer
+
+
+def test_default_is_stdlib_json():
+    assert get_serializer().name == 'json'
+
+
+def test_big_int_round_trip():
+    value = 123456789012345678901234567890
+    assert PathDict.loads(PathDict({'a': value}).pstr())['a'] == value
+
+
+def test_non_str_keys():
+    assert PathDict({1: 'x'}).pstr() == json.dumps({1: 'x'}, indent=2, sort_keys=True)
+
+
+def test_nan():
+    assert math.isnan(PathDict.loads('{"a": NaN}')['a'])
+
+
+def test_non_ascii_is_escaped():
+    assert PathDict({'a': 'ä'}).pstr() == json.dumps({'a': 'ä'}, indent=2, sort_keys=True)
+
+
+def test_unknown_serializer():
+    with pytest.raises(ValueError):
+        get_serializer('does-not-exist')
+
+
+def test_serializer_is_abstract():
+    with pytest.raises(TypeError):
+        Serializer()
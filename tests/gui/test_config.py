@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import glob
+import json
+import os
+import time
+from threading import Event
+
+import attrs
+import pytest
+
+from essentials.gui.config import Config, ConfigPersister, ConfigWatcher, flush_pending_saves
+
+
+@attrs.define
+class _Window:
+    x: int = 0
+    y: int = 0
+
+
+@attrs.define
+class _AppConfig(Config):
+    width: int = 800
+    height: int = 600
+    title: str = 'app'
+    icon_path: str = None
+    window: _Window = attrs.Factory(_Window)
+    parent: _Window = None
+    ratio: float = 1.
+
+
+def _backups(path) -> list[str]:
+    return glob.glob(f'{path}.backup*')
+
+
+def test_round_trip_with_none_defaults(tmp_path):
+    path = str(tmp_path / 'config.json')
+    config = _AppConfig(width=1024, icon_path=None, window=_Window(3, 4))
+    Config.save(_AppConfig, path, config)
+
+    assert Config.load_or_defaults(_AppConfig, path, cache=False) == config
+    assert _backups(path) == []
+
+    config.icon_path = 'icon.ico'
+    config.parent = _Window(1, 2)
+    Config.save(_AppConfig, path, config)
+    assert Config.load_or_defaults(_AppConfig, path, cache=False) == config
+
+
+def test_invalid_value_only_resets_that_member(tmp_path):
+    path = str(tmp_path / 'config.json')
+    with open(path, 'w') as f:
+        json.dump({'__name__': '_AppConfig', 'width': 1024, 'height': 'tall', 'window': {'x': 'left', 'y': 5}}, f)
+
+    config = Config.load_or_defaults(_AppConfig, path, cache=False)
+    assert config == _AppConfig(width=1024, window=_Window(0, 5))
+    assert len(_backups(path)) == 1
+
+
+def test_invalid_json_uses_defaults(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text('{"width": ')
+    assert Config.load_or_defaults(_AppConfig, str(path), cache=False) == _AppConfig()
+    assert len(_backups(path)) == 1
+
+
+class _Writes(list):
+    def __init__(self):
+        super().__init__()
+        self.event = Event()
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """
+    (time, path, data) of every config file write, [writes.event] is set on each write
+    """
+    writes = _Writes()
+    write = Config._write
+
+    def recording_write(path, data, fsync=True):
+        write(path, data, fsync)
+        writes.append((time.monotonic(), path, data))
+        writes.event.set()
+
+    monkeypatch.setattr(Config, '_write', staticmethod(recording_write))
+    return writes
+
+
+def _load(path) -> _AppConfig:
+    return Config.load_or_defaults(_AppConfig, path, cache=False)
+
+
+def test_persister_coalesces_saves(tmp_path, writes):
+    path = str(tmp_path / 'config.json')
+    with ConfigPersister(_AppConfig, path, delay=.2, max_delay=None) as persister:
+        for width in range(10):
+            persister.save(_AppConfig(width=width))
+        assert persister.dirty
+        assert writes.event.wait(5)
+        time.sleep(.3)
+        assert len(writes) == 1
+        assert not persister.dirty
+    assert _load(path).width == 9
+
+
+def test_persister_max_delay(tmp_path, writes):
+    path = str(tmp_path / 'config.json')
+    with ConfigPersister(_AppConfig, path, delay=.3, max_delay=.5) as persister:
+        start = time.monotonic()
+        # a save every .1s never leaves a pause of [delay], [max_delay] forces writes anyway
+        while time.monotonic() - start < 1.5:
+            persister.save(_AppConfig(width=int((time.monotonic() - start) * 100)))
+            time.sleep(.1)
+        assert writes
+        assert writes[0][0] - start < .5 + .3
+    assert _load(path).width == writes[-1][2]['width']
+
+
+def test_persister_flush(tmp_path, writes):
+    path = str(tmp_path / 'config.json')
+    persister = ConfigPersister(_AppConfig, path, delay=60.)
+    persister.save(_AppConfig(width=1))
+    assert persister.flush(timeout=5)
+    assert len(writes) == 1 and not persister.dirty
+    assert _load(path).width == 1
+
+    persister.save(_AppConfig(width=2))
+    flush_pending_saves(timeout=5)
+    assert len(writes) == 2
+    assert _load(path).width == 2
+    persister.close()
+
+
+def test_persister_close(tmp_path, writes):
+    path = str(tmp_path / 'config.json')
+    persister = ConfigPersister(_AppConfig, path, delay=60.)
+    persister.save(_AppConfig(width=1))
+    thread = persister._daemon
+    persister.close()
+    # pending changes are written, the thread is joined
+    assert len(writes) == 1
+    assert not thread.is_alive()
+    assert _load(path).width == 1
+
+    with pytest.raises(RuntimeError):
+        persister.save(_AppConfig(width=2))
+    assert len(writes) == 1
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """
+    Paths parsed by Config.load_or_defaults (cache misses)
+    """
+    parses = []
+    load = Config._load_or_defaults
+
+    def counting_load(cls, path, *args, **kwargs):
+        parses.append(path)
+        return load(cls, path, *args, **kwargs)
+
+    monkeypatch.setattr(Config, '_load_or_defaults', staticmethod(counting_load))
+    return parses
+
+
+def test_cache_hit_returns_a_copy(tmp_path, parses):
+    path = str(tmp_path / 'config.json')
+    Config.save(_AppConfig, path, _AppConfig(width=1, window=_Window(1, 2)))
+
+    a = Config.load_or_defaults(_AppConfig, path)
+    b = Config.load_or_defaults(_AppConfig, path)
+    assert len(parses) == 1
+    assert a == b and a is not b and a.window is not b.window
+    a.window.x = 5
+    assert Config.load_or_defaults(_AppConfig, path).window.x == 1
+
+
+def test_cache_is_keyed_by_stat(tmp_path, parses):
+    path = str(tmp_path / 'config.json')
+    Config.save(_AppConfig, path, _AppConfig(width=100))
+    assert Config.load_or_defaults(_AppConfig, path).width == 100
+    st = os.stat(path)
+
+    # mtime
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    Config.load_or_defaults(_AppConfig, path)
+    assert len(parses) == 2
+
+    # size, with the mtime restored
+    Config.save(_AppConfig, path, _AppConfig(width=1000))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert Config.load_or_defaults(_AppConfig, path).width == 1000
+    assert len(parses) == 3
+
+    # inode: same size and mtime, replaced file
+    st = os.stat(path)
+    other = str(tmp_path / 'other.json')
+    Config.save(_AppConfig, other, _AppConfig(width=2000))
+    os.utime(other, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(other, path)
+    assert Config.load_or_defaults(_AppConfig, path).width == 2000
+    assert len(parses) == 4
+
+    Config.load_or_defaults(_AppConfig, path)
+    assert len(parses) == 4
+
+
+def test_failed_loads_are_not_cached(tmp_path, parses):
+    path = tmp_path / 'config.json'
+    path.write_text('{"width": ')
+    assert Config.load_or_defaults(_AppConfig, str(path)) == _AppConfig()
+    assert Config.load_or_defaults(_AppConfig, str(path)) == _AppConfig()
+    assert len(parses) == 2
+
+
+def test_watcher_notifies_on_change(tmp_path):
+    path = str(tmp_path / 'config.json')
+    Config.save(_AppConfig, path, _AppConfig(width=1))
+    watcher = ConfigWatcher(_AppConfig, path)
+    assert watcher.config.width == 1
+
+    received = []
+    watcher.subscribe(received.append)
+    watcher.subscribe(lambda _: 1 / 0)
+    assert not watcher.check()
+    assert received == []
+
+    st = os.stat(path)
+    Config.save(_AppConfig, path, _AppConfig(width=2))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    # failing subscribers do not keep the others from being notified
+    assert watcher.check()
+    assert [config.width for config in received] == [2]
+    assert watcher.config.width == 2
+
+    assert not watcher.check()
+    assert len(received) == 1
+
+    os.remove(path)
+    assert not watcher.check()
+    assert watcher.config.width == 2
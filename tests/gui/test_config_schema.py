@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+from threading import Event, Thread
+
+import attrs
+import pytest
+
+from essentials.gui import config_schema
+from essentials.gui.config_schema import ConfigSchema, compile_schema
+
+
+@attrs.define
+class _Node:
+    name: str = ''
+    children: list['_Node'] = attrs.Factory(list)
+    partner: '_Partner | None' = None
+
+
+@attrs.define
+class _Partner:
+    value: int = 0
+    node: _Node | None = None
+
+
+def test_self_referencing_classes():
+    node = compile_schema(_Node).load({
+        'name'    : 'root',
+        'children': [{'name': 'child', 'partner': {'value': 1, 'node': {'name': 'x'}}}],
+    })
+    assert node.children[0].partner.value == 1
+    assert node.children[0].partner.node.name == 'x'
+    assert _Node in config_schema._SCHEMAS and _Partner in config_schema._SCHEMAS
+    assert not config_schema._COMPILING
+
+
+def test_failed_compile_registers_nothing(monkeypatch):
+    @attrs.define
+    class Inner:
+        x: int = 0
+
+    @attrs.define
+    class Outer:
+        inner: Inner = attrs.Factory(Inner)
+
+    def fail(hint):
+        if hint is int:
+            raise RuntimeError('compile failed')
+        return original(hint)
+
+    original = config_schema._loader
+    monkeypatch.setattr(config_schema, '_loader', fail)
+    with pytest.raises(RuntimeError):
+        compile_schema(Outer)
+    assert Outer not in config_schema._SCHEMAS and Inner not in config_schema._SCHEMAS
+    assert not config_schema._COMPILING
+
+
+def test_concurrent_callers_never_see_partial_schemas(monkeypatch):
+    @attrs.define
+    class Config:
+        x: int = 0
+        y: str = ''
+
+    compiling, release = Event(), Event()
+    original = ConfigSchema._compile
+
+    def slow_compile(self):
+        if self.cls is Config:
+            compiling.set()
+            release.wait(5)
+        original(self)
+
+    monkeypatch.setattr(ConfigSchema, '_compile', slow_compile)
+    results = []
+    first = Thread(target=lambda: results.append(compile_schema(Config)))
+    first.start()
+    assert compiling.wait(5)
+
+    # blocks on the lock until the first compile finished
+    second = Thread(target=lambda: results.append(compile_schema(Config).load({'x': 1, 'y': 'a'})))
+    second.start()
+    second.join(.1)
+    assert Config not in config_schema._SCHEMAS
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert results[1] == Config(1, 'a')
+    assert results[0].keys == {'x', 'y'}
+
+
+def test_invalid_values():
+    @attrs.define
+    class Config:
+        x: int = 0
+        name: str = None
+        node: _Node = None
+
+    schema = compile_schema(Config)
+    assert schema.load({'x': 1, 'name': None, 'node': None}) == Config(1)
+    with pytest.raises(TypeError, match='node.name: expected str'):
+        schema.load({'node': {'name': 1}})
+
+    invalid = []
+    assert schema.load({'x': 'a', 'name': 'n', 'node': {'name': 1, 'children': []}}, invalid=invalid) \
+           == Config(0, 'n', _Node())
+    assert invalid == ['x: expected int, got str', 'node.name: expected str, got int']
+    assert schema.dump(Config()) == {'x': 0, 'name': None, 'node': None}
+    assert schema.copy(Config()) == Config()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+from essentials.gui.frame_scheduler import FrameScheduler
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _run(scheduler: FrameScheduler, clock: _Clock, duration: float, events: tuple[float, ...] = (),
+         visible: bool = True) -> list[float]:
+    """
+    Drive [scheduler] like App.run does, with glfw.wait_events_timeout replaced by the fake [clock]
+
+    :param events: times at which input arrives
+    :return: times at which frames were rendered
+    """
+    frames = []
+    pending = sorted(events)
+    end = clock.now + duration
+    while clock.now < end:
+        timeout = scheduler.wait_timeout(visible)
+        if timeout is not None:
+            start = clock.now
+            wake = min([start + timeout] + [t for t in pending if t >= start])
+            if wake > end:
+                clock.now = end
+                break
+            clock.now = wake
+            pending = [t for t in pending if t > clock.now]
+            scheduler.after_wait(clock.now - start, timeout)
+        if scheduler.should_render(visible):
+            frames.append(clock.now)
+            scheduler.frame_rendered()
+        elif timeout is None:
+            # polling, frame not due yet
+            clock.now += .001
+    return frames
+
+
+def test_renders_continuously_by_default():
+    clock = _Clock()
+    frames = _run(FrameScheduler(target_fps=10., clock=clock), clock, 1.05)
+    assert len(frames) == 11
+
+
+def test_first_frames_render_in_idle_mode():
+    clock = _Clock()
+    frames = _run(FrameScheduler(target_fps=10., idle_mode=True, clock=clock), clock, 2.)
+    assert frames and frames[0] == 0.
+    assert len(frames) == 2
+
+
+def test_idle_mode_renders_after_input():
+    clock = _Clock()
+    scheduler = FrameScheduler(target_fps=100., settle_time=.1, idle_mode=True, clock=clock)
+    _run(scheduler, clock, 1.)
+    frames = _run(scheduler, clock, 1., events=(1.3,))
+    assert frames and all(1.3 <= t <= 1.41 for t in frames)
+    assert 8 <= len(frames) <= 12
+
+
+def test_redraw_request():
+    clock = _Clock()
+    woken = []
+    scheduler = FrameScheduler(target_fps=100., idle_mode=True, clock=clock, wake=lambda: woken.append(True))
+    _run(scheduler, clock, 1.)
+    scheduler.request_redraw(3)
+    assert woken
+    assert len(_run(scheduler, clock, 1.)) == 3
+
+
+def test_animating():
+    clock = _Clock()
+    scheduler = FrameScheduler(target_fps=20., idle_mode=True, clock=clock)
+    _run(scheduler, clock, 1.)
+    scheduler.animating = True
+    assert len(_run(scheduler, clock, 1.025)) == 21
+    scheduler.animating = False
+    assert _run(scheduler, clock, 1.) == []
+
+
+def test_hidden_window_waits_for_idle_interval():
+    clock = _Clock()
+    scheduler = FrameScheduler(target_fps=60., idle_interval=.5, clock=clock)
+    assert scheduler.wait_timeout(visible=False) == .5
+    assert _run(scheduler, clock, 2., visible=False) == []
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import os
+from threading import Thread
+
+import pytest
+
+from essentials.io import file
+from essentials.io.file import copy_file
+
+
+@pytest.mark.parametrize('size', [0, 1, 1000, (1 << 20) + 17])
+def test_copy_file(tmp_path, size):
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    data = os.urandom(size)
+    src.write_bytes(data)
+    dst.write_bytes(b'old content')
+    assert copy_file(str(src), str(dst), chunk_size=1 << 16) == size
+    assert dst.read_bytes() == data
+
+
+@pytest.mark.parametrize('fn', ['copy_file_range', 'sendfile'])
+def test_kernel_copy_reads_past_the_reported_size(tmp_path, fn):
+    if not hasattr(os, fn):
+        pytest.skip(f'os.{fn} is not available')
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    src.write_bytes(b'x' * 1000)
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        # the file grows after its size was read
+        with open(src, 'ab') as f:
+            f.write(b'y' * 100)
+        assert file._copy_kernel(getattr(os, fn), fsrc.fileno(), fdst.fileno(), 64) == 1100
+    assert dst.read_bytes() == b'x' * 1000 + b'y' * 100
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason='requires procfs')
+def test_copy_procfs_file(tmp_path):
+    dst = tmp_path / 'dst'
+    n = copy_file('/proc/self/status', str(dst))
+    assert n > 0
+    assert dst.read_bytes().startswith(b'Name:')
+
+
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason='requires named pipes')
+def test_copy_pipe(tmp_path):
+    fifo, dst = tmp_path / 'fifo', tmp_path / 'dst'
+    os.mkfifo(fifo)
+    data = b'through a pipe\n' * 1000
+
+    def write():
+        with open(fifo, 'wb') as f:
+            f.write(data)
+
+    writer = Thread(target=write)
+    writer.start()
+    assert copy_file(str(fifo), str(dst)) == len(data)
+    writer.join()
+    assert dst.read_bytes() == data
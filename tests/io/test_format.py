@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import pytest
+
+from essentials.io.format import _iter_lines, pformat
+
+_OBJECTS = [
+    None,
+    {},
+    [],
+    {'a': {}, 'b': []},
+    {'b': [1, 2, {'c': None, 'd': [[], [{}]]}], 'a': {'x': {'y': {'z': 1.5}}}},
+    [[1, [2, [3]]], 'text'],
+    {'text': 'first\nsecond\n', 'empty': '', 'unicode': 'äöü  '},
+    'plain string',
+    'multi\nline\n\nstring\n',
+    42,
+    '',
+]
+
+
+@pytest.mark.parametrize('obj', _OBJECTS)
+def test_streamed_lines(obj):
+    streamed, buffered = [], []
+    pformat(obj, streamed.append, prefix='> ')
+    pformat(obj, buffered.append, prefix='> ', stream=False)
+    assert streamed == buffered
+    assert '\n'.join(line[2:] for line in streamed) == pformat(obj)
+
+
+@pytest.mark.parametrize('chunks', [
+    [],
+    [''],
+    ['\n'],
+    ['a', 'b\nc', '\n', 'd\n\ne', 'f'],
+    ['\n\n', 'a\n', '\nb'],
+    ['abc', '', 'def\n'],
+])
+def test_iter_lines(chunks):
+    assert list(_iter_lines(chunks)) == ''.join(chunks).split('\n')
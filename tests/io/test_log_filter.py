@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import pytest
+
+from essentials.io import log_filter, logging
+from essentials.io.log_filter import LimitedLogger
+from essentials.io.logging import LogLevel
+
+
+class _Logger:
+    def __init__(self):
+        self.messages = []
+        self.flushed = False
+
+    def log(self, level: int, msg: str):
+        self.messages.append(msg)
+
+    def flush(self):
+        self.flushed = True
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(log_filter, 'time', clock)
+    monkeypatch.setattr(logging, '_min_level', LogLevel.TRACE)
+    return clock
+
+
+@pytest.fixture
+def target():
+    return _Logger()
+
+
+def test_first_every(target):
+    logger = LimitedLogger(target, first=3, every=5)
+    for i in range(20):
+        logger.info('m{}', i)
+    assert target.messages == [
+        'm0', 'm1', 'm2',
+        'm7 (4 similar messages suppressed)',
+        'm12 (4 similar messages suppressed)',
+        'm17 (4 similar messages suppressed)',
+    ]
+
+
+def test_every(target):
+    logger = LimitedLogger(target, every=3)
+    for i in range(7):
+        logger.info(f'm{i}')
+    assert target.messages == ['m0', 'm3 (2 similar messages suppressed)', 'm6 (2 similar messages suppressed)']
+
+
+def test_call_sites_are_independent(target):
+    logger = LimitedLogger(target, first=1)
+    for i in range(3):
+        logger.info('a{}', i)
+        logger.info('b{}', i)
+    assert target.messages == ['a0', 'b0']
+
+
+def test_suppressed_messages_are_not_formatted(target):
+    logger = LimitedLogger(target, first=1)
+    formatted = []
+
+    def message():
+        formatted.append(1)
+        return 'message'
+
+    for _ in range(3):
+        logger.debug(message)
+    assert target.messages == ['message'] and len(formatted) == 1
+
+
+def test_token_bucket(target, clock):
+    logger = LimitedLogger(target, rate=2, burst=3)
+
+    def burst(n: int) -> list[str]:
+        del target.messages[:]
+        for _ in range(n):
+            logger.warn('m')
+        return target.messages
+
+    # a full bucket allows [burst] messages
+    assert burst(5) == ['m', 'm', 'm']
+    # refilled at [rate] per second
+    clock.now += .5
+    assert burst(2) == ['m (2 similar messages suppressed)']
+    clock.now += .25
+    assert burst(1) == []
+    clock.now += .25
+    assert burst(1) == ['m (2 similar messages suppressed)']
+    # never more than [burst] tokens
+    clock.now += 60
+    assert len(burst(10)) == 3
+
+
+def test_dedup(target, clock):
+    logger = LimitedLogger(target, dedup=True, dedup_interval=10.)
+    for msg in 'aaaab':
+        logger.info(msg)
+    assert target.messages == ['a', 'suppressed 3 repeated messages: a', 'b']
+
+    # long runs of repeated messages are summarized every [dedup_interval] seconds
+    del target.messages[:]
+    logger.info('b')
+    logger.info('b')
+    clock.now += 10
+    logger.info('b')
+    assert target.messages == ['suppressed 3 repeated messages: b']
+
+    logger.info('b')
+    logger.flush()
+    assert target.messages[-1] == 'suppressed 1 repeated messages: b'
+    assert target.flushed
+
+
+def test_disabled_levels_are_dropped(target, monkeypatch):
+    monkeypatch.setattr(logging, '_min_level', LogLevel.INFO)
+    logger = LimitedLogger(target)
+    logger.debug('debug')
+    logger.info('info')
+    assert target.messages == ['info']
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import glob
+import gzip
+import json
+import os
+import time
+
+from essentials.io import log_sink
+from essentials.io.log_sink import RotatingJsonSink
+
+
+def _rotated(path) -> list[str]:
+    return sorted(glob.glob(f'{path}.*'))
+
+
+def _write(sink: RotatingJsonSink, n: int):
+    for i in range(n):
+        sink.write('test', 'info', f'message {i}')
+        # distinct rotation timestamps
+        time.sleep(.002)
+
+
+def test_rotation_and_compression(tmp_path):
+    path = str(tmp_path / 'log.jsonl')
+    sink = RotatingJsonSink(path, max_bytes=1, backups=2, flush_interval=.01)
+    _write(sink, 5)
+    sink.close()
+
+    rotated = _rotated(path)
+    assert len(rotated) == 2 and all(p.endswith('.gz') for p in rotated)
+    with gzip.open(rotated[-1], 'rt', encoding='utf-8') as f:
+        assert json.loads(f.read())['msg'] == 'message 3'
+
+
+def test_no_backups(tmp_path, capsys):
+    path = str(tmp_path / 'log.jsonl')
+    sink = RotatingJsonSink(path, max_bytes=1, backups=0, flush_interval=.01)
+    # several rotations queue up while the thread compresses
+    with sink._cond:
+        for i in range(20):
+            sink.write('test', 'info', f'message {i}')
+            time.sleep(.001)
+    time.sleep(.1)
+    assert sink._daemon.is_alive()
+    sink.close()
+    assert _rotated(path) == []
+    assert capsys.readouterr().err == ''
+
+
+def test_errors_keep_the_thread_alive(tmp_path, monkeypatch, capsys):
+    def fail(*_, **__):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(log_sink.gzip, 'open', fail)
+    path = str(tmp_path / 'log.jsonl')
+    sink = RotatingJsonSink(path, max_bytes=1, backups=5, flush_interval=.01)
+    _write(sink, 3)
+    time.sleep(.1)
+    assert sink._daemon.is_alive()
+    sink.close()
+
+    # uncompressed files are kept
+    rotated = _rotated(path)
+    assert len(rotated) == 2 and not any(p.endswith('.gz') for p in rotated)
+    assert 'disk full' in capsys.readouterr().err
+
+
+def test_interval_counts_the_age_of_existing_files(tmp_path):
+    path = tmp_path / 'log.jsonl'
+    path.write_text('{}\n')
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    sink = RotatingJsonSink(str(path), interval=60, compress=False)
+    sink.write('test', 'info', 'message')
+    sink.close()
+    assert len(_rotated(path)) == 1
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+import spdlog
+
+from essentials.io import logging
+
+
+@pytest.fixture
+def async_calls(monkeypatch, tmp_path):
+    calls = []
+
+    # keyword names of the spdlog 2.0.6 binding
+    def set_async_mode(queue_size=1 << 16, thread_count=1, overflow_policy=0):
+        calls.append((queue_size, thread_count, overflow_policy))
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(spdlog, 'set_async_mode', set_async_mode)
+    monkeypatch.setattr(logging, '_async_initialized', False)
+    return calls
+
+
+def test_set_async_mode(async_calls):
+    logging.set_async_mode(128, 'overrun_oldest')
+    assert async_calls == [(128, 1, spdlog.AsyncOverflowPolicy.OVERRUN_OLDEST)]
+
+
+def test_set_async_mode_unknown_policy(async_calls):
+    with pytest.raises(ValueError):
+        logging.set_async_mode(128, 'drop_everything')
+    assert async_calls == []
+
+
+def test_get_logger_async(async_calls):
+    logging.get_logger('test', 'async', async_mode=True)
+    logging.get_logger('test', 'async2', async_mode=True)
+    assert len(async_calls) == 1
+
+
+def test_levels_match_spdlog():
+    for name in ('TRACE', 'DEBUG', 'INFO', 'WARN', 'ERR', 'CRITICAL', 'OFF'):
+        assert getattr(logging.LogLevel, name) == getattr(spdlog.LogLevel, name)
+    assert logging._name_to_overflow_policy_map == {
+        'block'         : spdlog.AsyncOverflowPolicy.BLOCK,
+        'overrun_oldest': spdlog.AsyncOverflowPolicy.OVERRUN_OLDEST,
+    }
+
+
+def test_import_does_not_load_spdlog():
+    code = 'import sys, essentials.io.logging, essentials.io.log_filter, essentials.gui.core; sys.exit("spdlog" in sys.modules)'
+    path = os.pathsep.join(sys.path)
+    r = subprocess.run([sys.executable, '-c', code], env={**os.environ, 'PYTHONPATH': path})
+    assert r.returncode == 0
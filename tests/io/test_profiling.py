@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import pytest
+
+from essentials.io import logging, profiling
+from essentials.io.profiling import LatencyHistogram, _bucket, _bucket_upper
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    profiling.reset_profiles()
+    yield
+    profiling.reset_profiles()
+
+
+def test_buckets():
+    previous = -1
+    for ns in range(1 << 14):
+        b = _bucket(ns)
+        # monotonic, every value lies within its bucket
+        assert b >= previous
+        assert ns <= _bucket_upper(b)
+        if b > 0:
+            assert _bucket_upper(b - 1) < ns
+        # ~12.5% relative error
+        assert _bucket_upper(b) - ns <= max(ns / 8, 1)
+        previous = b
+    assert _bucket(-5) == 0
+
+
+def test_percentiles():
+    h = LatencyHistogram()
+    assert h.percentile(50) == 0
+    for ns in range(1, 1001):
+        h.record(ns * 1000)
+    for p, exact in ((50, 500_000), (95, 950_000), (99, 990_000)):
+        assert exact <= h.percentile(p) <= exact * 1.125
+    assert h.percentile(100) == 1_000_000
+
+    stats = h.stats()
+    assert stats['count'] == 1000
+    assert stats['max'] == pytest.approx(1e-3)
+    assert stats['mean'] == pytest.approx(500.5e-6)
+
+
+def test_percentile_is_capped_by_max():
+    h = LatencyHistogram()
+    h.record(1000)
+    assert h.percentile(99) == 1000
+
+
+class _A:
+    @logging.log_call('test', profile=True)
+    def __init__(self):
+        pass
+
+
+class _B:
+    @logging.log_call('test', profile=True)
+    def __init__(self):
+        pass
+
+
+def test_profiles_are_keyed_by_qualified_name():
+    _A(), _A(), _B()
+    stats = profiling.profile_stats()
+    assert stats[f'{__name__}._A.__init__']['calls'] == 2
+    assert stats[f'{__name__}._B.__init__']['calls'] == 1
+
+
+def test_explicit_name():
+    f = logging.log_call('test', name='work', profile=True)(lambda: None)
+    f()
+    assert profiling.profile_stats()['work']['calls'] == 1
+
+
+def test_sampling():
+    f = logging.log_call('test', name='sampled', profile=True, sample_every=3)(lambda: None)
+    for _ in range(10):
+        f()
+    stats = profiling.profile_stats()['sampled']
+    assert stats['calls'] == 10
+    assert stats['sampled'] == 3
+
+
+@pytest.mark.parametrize('sample_every', [0, -1])
+def test_invalid_sample_every(sample_every):
+    with pytest.raises(ValueError):
+        logging.log_call('test', profile=True, sample_every=sample_every)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import io
+import os
+
+import pytest
+
+from essentials.io import progress, spinner
+from essentials.io.progress import ProgressBar, ProgressItem, ProgressRenderer
+from essentials.io.spinner import Spinner
+
+
+@pytest.fixture
+def columns(monkeypatch):
+    size = {'columns': 80}
+    monkeypatch.setattr(progress.shutil, 'get_terminal_size', lambda: os.terminal_size((size['columns'], 24)))
+    return size
+
+
+@pytest.mark.parametrize('width', [0, 1, 5, 8, 9, 10, 40])
+def test_bar_fits_any_width(width):
+    bar = ProgressBar('msg', io.StringIO())
+    bar.update(.5)
+    line = bar.render(width)
+    assert line.startswith('msg 50.0%')
+
+
+def test_narrow_terminal(columns):
+    columns['columns'] = 6
+    sink = io.StringIO()
+    with ProgressBar('downloading', sink) as bar:
+        bar.update(.3)
+        bar._renderer._draw()
+    assert 'downl' in sink.getvalue()
+
+
+class _Failing(ProgressItem):
+    def render(self, width: int) -> str:
+        raise RuntimeError('render failed')
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_failing_render_resets_the_daemon(columns):
+    renderer = ProgressRenderer(io.StringIO(), interval=.01)
+    item = _Failing()
+    renderer.add(item)
+    daemon = renderer._daemon
+    daemon.join(1)
+    assert not daemon.is_alive()
+    assert renderer._daemon is None
+
+    # a new item starts a new renderer
+    renderer._items.remove(item)
+    bar = ProgressBar('ok')
+    renderer.add(bar)
+    assert renderer._daemon is not None and renderer._daemon.is_alive()
+    renderer.remove(bar)
+    assert renderer._daemon is None
+
+
+def test_spinner_advances_by_time(monkeypatch):
+    now = [100.]
+    monkeypatch.setattr(spinner.time, 'monotonic', lambda: now[0])
+    s = Spinner('work', io.StringIO())
+    assert s.render(20) == '| work'
+    # redraws without elapsed time keep the state
+    assert s.render(20) == '| work'
+    now[0] += Spinner._STATE_TIME
+    assert s.render(20) == '/ work'
+    now[0] += 3 * Spinner._STATE_TIME
+    assert s.render(20) == '| work'
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import pytest
+
+from essentials.itertools.chunking import batched, chunked_by_size, windowed
+
+
+def test_batched():
+    assert list(batched('ABCDE', 2)) == [('A', 'B'), ('C', 'D'), ('E',)]
+    assert list(batched('ABCD', 2)) == [('A', 'B'), ('C', 'D')]
+    assert list(batched([], 3)) == []
+    with pytest.raises(ValueError):
+        list(batched('ABC', 0))
+
+
+def test_windowed():
+    assert list(windowed('ABCDE', 3)) == [('A', 'B', 'C'), ('B', 'C', 'D'), ('C', 'D', 'E')]
+    assert list(windowed('AB', 3)) == []
+    assert list(windowed('ABC', 3)) == [('A', 'B', 'C')]
+
+
+@pytest.mark.parametrize('n, step', [(3, 2), (2, 3), (3, 3), (1, 4)])
+def test_windowed_step(n, step):
+    items = 'ABCDEFGHIJ'
+    expected = [tuple(items[i:i + n]) for i in range(0, len(items) - n + 1, step)]
+    assert list(windowed(items, n, step)) == expected
+
+
+def test_windowed_invalid():
+    with pytest.raises(ValueError):
+        list(windowed('ABC', 0))
+    with pytest.raises(ValueError):
+        list(windowed('ABC', 2, 0))
+
+
+def test_chunked_by_size():
+    assert list(chunked_by_size(['aa', 'b', 'ccc', 'd'], 3)) == [['aa', 'b'], ['ccc'], ['d']]
+    assert list(chunked_by_size([], 3)) == []
+
+
+def test_chunked_by_size_oversized_items():
+    # items larger than max_size are chunks of their own, they never split or merge
+    items = ['a', 'bbbbb', 'c', 'dddddd', 'eeeeeee', 'f', 'g']
+    assert list(chunked_by_size(items, 3)) == [['a'], ['bbbbb'], ['c'], ['dddddd'], ['eeeeeee'], ['f', 'g']]
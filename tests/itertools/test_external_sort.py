@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import os
+import random
+from operator import itemgetter
+
+import pytest
+
+from essentials.itertools.external_sort import external_sort
+
+
+def _size(_) -> int:
+    return 1
+
+
+def _items(n: int = 10_000, keys: int = 100) -> list[tuple[int, int]]:
+    rng = random.Random(n)
+    # few distinct keys, the second element records the input order
+    return [(rng.randrange(keys), i) for i in range(n)]
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_in_memory(reverse, tmp_path):
+    items = _items(1000)
+    assert list(external_sort(items, itemgetter(0), reverse, tmp_dir=str(tmp_path))) == \
+           sorted(items, key=itemgetter(0), reverse=reverse)
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_spilled(reverse, tmp_path):
+    items = _items()
+    # 4 runs of several pickled batches each
+    result = list(external_sort(items, itemgetter(0), reverse, memory_budget=3000, size=_size, tmp_dir=str(tmp_path)))
+    # sorted() is stable, so this also checks that equal keys keep their input order
+    assert result == sorted(items, key=itemgetter(0), reverse=reverse)
+    assert os.listdir(tmp_path) == []
+
+
+def test_without_key():
+    items = [i for i, _ in _items()]
+    assert list(external_sort(items, memory_budget=1000, size=_size)) == sorted(items)
+
+
+def test_empty():
+    assert list(external_sort([], memory_budget=10, size=_size)) == []
+
+
+def test_workers(tmp_path):
+    items = _items()
+    result = list(external_sort(
+            items, itemgetter(0), memory_budget=1000, size=_size, num_workers=2, tmp_dir=str(tmp_path)
+    ))
+    assert result == sorted(items, key=itemgetter(0))
+    assert os.listdir(tmp_path) == []
+
+
+def test_early_close_removes_runs(tmp_path):
+    items = _items()
+    it = external_sort(items, itemgetter(0), memory_budget=1000, size=_size, tmp_dir=str(tmp_path))
+    assert [next(it) for _ in range(10)] == sorted(items, key=itemgetter(0))[:10]
+    [run_dir] = os.listdir(tmp_path)
+    assert len(os.listdir(tmp_path / run_dir)) == 10
+    it.close()
+    assert os.listdir(tmp_path) == []
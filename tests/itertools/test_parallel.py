@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import time
+from itertools import count, islice
+from operator import neg
+
+import pytest
+
+from essentials.itertools.parallel import process_imap, thread_imap
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def test_ordered():
+    assert list(thread_imap(lambda x: x * x, range(100), num_workers=4)) == [x * x for x in range(100)]
+    # results keep the input order even if later items finish first
+    assert list(thread_imap(_sleep, [.2, .1, 0.], num_workers=3)) == [.2, .1, 0.]
+
+
+def test_unordered():
+    assert list(thread_imap(_sleep, [.3, .1, 0.], num_workers=3, ordered=False)) == [0., .1, .3]
+    assert sorted(thread_imap(neg, range(100), num_workers=4, ordered=False)) == sorted(map(neg, range(100)))
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_backpressure(ordered):
+    pulled = []
+
+    def source():
+        for i in count():
+            pulled.append(i)
+            yield i
+
+    results = thread_imap(neg, source(), num_workers=2, prefetch=4, ordered=ordered)
+    assert len(list(islice(results, 10))) == 10
+    # the unbounded input is only read ahead by [prefetch] items
+    assert len(pulled) <= 10 + 4
+    results.close()
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_error_propagation(ordered):
+    def fail_on_3(x):
+        if x == 3:
+            raise KeyError(x)
+        return x
+
+    results = []
+    with pytest.raises(KeyError):
+        for r in thread_imap(fail_on_3, range(100), num_workers=2, prefetch=2, ordered=ordered):
+            results.append(r)
+    assert 3 not in results
+    if ordered:
+        assert results == [0, 1, 2]
+
+
+@pytest.mark.parametrize('imap', [thread_imap, process_imap])
+def test_invalid_prefetch(imap):
+    with pytest.raises(ValueError):
+        list(imap(neg, range(10), num_workers=2, prefetch=0))
+
+
+def test_process_imap():
+    assert list(process_imap(neg, range(50), num_workers=2)) == [-x for x in range(50)]
+    assert sorted(process_imap(neg, range(50), num_workers=2, ordered=False)) == sorted(-x for x in range(50))
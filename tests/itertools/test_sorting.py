@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import random
+
+import pytest
+
+from essentials.itertools.sorting import CompositeSortBy, SortBy, top_k
+
+_NAMES = ['bob', 'alice', 'carol', 'dave', 'eve']
+_STATUS = ['running', 'queued', 'done', 'failed', 'unknown']
+
+
+def _tasks(n: int = 200) -> list[dict]:
+    rng = random.Random(n)
+    return [
+        {'id': i, 'name': rng.choice(_NAMES), 'status': rng.choice(_STATUS), 'eta': rng.randrange(10)}
+        for i in range(n)
+    ]
+
+
+def test_reverse_strings():
+    tasks = _tasks()
+    key = SortBy(lambda t: t['name'], reverse=True)
+    assert sorted(tasks, key=key) == sorted(tasks, key=lambda t: t['name'], reverse=True)
+
+
+def test_reversed_in_composite_keys():
+    tasks = _tasks()
+    # descending by name (wrapped in _Reversed), ties ascending by eta, then by input order
+    key = SortBy(lambda t: t['name'], reverse=True).then(lambda t: t['eta'])
+    expected = sorted(sorted(tasks, key=lambda t: t['eta']), key=lambda t: t['name'], reverse=True)
+    assert sorted(tasks, key=key) == expected
+
+    key = CompositeSortBy(SortBy(lambda t: t['eta']), SortBy(lambda t: t['name'], reverse=True))
+    expected = sorted(sorted(tasks, key=lambda t: t['name'], reverse=True), key=lambda t: t['eta'])
+    assert sorted(tasks, key=key) == expected
+
+
+def test_priorities():
+    tasks = _tasks()
+    priorities = ['running', 'queued', 'done']
+    key = SortBy(lambda t: t['status'], priorities)
+    result = sorted(tasks, key=key)
+
+    def rank(t):
+        return priorities.index(t['status']) if t['status'] in priorities else len(priorities)
+
+    assert result == sorted(tasks, key=rank)
+    assert sorted(tasks, key=SortBy(lambda t: t['status'], priorities, reverse=True)) == \
+           sorted(tasks, key=rank, reverse=True)
+
+
+def test_priority_rank_ties():
+    # the first occurrence of a value wins, same as list.index
+    key = SortBy(lambda x: x, ['b', 'a', 'b', 'c'])
+    assert [key(x) for x in 'abc'] == [1, 0, 3]
+    # unknown values share one rank after all known ones and keep their order
+    items = ['x', 'c', 'z', 'a', 'y', 'b']
+    assert sorted(items, key=key) == ['b', 'a', 'c', 'x', 'z', 'y']
+
+
+@pytest.mark.parametrize('k', [-1, 0, 1, 5, 50, 199, 200, 500])
+def test_top_k(k):
+    tasks = _tasks()
+    # many equal keys: the result must be stable
+    for key in (lambda t: t['eta'], SortBy(lambda t: t['status'], ['done', 'running']).then(lambda t: t['eta'])):
+        assert top_k(tasks, k, key) == sorted(tasks, key=key)[:max(k, 0)]
+    assert top_k(iter(tasks), k, key=lambda t: t['eta']) == sorted(tasks, key=lambda t: t['eta'])[:max(k, 0)]
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+Minimal stand-in for the spdlog binding (used by tests only if spdlog is not installed).
+Signatures follow spdlog-python 2.0.6 (src/pyspdlog.cpp).
+
+@author Kami-Kaze
+"""
+
+
+class LogLevel:
+    TRACE, DEBUG, INFO, WARN, ERR, CRITICAL, OFF = range(7)
+
+
+class AsyncOverflowPolicy:
+    BLOCK, OVERRUN_OLDEST = 0, 1
+
+
+class PatternTimeType:
+    local, utc = 0, 1
+
+
+def set_async_mode(queue_size: int = 1 << 16, thread_count: int = 1, overflow_policy: int = 0):
+    pass
+
+
+class Sink:
+    def __init__(self, *args, **kwargs):
+        self.level = LogLevel.TRACE
+
+    def set_level(self, level: int):
+        self.level = level
+
+
+class stdout_sink_mt(Sink):
+    pass
+
+
+class null_sink_mt(Sink):
+    pass
+
+
+class basic_file_sink_mt(Sink):
+    pass
+
+
+class Logger:
+    def __init__(self, name: str, sinks=(), async_mode: bool = False):
+        self._name = name
+        self._level = LogLevel.TRACE
+        self.messages = []
+
+    def name(self) -> str:
+        return self._name
+
+    def set_pattern(self, pattern: str, time_type: int = PatternTimeType.local):
+        pass
+
+    def set_level(self, level: int):
+        self._level = level
+
+    def should_log(self, level: int) -> bool:
+        return level >= self._level
+
+    def log(self, level: int, msg: str):
+        self.messages.append((level, msg))
+
+    def trace(self, msg: str):
+        self.log(LogLevel.TRACE, msg)
+
+    def debug(self, msg: str):
+        self.log(LogLevel.DEBUG, msg)
+
+    def info(self, msg: str):
+        self.log(LogLevel.INFO, msg)
+
+    def warn(self, msg: str):
+        self.log(LogLevel.WARN, msg)
+
+    def error(self, msg: str):
+        self.log(LogLevel.ERR, msg)
+
+    def critical(self, msg: str):
+        self.log(LogLevel.CRITICAL, msg)
+
+    def flush(self):
+        pass
+
+
+SinkLogger = Logger
+
+
+def drop(name: str):
+    pass
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import random
+
+import pytest
+
+from essentials.tui.formatter import SimpleFormatter
+from essentials.tui.scrollable_list import ScrollableList
+
+
+class _Screen:
+    def __init__(self, rows: int = 50, cols: int = 80):
+        self.size = rows, cols
+        self.lines = []
+
+    def getmaxyx(self):
+        return self.size
+
+    def addstr(self, x: int, y: int, line: str):
+        self.lines.append((x, line))
+
+
+def _draw(scrollable: ScrollableList, max_lines: int) -> tuple[list, int]:
+    screen = _Screen()
+    end = scrollable.draw(0, 0, max_lines, screen)
+    return screen.lines, end
+
+
+def _items(n: int) -> list[int]:
+    rng = random.Random(n)
+    return [rng.randrange(n // 2 + 1) for _ in range(n)]
+
+
+@pytest.mark.parametrize('n', [0, 3, 10, 40])
+@pytest.mark.parametrize('lines_per_item', [1, 2])
+def test_partial_sort_scrolling(n, lines_per_item):
+    items = _items(n)
+    formatter = SimpleFormatter(*[lambda item, _, i=i: f'{item}/{i}' for i in range(lines_per_item)])
+    full = ScrollableList(items, formatter, filter=lambda x: x % 3, sort=lambda x: -x)
+    partial = ScrollableList(items, formatter, filter=lambda x: x % 3, sort=lambda x: -x, partial_sort=True)
+
+    # the same lines and clamped offsets, whatever is scrolled
+    for amount in [0, 1, 3, -2, 7, 15, 100, -100, 5, 2, -1, 50]:
+        for scrollable in (full, partial):
+            scrollable.scroll(amount)
+        assert _draw(partial, 8) == _draw(full, 8)
+        assert partial._scroll_offset == full._scroll_offset
+    for amount in [1, 2, -1, 5]:
+        for scrollable in (full, partial):
+            scrollable.scroll_page(amount)
+        assert _draw(partial, 8) == _draw(full, 8)
+
+
+def test_scroll_clamping():
+    scrollable = ScrollableList(list(range(20)), sort=lambda x: x, partial_sort=True)
+    scrollable.scroll(-5)
+    assert _draw(scrollable, 5)[0][0] == (0, 0)
+    scrollable.scroll(10)
+    lines, end = _draw(scrollable, 5)
+    assert [line for _, line in lines] == [10, 11, 12, 13, 14] and end == 5
+    # scrolled to the end, the last page stays full
+    scrollable.scroll(5)
+    assert [line for _, line in _draw(scrollable, 5)[0]] == [15, 16, 17, 18, 19]
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import time
+
+import pytest
+
+pytest.importorskip('requests')
+
+import requests
+
+from essentials.util import download as dl_module
+from essentials.util.download import download
+
+_SIZE = 1 << 20
+_PART_SIZE = _SIZE // 4
+
+
+@pytest.fixture
+def file_server():
+    """
+    Local http server for /<name> -> files[name], supports HEAD, Range and If-Range.
+    options: 'ranges' (advertise / honor range requests), 'interrupt' (range start -> number of bytes
+    sent before the connection is closed, once), 'delay' (range start -> seconds to wait before sending)
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from threading import Thread
+
+    files = {}
+    log = []
+    options = {'ranges': True, 'interrupt': {}, 'delay': {}}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _file(self):
+            data = files.get(self.path.lstrip('/'))
+            if data is None:
+                self.send_error(404)
+            return data
+
+        def do_HEAD(self):
+            log.append(('HEAD', None, None))
+            data = self._file()
+            if data is None:
+                return
+            self.send_response(200)
+            self._headers(len(data), data)
+            self.end_headers()
+
+        def do_GET(self):
+            rng, if_range = self.headers.get('Range'), self.headers.get('If-Range')
+            log.append(('GET', rng, if_range))
+            data = self._file()
+            if data is None:
+                return
+            etag = _etag(data)
+            if rng is None or not options['ranges'] or (if_range is not None and if_range != etag):
+                self.send_response(200)
+                self._headers(len(data), data)
+                self.end_headers()
+                self.wfile.write(data)
+                return
+
+            start, end = map(int, re.fullmatch(r'bytes=(\d+)-(\d+)', rng).groups())
+            time.sleep(options['delay'].get(start, 0))
+            body = data[start:end + 1]
+            self.send_response(206)
+            self._headers(len(body), data)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+            self.end_headers()
+            if (cut := options['interrupt'].pop(start, None)) is not None:
+                self.wfile.write(body[:cut])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+
+        def _headers(self, length: int, data: bytes):
+            self.send_header('Content-Length', str(length))
+            self.send_header('ETag', _etag(data))
+            if options['ranges']:
+                self.send_header('Accept-Ranges', 'bytes')
+
+        def log_message(self, *_):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}', files, log, options
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _etag(data: bytes) -> str:
+    return f'"{hashlib.md5(data).hexdigest()}"'
+
+
+def _content(size: int = _SIZE) -> bytes:
+    return random.Random(size).randbytes(size)
+
+
+def _ranges(log) -> list[tuple[int, int]]:
+    return sorted(tuple(map(int, re.fullmatch(r'bytes=(\d+)-(\d+)', rng).groups())) for method, rng, _ in log
+                  if method == 'GET' and rng is not None)
+
+
+def _assert_done(path, content):
+    with open(path, 'rb') as f:
+        assert f.read() == content
+    assert not os.path.exists(path + '.part')
+    assert not os.path.exists(path + '.part.json')
+
+
+@pytest.mark.parametrize('size, num_parts', [(10, 3), (12, 4), (5, 8), (_SIZE, 4)])
+def test_split(size, num_parts):
+    parts = dl_module._split(size, num_parts)
+    assert len(parts) <= num_parts
+    assert parts[0].start == 0 and parts[-1].end == size
+    for a, b in zip(parts, parts[1:]):
+        assert a.end == b.start
+    assert all(part.done == part.start < part.end for part in parts)
+
+
+def test_download_in_parts(file_server, tmp_path):
+    url, files, log, _ = file_server
+    files['f'] = content = _content()
+    path = str(tmp_path / 'f')
+    checksum = hashlib.sha256(content).hexdigest()
+
+    assert download(f'{url}/f', path, checksum, num_workers=4, min_part_size=_PART_SIZE) == path
+    _assert_done(path, content)
+    assert _ranges(log) == [(start, start + _PART_SIZE - 1) for start in range(0, _SIZE, _PART_SIZE)]
+    # range requests are conditional on the probed ETag
+    assert {if_range for method, _, if_range in log if method == 'GET'} == {_etag(content)}
+
+
+def test_changed_content_is_not_mixed(file_server, tmp_path):
+    url, files, log, _ = file_server
+    files['f'] = _content()
+    path = str(tmp_path / 'f')
+    # a previous attempt at an older version of the file
+    download(f'{url}/f', path, num_workers=4, min_part_size=_PART_SIZE)
+    os.replace(path, path + '.part')
+    with open(path + '.part.json', 'w') as f:
+        json.dump({'url': f'{url}/f', 'size': _SIZE, 'etag': _etag(files['f']),
+                   'parts': [[0, _PART_SIZE, _PART_SIZE], [_PART_SIZE, _SIZE, _PART_SIZE]]}, f)
+
+    files['f'] = content = _content()[::-1]
+    log.clear()
+    download(f'{url}/f', path, hashlib.sha256(content).hexdigest(), num_workers=4, min_part_size=_PART_SIZE)
+    _assert_done(path, content)
+    # the stale state was discarded, everything was downloaded again
+    assert _ranges(log) == [(start, start + _PART_SIZE - 1) for start in range(0, _SIZE, _PART_SIZE)]
+
+
+def test_if_range_mismatch(file_server, tmp_path, monkeypatch):
+    url, files, log, _ = file_server
+    files['f'] = _content()
+    path = str(tmp_path / 'f')
+    probe = dl_module._probe
+
+    def changed_after_probe(*args):
+        result = probe(*args)
+        files['f'] = _content()[::-1]
+        return result
+
+    monkeypatch.setattr(dl_module, '_probe', changed_after_probe)
+    # the server answers with the full (new) file instead of a range of the old one
+    with pytest.raises(RuntimeError, match='ignored range request'):
+        download(f'{url}/f', path, num_workers=4, min_part_size=_PART_SIZE)
+    assert not os.path.exists(path)
+
+
+def test_resume(file_server, tmp_path):
+    url, files, log, _ = file_server
+    files['f'] = content = _content()
+    path = str(tmp_path / 'f')
+    half = _PART_SIZE // 2
+
+    # previous attempt: the first part is complete, the second one is half done, the others did not start
+    with open(path + '.part', 'wb') as f:
+        f.write(content[:_PART_SIZE + half])
+        f.truncate(_SIZE)
+    parts = [[start, start + _PART_SIZE, start] for start in range(0, _SIZE, _PART_SIZE)]
+    parts[0][2] = _PART_SIZE
+    parts[1][2] = _PART_SIZE + half
+    with open(path + '.part.json', 'w') as f:
+        json.dump({'url': f'{url}/f', 'size': _SIZE, 'etag': _etag(content), 'parts': parts}, f)
+
+    download(f'{url}/f', path, hashlib.sha256(content).hexdigest(), num_workers=4, min_part_size=_PART_SIZE)
+    _assert_done(path, content)
+    assert _ranges(log) == [
+        (_PART_SIZE + half, 2 * _PART_SIZE - 1),
+        (2 * _PART_SIZE, 3 * _PART_SIZE - 1),
+        (3 * _PART_SIZE, _SIZE - 1),
+    ]
+
+
+def test_checksum_of_out_of_order_parts(file_server, tmp_path):
+    url, files, log, options = file_server
+    files['f'] = content = _content()
+    path = str(tmp_path / 'f')
+    # the parts arrive back to front, the checksum has to read them back from disk
+    options['delay'].update({0: .6, _PART_SIZE: .4, 2 * _PART_SIZE: .2})
+
+    download(f'{url}/f', path, hashlib.sha256(content).hexdigest(), num_workers=4, min_part_size=_PART_SIZE)
+    _assert_done(path, content)
+
+
+def test_checksum_catch_up(tmp_path):
+    content = _content()
+    path = str(tmp_path / 'f')
+    with open(path + '.part', 'wb') as f:
+        f.write(content)
+    parts = dl_module._split(_SIZE, 4)
+    dl = dl_module._Download(path, 'url', _SIZE, None, parts, 'sha256', None)
+
+    # chunks of all parts in reverse order, the first part last
+    for part in reversed(parts):
+        for offset in range(part.start, part.end, 1 << 16):
+            dl.wrote(part, offset, content[offset:offset + (1 << 16)])
+    assert dl.hexdigest() == hashlib.sha256(content).hexdigest()
+
+
+def test_checksum_of_incomplete_download(tmp_path):
+    path = str(tmp_path / 'f')
+    with open(path + '.part', 'wb') as f:
+        f.truncate(_SIZE)
+    parts = dl_module._split(_SIZE, 4)
+    dl = dl_module._Download(path, 'url', _SIZE, None, parts, 'sha256', None)
+    dl.wrote(parts[1], parts[1].start, bytes(_PART_SIZE))
+    with pytest.raises(RuntimeError, match='incomplete'):
+        dl.hexdigest()
+
+
+def test_no_range_support(file_server, tmp_path):
+    url, files, log, options = file_server
+    options['ranges'] = False
+    files['f'] = content = _content()
+    path = str(tmp_path / 'f')
+    progress = []
+
+    download(f'{url}/f', path, hashlib.sha256(content).hexdigest(), num_workers=4, min_part_size=_PART_SIZE,
+             progress=lambda done, total: progress.append((done, total)))
+    _assert_done(path, content)
+    assert [(method, rng) for method, rng, _ in log] == [('HEAD', None), ('GET', None)]
+    assert progress[-1] == (_SIZE, _SIZE)
+
+
+def test_interrupt_and_resume(file_server, tmp_path):
+    url, files, log, options = file_server
+    files['f'] = content = _content()
+    path = str(tmp_path / 'f')
+    checksum = hashlib.sha256(content).hexdigest()
+    options['interrupt'][2 * _PART_SIZE] = _PART_SIZE // 2
+
+    with pytest.raises(requests.RequestException):
+        download(f'{url}/f', path, checksum, num_workers=4, min_part_size=_PART_SIZE)
+    assert not os.path.exists(path)
+    with open(path + '.part.json') as f:
+        state = json.load(f)
+    assert state['size'] == _SIZE and state['etag'] == _etag(content)
+    done = {start: done for start, _, done in state['parts']}
+
+    log.clear()
+    download(f'{url}/f', path, checksum, num_workers=4, min_part_size=_PART_SIZE)
+    _assert_done(path, content)
+    # only the missing bytes were requested again
+    ranges = _ranges(log)
+    assert all(start == done[start // _PART_SIZE * _PART_SIZE] for start, _ in ranges)
+    assert sum(end + 1 - start for start, end in ranges) == _SIZE - sum(d - s for s, d in done.items())
+
+
+def test_checksum_mismatch(file_server, tmp_path):
+    url, files, log, _ = file_server
+    files['f'] = _content()
+    path = str(tmp_path / 'f')
+
+    with pytest.raises(ValueError, match='Checksum mismatch'):
+        download(f'{url}/f', path, hashlib.sha256(b'other').hexdigest(), num_workers=4, min_part_size=_PART_SIZE)
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + '.part')
+    assert not os.path.exists(path + '.part.json')
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from essentials.util import git
+
+
+def test_urls():
+    assert git.file_url('owner', 'repo', 'a/b.txt') == 'https://raw.githubusercontent.com/owner/repo/main/a/b.txt'
+    assert git.release_asset_url('owner', 'repo', 'x.zip') == 'https://github.com/owner/repo/releases/latest/download/x.zip'
+    assert git.release_asset_url('owner', 'repo', 'x.zip', 'v1.0') == 'https://github.com/owner/repo/releases/download/v1.0/x.zip'
+
+
+def test_import_does_not_load_requests():
+    code = 'import sys, essentials.util.git; sys.exit("requests" in sys.modules or "essentials.util.download" in sys.modules)'
+    r = subprocess.run([sys.executable, '-c', code], env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)})
+    assert r.returncode == 0
+
+
+def test_download_release_asset(monkeypatch):
+    pytest.importorskip('requests')
+    from essentials.util import download
+
+    calls = []
+    monkeypatch.setattr(download, 'download', lambda url, path, **kwargs: calls.append((url, path, kwargs)) or path)
+    assert git.download_release_asset('owner', 'repo', 'x.zip', 'out.zip', tag='v1', num_workers=2) == 'out.zip'
+    assert calls == [('https://github.com/owner/repo/releases/download/v1/x.zip', 'out.zip', {'num_workers': 2})]
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import essentials.tui
+
+
+def test_exports_resolve_and_are_cached():
+    from essentials.tui import utilities
+    assert essentials.tui.utilities is utilities
+    assert vars(essentials.tui)['utilities'] is utilities
+    assert 'ScrollableList' in dir(essentials.tui)
+
+
+def test_unknown_name():
+    with pytest.raises(AttributeError, match='essentials.tui'):
+        essentials.tui.missing
+
+
+@pytest.mark.parametrize('package, submodule', [
+    ('essentials.itertools', 'essentials.itertools.parallel'),
+    ('essentials.tui', 'essentials.tui.scrollable_list'),
+    ('essentials.mt_processor', 'essentials.mt_processor.processor'),
+])
+def test_packages_import_lazily(package, submodule):
+    code = f'import sys, {package}; sys.exit({submodule!r} in sys.modules)'
+    r = subprocess.run([sys.executable, '-c', code], env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)})
+    assert r.returncode == 0
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import io
+from array import array
+
+import pytest
+
+from essentials.util.text_utils import parse_columns
+
+
+def _parse(source, chunk_size: int = 1 << 20, **kwargs) -> tuple[list, ...]:
+    columns = None
+    for batch in parse_columns(source, ',', (int, float, str), chunk_size=chunk_size, **kwargs):
+        if columns is None:
+            columns = tuple([] for _ in batch)
+        for column, values in zip(columns, batch):
+            column.extend(values)
+    return columns
+
+
+EXPECTED = ([1, 2, 3], [1.5, 2.5, 3.5], ['a', 'b', 'c'])
+LINES = ['1,1.5,a', '2,2.5,b', '3,3.5,c']
+
+
+@pytest.mark.parametrize('text', [
+    '1,1.5,a\n2,2.5,b\n3,3.5,c',
+    '1,1.5,a\n2,2.5,b\n3,3.5,c\n',
+    '1,1.5,a\n2,2.5,b\n3,3.5,c\n\n\n',
+    '\n1,1.5,a\n\n2,2.5,b\n\n\n3,3.5,c\n',
+])
+@pytest.mark.parametrize('chunk_size', [4, 9, 1 << 20])
+def test_empty_lines_are_skipped(text, chunk_size):
+    assert _parse(io.StringIO(text), chunk_size) == EXPECTED
+    assert _parse(text.split('\n'), chunk_size) == EXPECTED
+
+
+def test_header_and_path(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('x,y,z\n\n' + '\n'.join(LINES) + '\n\n')
+    assert _parse(str(path), header=True) == EXPECTED
+
+
+def test_only_empty_lines():
+    assert _parse(io.StringIO('\n\n\n')) is None
+
+
+def test_array_output():
+    ints, floats, strs = next(parse_columns(LINES, ',', (int, float, str)))
+    assert ints == array('q', [1, 2, 3]) and floats == array('d', [1.5, 2.5, 3.5]) and strs == ['a', 'b', 'c']
+
+
+def test_field_count_error_counts_empty_lines():
+    with pytest.raises(ValueError, match='Line 4: expected 3 fields, got 2'):
+        _parse(io.StringIO('1,1.5,a\n\n2,2.5,b\n3,3.5\n'))
+
+
+def test_conversion_error():
+    with pytest.raises(ValueError, match='Column 0'):
+        _parse(['1,1.5,a', 'x,2.5,b'])
+
+
+@pytest.mark.parametrize('lines', [
+    ['1,2,3', '4,5', '6,7,8,9'],
+    ['1,2', '3,4,5,6', '7,8,9'],
+    ['1,2,3', '4,5,6', '7,8,9,10', '11,12'],
+])
+def test_field_count_errors_that_add_up(lines):
+    # the first line decides the number of fields
+    with pytest.raises(ValueError, match=r'Line \d: expected \d fields'):
+        list(parse_columns(lines, ',', [int] * 2))
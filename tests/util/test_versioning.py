@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+@author Kami-Kaze
+"""
+
+import pickle
+from copy import copy as shallow_copy, deepcopy
+
+import pytest
+
+pytest.importorskip('requests')
+
+from essentials.util import versioning
+from essentials.util.versioning import Version, VersionRange, sort_versions
+
+
+def test_build_metadata_does_not_affect_precedence():
+    a, b = Version.parse_version('1.2.3'), Version.parse_version('1.2.3+abc')
+    assert a == b and not a < b and not b < a
+    assert hash(a) == hash(b)
+    assert len({a, b}) == 1
+    assert b.build == 'abc' and str(b) == '1.2.3+abc'
+    assert Version.parse_version('1.2.3+abc') < Version.parse_version('1.2.4')
+
+
+def test_check_version_ignores_build_metadata(monkeypatch):
+    monkeypatch.setattr(versioning, 'fetch_version', lambda *_: Version.parse_version('1.2.3+abc'))
+    assert versioning.check_version('1.2.3', 'http://localhost/version', cache=None) is None
+    assert versioning.check_version('1.2.2', 'http://localhost/version', cache=None) == Version(1, 2, 3)
+
+
+def test_prerelease_order():
+    versions = ['1.0.0', '1.0.0-rc.1', '1.0.0-alpha', '1.0.0-alpha.1', '1.0.0-beta.2', '1.0.0-beta.11', '0.9.9']
+    assert sort_versions(versions) == [
+        '0.9.9', '1.0.0-alpha', '1.0.0-alpha.1', '1.0.0-beta.2', '1.0.0-beta.11', '1.0.0-rc.1', '1.0.0',
+    ]
+
+
+def test_pickle_keeps_build():
+    v = Version(1, 2, 3, 'rc.1', 'abc')
+    copy = pickle.loads(pickle.dumps(v))
+    assert copy == v and copy.build == 'abc' and copy.prerelease == 'rc.1'
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        assert pickle.loads(pickle.dumps(v, protocol)).build == 'abc'
+    assert shallow_copy(v).build == 'abc' and deepcopy(v).build == 'abc'
+
+
+def test_immutable():
+    v = Version.parse_version('1.2.3+abc')
+    with pytest.raises(AttributeError):
+        v.build = 'other'
+    with pytest.raises(AttributeError):
+        del v.build
+    with pytest.raises(AttributeError):
+        v.major = 2
+    # parsed versions are shared, so they must never change
+    assert Version.parse_version('1.2.3+abc') is v and v.build == 'abc'
+
+
+@pytest.mark.parametrize('expression, version, expected', [
+    ('=1.2.3', '1.2.3+abc', True),
+    ('<=1.2.3', '1.2.3+abc', True),
+    ('>1.2.3', '1.2.3+abc', False),
+    ('!=1.2.3', '1.2.3+abc', False),
+    ('1.2.x', '1.2.9+build.1', True),
+    ('>=1.2.3-rc.1 <2', '1.2.3-rc.2', True),
+    ('>=1.2.3-rc.1 <2', '1.2.4-rc.1', False),
+    ('^1.2.3', '2.0.0', False),
+])
+def test_range_matches(expression, version, expected):
+    assert (version in VersionRange(expression)) is expected
+
+
+
+@pytest.fixture
+def version_server():
+    """
+    Local http server, GET /<name> returns the version string versions[name]
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from threading import Thread
+
+    versions = {}
+    requests_ = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_.append(self.path)
+            text = versions.get(self.path.lstrip('/'))
+            if text is None:
+                self.send_error(404)
+                return
+            body = text.encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', f'"{text}"')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}', versions, requests_
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_check_versions(version_server, tmp_path):
+    url, versions, requests_ = version_server
+    versions.update({'a': '1.2.3', 'b': '2.0.0+build', 'c': 'not a version'})
+    cache = versioning.VersionCache(str(tmp_path / 'versions.json'))
+    results = versioning.check_versions([
+        ('1.2.2', f'{url}/a'),
+        ('invalid', f'{url}/a'),
+        ('2.0.0', f'{url}/b'),
+        ('1.0.0', f'{url}/c'),
+        ('1.0.0', f'{url}/missing'),
+    ], cache=cache)
+    assert results == [Version(1, 2, 3), None, None, None, None]
+
+    # cached entries are fresh, nothing is requested again
+    count = len(requests_)
+    assert versioning.check_versions([('1.2.2', f'{url}/a')], cache=versioning.VersionCache(cache.path)) == [Version(1, 2, 3)]
+    assert len(requests_) == count
+
+
+def test_check_versions_raise_errors(version_server):
+    url, versions, _ = version_server
+    versions['a'] = '1.2.3'
+    with pytest.raises(ValueError):
+        versioning.check_versions([('1.0.0', f'{url}/a'), ('invalid', f'{url}/a')], cache=None, raise_errors=True)
+
+
+def test_check_version_is_uncached_by_default(version_server, monkeypatch):
+    url, versions, requests_ = version_server
+    versions['a'] = '1.2.3'
+    monkeypatch.setattr(versioning, '_default_cache', lambda: pytest.fail('shared cache used'))
+    assert versioning.check_version('1.2.2', f'{url}/a') == Version(1, 2, 3)
+    versions['a'] = '1.2.4'
+    assert versioning.check_version('1.2.2', f'{url}/a') == Version(1, 2, 4)
+    assert len(requests_) == 2